@@ -11,7 +11,33 @@ WEB_PORT = 8420  # Web application server port
 
 # Twitch API endpoints
 TWITCH_GQL_URL = "https://gql.twitch.tv/gql"  # Twitch GraphQL API endpoint
+GQL_BATCH_SIZE = 100  # Max channels per batched GQL users(ids/logins) query
+GQL_POOL_LIMIT = 20  # Max pooled connections to the GQL endpoint
+GQL_KEEPALIVE_TIMEOUT = 60  # Seconds to keep idle GQL connections open for reuse
+GQL_CACHE_MAX_ENTRIES = 5000  # Max channels kept in the GQL channel info cache
 
 # Twitch API configuration
 CLIENT_ID = "kimne78kx3ncx6brgo4mv6wki5h1ko"  # Twitch GQL endpoint client ID
-EVENTSUB_CLIENT_ID = "d88elif9gig3jo3921wrlusmc5rz21"  # OAuth application client ID
\ No newline at end of file
+EVENTSUB_CLIENT_ID = "d88elif9gig3jo3921wrlusmc5rz21"  # OAuth application client ID
+EVENTSUB_DUAL_SUBSCRIPTIONS = True  # Keep stream.online and stream.offline subscribed per channel while the cost budget allows
+
+# Rate limits per Twitch endpoint family: (requests per second, burst, max concurrent requests).
+# Starting values only; limits advertised in Ratelimit-* response headers take precedence.
+RATE_LIMITS = {
+    "gql": (10.0, 20, 10),          # GQL publishes no limits, stay polite
+    "helix": (800 / 60, 800, 10),   # Helix: 800 points per minute per token
+}
+
+# Streamer settings persistence
+STREAMERS_FLUSH_INTERVAL = 2.0  # Seconds to coalesce streamer updates before writing to disk
+STREAMERS_STORAGE_BACKEND = "json"  # "json" (streamers.json) or "sqlite" (streamers.db, WAL mode)
+STREAMER_STATUS_SNAPSHOT_INTERVAL = 300.0  # Seconds between snapshots of volatile live status (isLive, title, ...)
+
+# Stream recording
+STREAMLINK_PREFETCH = True  # Resolve a channel's streams while the download's live and title checks run
+STREAMLINK_PREFETCH_TTL = 30.0  # Seconds a pre-resolved stream list may be used
+RECORDING_ENGINE = "thread"  # "thread" (a thread per recording), "process" (a worker process per recording) or "hls" (asyncio segment downloader)
+RECORDING_PROCESS_SPARES = None  # Idle worker processes kept ready with Streamlink loaded (process engine); None: one per streamer with downloads enabled
+RECORDING_PROCESS_MAX_SPARES = 4  # Most idle workers kept when sized to the streamers, each holds a loaded Streamlink
+HLS_SEGMENT_PREFETCH = 3  # Segments of one recording downloaded in parallel (hls engine)
+HLS_SEGMENT_RETRIES = 3  # Extra attempts for a segment that failed to download (hls engine)
@@ -5,9 +5,18 @@ Handles configuration file paths, storage locations, and streamer management.
 
 import os
 import json
+import atexit
 import platform
 from typing import Dict, Any, Set
 
+from backend.src.config.constants import (
+    STREAMERS_FLUSH_INTERVAL,
+    STREAMERS_STORAGE_BACKEND,
+    STREAMER_STATUS_SNAPSHOT_INTERVAL,
+)
+from backend.src.config.storage_backends import create_storage_backend
+from backend.src.config.streamer_store import StreamerStore
+
 # Define config directory based on platform
 if platform.system() == "Windows":
     # Windows: Use AppData\Roaming
@@ -22,6 +31,8 @@ os.makedirs(CONFIG_DIR, exist_ok=True)
 # Define the paths to save settings data
 STREAMERS_FILE = os.path.join(CONFIG_DIR, "streamers.json")
 STORAGE_CONFIG_FILE = os.path.join(CONFIG_DIR, "storage_config.json")
+STREAMER_STATUS_FILE = os.path.join(CONFIG_DIR, "streamer_status.json")
+GQL_CACHE_FILE = os.path.join(CONFIG_DIR, "gql_cache.json")
 
 def get_default_storage_path() -> str:
     """
@@ -56,6 +67,22 @@ def get_storage_path() -> str:
     # Default path
     return get_default_storage_path()
 
+# Process-wide in-memory store for the monitored streamer roster.
+# The storage backend can be switched to SQLite with STREAMERS_STORAGE_BACKEND=sqlite
+streamer_store = StreamerStore(
+    create_storage_backend(
+        os.environ.get("STREAMERS_STORAGE_BACKEND", STREAMERS_STORAGE_BACKEND).lower(),
+        CONFIG_DIR,
+    ),
+    get_default_storage_path,
+    flush_interval=STREAMERS_FLUSH_INTERVAL,
+    status_snapshot_path=STREAMER_STATUS_FILE,
+    status_snapshot_interval=STREAMER_STATUS_SNAPSHOT_INTERVAL,
+)
+
+# Make sure coalesced updates reach the disk when the process exits
+atexit.register(streamer_store.flush)
+
 def update_storage_path(new_path: str) -> bool:
     """
     Update the global storage path configuration.
@@ -86,40 +113,19 @@ def get_monitored_streamers() -> Dict:
     """
     Retrieve the list of streamers being monitored.
     
-    Reads the streamers configuration file and ensures all entries
-    have the required fields with appropriate default values.
+    Served from the in-memory streamer store, which reads the streamers
+    configuration file once and ensures all entries have the required
+    fields with appropriate default values.
     
     Returns:
-        Dict: Dictionary mapping streamer usernames to their configuration settings
-              Returns an empty dictionary if the file doesn't exist or there's an error
-    """
-    try:
-        if os.path.exists(STREAMERS_FILE):
-            with open(STREAMERS_FILE, "r") as f:
-                streamers = json.load(f)
-                # If it's a list (older format), convert to dict
-                if isinstance(streamers, list):
-                    return {streamer: {
-                        "downloads_enabled": False,
-                        "twitch_id": "",
-                        "save_directory": get_default_storage_path()
-                    } for streamer in streamers}
-                
-                # Ensure all streamers have the required fields
-                for streamer, settings in streamers.items():
-                    if "downloads_enabled" not in settings:
-                        settings["downloads_enabled"] = False
-                    if "twitch_id" not in settings:
-                        settings["twitch_id"] = ""
-                    if "save_directory" not in settings:
-                        settings["save_directory"] = get_default_storage_path()
-                
-                return streamers
-    except Exception as e:
-        print(f"Error reading streamers file: {e}")
+        Dict: Dictionary mapping streamer usernames to copies of their configuration
+              settings. Returns an empty dictionary if the file doesn't exist or there's an error
     
-    # Return empty dict if file doesn't exist or there's an error
-    return {}
+    Note:
+        Prefer streamer_store.get() / streamer_store.patch() when only a single
+        streamer is needed; this function copies the whole roster.
+    """
+    return streamer_store.all()
 
 def update_monitored_streamers(streamers: Dict) -> None:
     """
@@ -129,53 +135,12 @@ def update_monitored_streamers(streamers: Dict) -> None:
         streamers (Dict): Dictionary mapping streamer usernames to their settings
         
     Note:
-        Uses a temporary file for writing to prevent data corruption if
-        the operation is interrupted. Normalizes all streamer entries to
-        ensure they have required fields with appropriate default values.
+        Replaces the whole in-memory roster. The write to disk is coalesced
+        with other updates and uses a temporary file to prevent data
+        corruption if the operation is interrupted. Prefer
+        streamer_store.patch() for single-field updates.
     """
-    try:
-        # Ensure the directory exists
-        os.makedirs(os.path.dirname(STREAMERS_FILE), exist_ok=True)
-        
-        # Get existing streamers to detect new additions and changes
-        existing_streamers = {}
-        if os.path.exists(STREAMERS_FILE):
-            try:
-                with open(STREAMERS_FILE, "r") as f:
-                    existing_streamers = json.load(f)
-            except:
-                pass
-        
-        # Create a cleaned copy with all necessary fields
-        cleaned_streamers = {}
-        for streamer, settings in streamers.items():
-            cleaned_streamers[streamer] = {
-                # Persistent configuration
-                "downloads_enabled": settings.get("downloads_enabled", False),
-                "twitch_id": settings.get("twitch_id", ""),
-                "save_directory": settings.get("save_directory", get_default_storage_path()),
-                "stream_resolution": settings.get("stream_resolution", "best"),
-                
-                # Profile and images
-                "profileImageURL": settings.get("profileImageURL", ""),
-                "offlineImageURL": settings.get("offlineImageURL", ""),
-                
-                # Status information - preserve these values now
-                "isLive": settings.get("isLive", False),
-                "title": settings.get("title", f"{streamer}'s Stream"),
-                "thumbnail": settings.get("thumbnail", ""),
-            }
-        
-        # Write to a temporary file first, then rename to avoid corruption
-        temp_file = f"{STREAMERS_FILE}.tmp"
-        with open(temp_file, "w") as f:
-            json.dump(cleaned_streamers, f, indent=2)
-        
-        # Replace the original file with the temporary file
-        os.replace(temp_file, STREAMERS_FILE)
-        
-    except Exception as e:
-        print(f"Error saving streamers file: {e}")
+    streamer_store.replace_all(streamers)
 
 def get_streamer_storage_path(streamer: str) -> str:
     """
@@ -189,9 +154,9 @@ def get_streamer_storage_path(streamer: str) -> str:
              If no custom path is configured, returns a subdirectory of the
              global path with the streamer's username.
     """
-    streamers = get_monitored_streamers()
-    if streamer in streamers and "save_directory" in streamers[streamer]:
-        return streamers[streamer]["save_directory"]
+    save_directory = streamer_store.get_field(streamer, "save_directory")
+    if save_directory:
+        return save_directory
     return os.path.join(get_storage_path(), streamer)
 
 def update_streamer_storage_path(streamer: str, path: str) -> bool:
@@ -210,24 +175,11 @@ def update_streamer_storage_path(streamer: str, path: str) -> bool:
         Ensures the specified directory exists.
     """
     try:
-        streamers = get_monitored_streamers()
-        
-        # Create streamer entry if it doesn't exist
-        if streamer not in streamers:
-            streamers[streamer] = {
-                "downloads_enabled": False,
-                "twitch_id": "",
-                "save_directory": path
-            }
-        else:
-            # Update storage path
-            streamers[streamer]["save_directory"] = path
-        
         # Ensure the directory exists
         os.makedirs(path, exist_ok=True)
         
-        # Save changes
-        update_monitored_streamers(streamers)
+        # Update storage path, creating the streamer entry if it doesn't exist
+        streamer_store.upsert(streamer, save_directory=path)
         return True
     except Exception as e:
         print(f"Error updating streamer storage path: {e}")
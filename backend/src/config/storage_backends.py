@@ -0,0 +1,293 @@
+"""
+Storage backends for the streamer roster.
+
+The StreamerStore keeps the roster in memory and delegates persistence to a
+backend. Two backends are available:
+
+- JSONStorageBackend (default): the classic streamers.json file, rewritten
+  as a whole on every flush
+- SQLiteStorageBackend: one row per streamer in an SQLite database running
+  in WAL mode, so a flush only touches the rows that changed
+
+Usage:
+    backend = create_storage_backend("sqlite", CONFIG_DIR)
+    streamers = backend.load()
+    backend.save({"streamer1": {...}}, removed={"streamer2"})
+"""
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Any, Dict, Optional, Set
+
+# PRAGMA user_version once streamers.json has been imported into SQLite
+MIGRATED_USER_VERSION = 1
+
+
+class StreamerStorageBackend:
+    """
+    Base class for streamer roster persistence.
+
+    Attributes:
+        incremental (bool): Whether save() accepts only the changed rows.
+            Non-incremental backends always receive the full roster.
+    """
+
+    incremental = False
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Load the raw roster.
+
+        Returns:
+            Dict[str, Any]: Mapping of streamer names to their stored settings,
+            or an empty dict if nothing is stored yet
+        """
+        raise NotImplementedError
+
+    def save(self, rows: Dict[str, Dict[str, Any]], removed: Set[str]) -> None:
+        """
+        Persist streamer entries.
+
+        Args:
+            rows: Entries to write. The full roster for non-incremental
+                backends, only the changed entries otherwise
+            removed: Names of streamers that were removed (incremental only)
+        """
+        raise NotImplementedError
+
+    def close(self) -> None:
+        """Release any resources held by the backend."""
+
+
+class JSONStorageBackend(StreamerStorageBackend):
+    """
+    Stores the roster in a single JSON file.
+
+    Reads both the older list format and the current dict format. Writes go
+    to a temporary file which is fsynced and atomically renamed over the
+    original.
+
+    Attributes:
+        file_path (str): Path to the streamers JSON file
+    """
+
+    incremental = False
+
+    def __init__(self, file_path: str):
+        """
+        Initialize the backend.
+
+        Args:
+            file_path: Path to the streamers JSON file
+        """
+        self.file_path = file_path
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read the streamers file.
+
+        Returns:
+            Dict[str, Any]: Roster keyed by streamer name. Entries from the
+            older list format are returned with empty settings
+        """
+        try:
+            if os.path.exists(self.file_path):
+                with open(self.file_path, "r") as f:
+                    streamers = json.load(f)
+
+                # If it's a list (older format), convert to dict
+                if isinstance(streamers, list):
+                    return {streamer: {} for streamer in streamers}
+
+                if isinstance(streamers, dict):
+                    return streamers
+        except Exception as e:
+            print(f"Error reading streamers file: {e}")
+
+        return {}
+
+    def save(self, rows: Dict[str, Dict[str, Any]], removed: Set[str]) -> None:
+        """
+        Rewrite the streamers file with the full roster.
+
+        Args:
+            rows: The full roster
+            removed: Ignored, removed streamers are simply absent from rows
+        """
+        try:
+            os.makedirs(os.path.dirname(self.file_path), exist_ok=True)
+
+            # Write to a temporary file first, then rename to avoid corruption
+            temp_file = f"{self.file_path}.tmp"
+            with open(temp_file, "w") as f:
+                json.dump(rows, f, indent=2)
+                f.flush()
+                os.fsync(f.fileno())
+
+            # Replace the original file with the temporary file
+            os.replace(temp_file, self.file_path)
+        except Exception as e:
+            print(f"Error saving streamers file: {e}")
+
+
+class SQLiteStorageBackend(StreamerStorageBackend):
+    """
+    Stores one row per streamer in an SQLite database.
+
+    The database runs in WAL mode so writes are cheap appends and readers
+    are never blocked. On first use, an existing streamers.json (list or
+    dict format) is imported automatically. The import is recorded in
+    PRAGMA user_version in the same transaction, so it happens only once
+    and a roster emptied later stays empty.
+
+    Attributes:
+        db_path (str): Path to the SQLite database file
+        legacy_json_path (Optional[str]): streamers.json to migrate from
+        _conn (Optional[sqlite3.Connection]): Lazily opened connection
+        _lock (threading.Lock): Serializes access to the connection, which
+            is shared between the event loop and the flush timer thread
+    """
+
+    incremental = True
+
+    def __init__(self, db_path: str, legacy_json_path: Optional[str] = None):
+        """
+        Initialize the backend without opening the database.
+
+        Args:
+            db_path: Path to the SQLite database file
+            legacy_json_path: Optional streamers.json to import when the
+                database is first used
+        """
+        self.db_path = db_path
+        self.legacy_json_path = legacy_json_path
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database and create the schema if needed."""
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path), exist_ok=True)
+            conn = sqlite3.connect(self.db_path, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            # WAL + NORMAL is durable against application crashes and only
+            # risks the last transaction on power loss
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS streamers ("
+                "name TEXT PRIMARY KEY, "
+                "data TEXT NOT NULL)"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def load(self) -> Dict[str, Any]:
+        """
+        Read all rows, migrating from streamers.json on first use.
+
+        Returns:
+            Dict[str, Any]: Roster keyed by streamer name
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                rows = conn.execute("SELECT name, data FROM streamers").fetchall()
+                migrated = conn.execute("PRAGMA user_version").fetchone()[0] >= MIGRATED_USER_VERSION
+                if rows and not migrated:
+                    # Databases written before the marker existed were migrated already
+                    conn.execute(f"PRAGMA user_version = {MIGRATED_USER_VERSION}")
+                    migrated = True
+
+            if migrated:
+                return {name: json.loads(data) for name, data in rows}
+
+            return self._migrate_from_json()
+        except Exception as e:
+            print(f"Error reading streamers database: {e}")
+            return {}
+
+    def _migrate_from_json(self) -> Dict[str, Any]:
+        """
+        Import the legacy JSON roster into the database.
+
+        Returns:
+            Dict[str, Any]: The imported roster, empty if there was nothing
+            to import
+        """
+        streamers = {}
+        if self.legacy_json_path and os.path.exists(self.legacy_json_path):
+            streamers = JSONStorageBackend(self.legacy_json_path).load()
+
+        # Import and marker commit together, so a crash can't import twice
+        with self._lock:
+            conn = self._connect()
+            with conn:
+                self._write(conn, streamers, set())
+                conn.execute(f"PRAGMA user_version = {MIGRATED_USER_VERSION}")
+        if streamers:
+            print(f"[Settings] Migrated {len(streamers)} streamers from {self.legacy_json_path} to SQLite")
+        return streamers
+
+    @staticmethod
+    def _write(conn: sqlite3.Connection, rows: Dict[str, Dict[str, Any]], removed: Set[str]) -> None:
+        """Upsert and delete rows within the caller's transaction."""
+        if rows:
+            conn.executemany(
+                "INSERT INTO streamers (name, data) VALUES (?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET data = excluded.data",
+                [(name, json.dumps(data)) for name, data in rows.items()],
+            )
+        if removed:
+            conn.executemany(
+                "DELETE FROM streamers WHERE name = ?",
+                [(name,) for name in removed],
+            )
+
+    def save(self, rows: Dict[str, Dict[str, Any]], removed: Set[str]) -> None:
+        """
+        Upsert changed rows and delete removed ones in a single transaction.
+
+        Args:
+            rows: Changed entries keyed by streamer name
+            removed: Names of streamers to delete
+        """
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    self._write(conn, rows, removed)
+        except Exception as e:
+            print(f"Error saving streamers database: {e}")
+
+    def close(self) -> None:
+        """Close the database connection."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def create_storage_backend(kind: str, config_dir: str) -> StreamerStorageBackend:
+    """
+    Create the configured storage backend.
+
+    Args:
+        kind: "json" or "sqlite". Unknown values fall back to "json"
+        config_dir: Directory containing the configuration files
+
+    Returns:
+        StreamerStorageBackend: The backend instance
+    """
+    json_path = os.path.join(config_dir, "streamers.json")
+
+    if kind == "sqlite":
+        return SQLiteStorageBackend(
+            os.path.join(config_dir, "streamers.db"), legacy_json_path=json_path
+        )
+
+    if kind != "json":
+        print(f"[Settings] Unknown streamer storage backend '{kind}', using json")
+    return JSONStorageBackend(json_path)
@@ -0,0 +1,581 @@
+"""
+In-memory streamer state store.
+
+Holds the monitored streamer roster in memory so that hot paths (EventSub
+notifications, the download monitor loop, web handlers) can read and update
+streamer settings without re-opening and re-parsing streamers.json on every
+call. The roster is read once on first access; configuration updates are
+coalesced by a debounced writer so a burst of changes costs a single write
+to the configured storage backend.
+
+Volatile live status (isLive, title, thumbnail, ...) is kept in a separate
+in-memory status table. It is merged into every read but never written to
+the durable configuration; it is only snapshotted to its own file on a long
+interval so the UI has something to show right after a restart.
+"""
+
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+from backend.src.config.storage_backends import JSONStorageBackend, StreamerStorageBackend
+
+# Fields describing the current live state of a channel. These change with
+# every stream transition and poll, and are kept out of durable storage.
+VOLATILE_FIELDS = frozenset({
+    "isLive",
+    "title",
+    "thumbnail",
+    "lastTitle",
+    "downloadStatus",
+})
+
+
+class DebouncedWriter:
+    """
+    Coalesces many change notifications into a single deferred write.
+
+    Callers mark streamer names as dirty; the first mark in a quiet period
+    arms a timer, and when it fires the accumulated dirty set is handed to
+    the write callback in one call. flush() writes immediately and is used
+    on shutdown.
+
+    Attributes:
+        interval (float): Seconds to wait after the first change before
+            writing. 0 disables debouncing and writes synchronously
+        _write (Callable[[Set[str]], None]): Callback performing the write
+        _dirty (Set[str]): Streamer names changed since the last write
+        _timer (Optional[threading.Timer]): Pending flush timer, if armed
+        _lock (threading.Lock): Guards the dirty set and timer
+        _flush_lock (threading.Lock): Serializes writes between the timer
+            thread and explicit flush() calls
+        flush_count (int): Number of writes performed
+        coalesced_count (int): Number of change notifications absorbed into
+            an already pending write
+    """
+
+    def __init__(self, write: Callable[[Set[str]], None], interval: float):
+        """
+        Initialize the writer.
+
+        Args:
+            write: Callback receiving the set of dirty streamer names
+            interval: Debounce window in seconds
+        """
+        self.interval = interval
+        self._write = write
+        self._dirty: Set[str] = set()
+        self._timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self.flush_count = 0
+        self.coalesced_count = 0
+
+    def mark_dirty(self, names: Iterable[str]) -> None:
+        """
+        Record changed streamers and schedule a write.
+
+        Args:
+            names: Streamer names whose entries changed
+        """
+        with self._lock:
+            self._dirty.update(names)
+            if self.interval > 0:
+                if self._timer is not None:
+                    self.coalesced_count += 1
+                    return
+                self._timer = threading.Timer(self.interval, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+                return
+
+        self.flush()
+
+    def flush(self) -> None:
+        """Write all pending changes immediately, if there are any."""
+        with self._flush_lock:
+            with self._lock:
+                if self._timer is not None:
+                    self._timer.cancel()
+                    self._timer = None
+                if not self._dirty:
+                    return
+                dirty, self._dirty = self._dirty, set()
+
+            self._write(dirty)
+            self.flush_count += 1
+
+    @property
+    def pending(self) -> bool:
+        """Whether there are changes waiting to be written."""
+        return bool(self._dirty)
+
+
+class StreamerStore:
+    """
+    Process-wide store for monitored streamer settings.
+
+    The roster is loaded lazily from disk on first access and served from
+    memory afterwards. Lookups by streamer name and by Twitch user ID are
+    O(1); the twitch_id index is kept in sync with every add, remove
+    and twitch_id change. All reads return copies so callers can
+    freely mutate the result without affecting the store; changes are
+    applied through patch(), upsert() or replace_all().
+
+    Each entry is split into durable configuration and volatile status
+    (see VOLATILE_FIELDS). Only configuration changes are written to the
+    storage backend; status lives in memory and is optionally snapshotted.
+
+    Attributes:
+        backend (StreamerStorageBackend): Persistence backend (JSON or SQLite)
+        _default_save_directory (Callable[[], str]): Provides the default
+            save_directory for entries that don't have one
+        _streamers (Dict[str, Dict[str, Any]]): In-memory configuration
+        _status (Dict[str, Dict[str, Any]]): In-memory volatile status
+        _by_twitch_id (Dict[str, str]): Reverse index from twitch_id to
+            streamer name
+        _loaded (bool): Whether the roster has been read from disk
+        _lock (threading.RLock): Guards the roster against concurrent access
+            from download threads and the event loop
+        _writer (DebouncedWriter): Coalesces configuration updates into
+            periodic writes
+        _status_backend (Optional[JSONStorageBackend]): Snapshot file for
+            the status table, None if snapshots are disabled
+        _status_writer (Optional[DebouncedWriter]): Schedules status snapshots
+    """
+
+    def __init__(self, backend: StreamerStorageBackend,
+                 default_save_directory: Callable[[], str], flush_interval: float = 0,
+                 status_snapshot_path: Optional[str] = None,
+                 status_snapshot_interval: float = 0):
+        """
+        Initialize the store without touching the disk.
+
+        Args:
+            backend: Storage backend used to load and persist the roster
+            default_save_directory: Callable returning the default storage path
+            flush_interval: Seconds to coalesce configuration updates before
+                writing them to disk. 0 writes every update immediately
+            status_snapshot_path: File to snapshot the status table to. None
+                keeps status purely in memory
+            status_snapshot_interval: Seconds between status snapshots
+        """
+        self.backend = backend
+        self._default_save_directory = default_save_directory
+        self._streamers: Dict[str, Dict[str, Any]] = {}
+        self._status: Dict[str, Dict[str, Any]] = {}
+        self._by_twitch_id: Dict[str, str] = {}
+        self._loaded = False
+        self._lock = threading.RLock()
+        self._writer = DebouncedWriter(self._write_file, flush_interval)
+
+        self._status_backend = None
+        self._status_writer = None
+        if status_snapshot_path:
+            self._status_backend = JSONStorageBackend(status_snapshot_path)
+            self._status_writer = DebouncedWriter(self._write_status_snapshot, status_snapshot_interval)
+
+    # ------------------------------------------------------------------
+    # Loading and normalization
+    # ------------------------------------------------------------------
+
+    def _ensure_loaded(self) -> None:
+        """Load the roster from disk if it hasn't been loaded yet."""
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    self._load()
+
+    def _load(self) -> None:
+        """
+        Load configuration from the backend and seed the status table.
+
+        Status comes from the snapshot file if present, falling back to any
+        volatile fields still stored in the configuration by older versions.
+        """
+        self._streamers = {}
+        self._status = {}
+        for streamer, settings in self.backend.load().items():
+            config, status = self._split(self._normalize(settings))
+            self._streamers[streamer] = config
+            if status:
+                self._status[streamer] = status
+
+        if self._status_backend:
+            for streamer, status in self._status_backend.load().items():
+                if streamer in self._streamers and isinstance(status, dict):
+                    self._status[streamer] = {
+                        k: v for k, v in status.items() if k in VOLATILE_FIELDS
+                    }
+
+        self._rebuild_index()
+        self._loaded = True
+
+    @staticmethod
+    def _split(fields: Dict[str, Any]):
+        """
+        Split fields into configuration and volatile status.
+
+        Args:
+            fields: Streamer settings fields
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: (configuration, status)
+        """
+        config = {}
+        status = {}
+        for key, value in fields.items():
+            if key in VOLATILE_FIELDS:
+                status[key] = value
+            else:
+                config[key] = value
+        return config, status
+
+    def _rebuild_index(self) -> None:
+        """Rebuild the twitch_id reverse index from the roster."""
+        self._by_twitch_id = {
+            settings["twitch_id"]: name
+            for name, settings in self._streamers.items()
+            if settings.get("twitch_id")
+        }
+
+    def _reindex(self, streamer: str, old_id: str, new_id: str) -> None:
+        """
+        Move a streamer's reverse index entry after its twitch_id changed.
+
+        Args:
+            streamer: Twitch username of the streamer
+            old_id: Previous twitch_id (may be empty)
+            new_id: Current twitch_id (may be empty)
+        """
+        if old_id == new_id:
+            return
+        if old_id and self._by_twitch_id.get(old_id) == streamer:
+            del self._by_twitch_id[old_id]
+        if new_id:
+            self._by_twitch_id[new_id] = streamer
+
+    def _normalize(self, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Ensure a streamer entry has the required fields.
+
+        Args:
+            settings: Raw streamer settings
+
+        Returns:
+            Dict[str, Any]: A new dict with downloads_enabled, twitch_id and
+            save_directory filled in with defaults where missing
+        """
+        normalized = dict(settings) if isinstance(settings, dict) else {}
+        normalized.setdefault("downloads_enabled", False)
+        normalized.setdefault("twitch_id", "")
+        if "save_directory" not in normalized:
+            normalized["save_directory"] = self._default_save_directory()
+        return normalized
+
+    def _clean(self, streamer: str, settings: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build the persisted representation of a streamer's configuration.
+
+        Args:
+            streamer: Twitch username of the streamer
+            settings: In-memory streamer configuration
+
+        Returns:
+            Dict[str, Any]: Entry containing only the fields written to disk
+        """
+        return {
+            # Persistent configuration
+            "downloads_enabled": settings.get("downloads_enabled", False),
+            "twitch_id": settings.get("twitch_id", ""),
+            "save_directory": settings.get("save_directory", self._default_save_directory()),
+            "stream_resolution": settings.get("stream_resolution", "best"),
+
+            # Profile and images
+            "profileImageURL": settings.get("profileImageURL", ""),
+            "offlineImageURL": settings.get("offlineImageURL", ""),
+        }
+
+    def _merged(self, streamer: str) -> Dict[str, Any]:
+        """Return a new dict combining a streamer's configuration and status."""
+        merged = dict(self._streamers[streamer])
+        status = self._status.get(streamer)
+        if status:
+            merged.update(status)
+        return merged
+
+    def reload(self) -> None:
+        """Write pending changes, then read the roster again from disk."""
+        self.flush()
+        with self._lock:
+            self._load()
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def all(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return a copy of the full roster.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Mapping of streamer names to copies of
+            their settings, with live status merged in
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return {name: self._merged(name) for name in self._streamers}
+
+    def get(self, streamer: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a copy of a single streamer's settings.
+
+        Args:
+            streamer: Twitch username of the streamer
+
+        Returns:
+            Optional[Dict[str, Any]]: The settings with live status merged in,
+            or None if not monitored
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if streamer not in self._streamers:
+                return None
+            return self._merged(streamer)
+
+    def get_field(self, streamer: str, field: str, default: Any = None) -> Any:
+        """
+        Return a single field of a streamer's settings without copying.
+
+        Args:
+            streamer: Twitch username of the streamer
+            field: Name of the settings field
+            default: Value returned if the streamer or field doesn't exist
+
+        Returns:
+            Any: The field value or the default
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if streamer not in self._streamers:
+                return default
+            if field in VOLATILE_FIELDS:
+                return self._status.get(streamer, {}).get(field, default)
+            return self._streamers[streamer].get(field, default)
+
+    def get_name_by_twitch_id(self, twitch_id: str) -> Optional[str]:
+        """
+        Look up a streamer name by Twitch user ID.
+
+        Args:
+            twitch_id: Twitch user ID (e.g. broadcaster_user_id from EventSub)
+
+        Returns:
+            Optional[str]: The streamer name, or None if no monitored
+            streamer has this ID
+        """
+        if not twitch_id:
+            return None
+        self._ensure_loaded()
+        return self._by_twitch_id.get(twitch_id)
+
+    def contains(self, streamer: str) -> bool:
+        """Return whether a streamer is being monitored."""
+        self._ensure_loaded()
+        return streamer in self._streamers
+
+    def names(self) -> List[str]:
+        """Return the names of all monitored streamers."""
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._streamers.keys())
+
+    def __len__(self) -> int:
+        self._ensure_loaded()
+        return len(self._streamers)
+
+    # ------------------------------------------------------------------
+    # Writes
+    # ------------------------------------------------------------------
+
+    def _apply(self, streamer: str, fields: Dict[str, Any]) -> bool:
+        """
+        Apply fields to an existing streamer. Caller must hold the lock.
+
+        Args:
+            streamer: Twitch username of the streamer
+            fields: Settings fields to set
+
+        Returns:
+            bool: True if the durable configuration changed
+        """
+        config_fields, status_fields = self._split(fields)
+
+        if status_fields:
+            self._status.setdefault(streamer, {}).update(status_fields)
+            if self._status_writer:
+                self._status_writer.mark_dirty((streamer,))
+
+        config = self._streamers[streamer]
+        changed = {k: v for k, v in config_fields.items() if config.get(k) != v}
+        if not changed:
+            return False
+
+        old_id = config.get("twitch_id", "")
+        config.update(changed)
+        self._reindex(streamer, old_id, config.get("twitch_id", ""))
+        return True
+
+    def patch(self, streamer: str, **fields: Any) -> bool:
+        """
+        Update fields of an existing streamer.
+
+        Configuration changes are persisted through the debounced writer;
+        volatile status fields only update the in-memory status table.
+
+        Args:
+            streamer: Twitch username of the streamer
+            **fields: Settings fields to set
+
+        Returns:
+            bool: True if the streamer exists and was updated, False otherwise
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if streamer not in self._streamers:
+                return False
+            config_changed = self._apply(streamer, fields)
+        if config_changed:
+            self._writer.mark_dirty((streamer,))
+        return True
+
+    def upsert(self, streamer: str, **fields: Any) -> None:
+        """
+        Update a streamer's fields, creating the entry if it doesn't exist.
+
+        Args:
+            streamer: Twitch username of the streamer
+            **fields: Settings fields to set
+        """
+        self._ensure_loaded()
+        with self._lock:
+            if streamer in self._streamers:
+                config_changed = self._apply(streamer, fields)
+            else:
+                config, status = self._split(self._normalize(fields))
+                self._streamers[streamer] = config
+                if status:
+                    self._status[streamer] = status
+                self._reindex(streamer, "", config.get("twitch_id", ""))
+                config_changed = True
+        if config_changed:
+            self._writer.mark_dirty((streamer,))
+
+    def remove(self, streamers: Iterable[str]) -> None:
+        """
+        Stop monitoring the given streamers.
+
+        Args:
+            streamers: Twitch usernames to remove
+        """
+        self._ensure_loaded()
+        removed = []
+        with self._lock:
+            for streamer in streamers:
+                settings = self._streamers.pop(streamer, None)
+                self._status.pop(streamer, None)
+                if settings is not None:
+                    self._reindex(streamer, settings.get("twitch_id", ""), "")
+                    removed.append(streamer)
+        if removed:
+            self._writer.mark_dirty(removed)
+
+    def replace_all(self, streamers: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Replace the whole roster.
+
+        Only entries whose configuration actually changed (plus added and
+        removed entries) are marked for writing.
+
+        Args:
+            streamers: Mapping of streamer names to their settings
+        """
+        self._ensure_loaded()
+        with self._lock:
+            previous = self._streamers
+            self._streamers = {}
+            self._status = {}
+            changed = set(previous) - set(streamers)
+            for name, settings in streamers.items():
+                config, status = self._split(self._normalize(settings))
+                self._streamers[name] = config
+                if status:
+                    self._status[name] = status
+                if previous.get(name) != config:
+                    changed.add(name)
+            self._rebuild_index()
+        if changed:
+            self._writer.mark_dirty(changed)
+        if self._status_writer:
+            self._status_writer.mark_dirty(streamers.keys())
+
+    def flush(self) -> None:
+        """Write pending configuration and a status snapshot immediately (e.g. on shutdown)."""
+        self._writer.flush()
+        if self._status_writer:
+            self._status_writer.flush()
+
+    def get_write_stats(self) -> Dict[str, Any]:
+        """
+        Return statistics about coalesced writes.
+
+        Returns:
+            Dict[str, Any]: Flush count, absorbed updates, pending flag and
+            the configured window
+        """
+        stats = {
+            "flushes": self._writer.flush_count,
+            "coalesced_updates": self._writer.coalesced_count,
+            "pending": self._writer.pending,
+            "flush_interval": self._writer.interval,
+        }
+        if self._status_writer:
+            stats["status_snapshots"] = self._status_writer.flush_count
+        return stats
+
+    def _write_file(self, dirty: Set[str]) -> None:
+        """
+        Persist pending configuration changes to the storage backend.
+
+        Incremental backends receive only the dirty entries and the names of
+        removed streamers; others receive the full roster.
+
+        Args:
+            dirty: Names changed since the last write
+        """
+        with self._lock:
+            if self.backend.incremental:
+                rows = {
+                    name: self._clean(name, self._streamers[name])
+                    for name in dirty if name in self._streamers
+                }
+                removed = {name for name in dirty if name not in self._streamers}
+            else:
+                rows = {
+                    name: self._clean(name, settings)
+                    for name, settings in self._streamers.items()
+                }
+                removed = set()
+
+        self.backend.save(rows, removed)
+
+    def _write_status_snapshot(self, dirty: Set[str]) -> None:
+        """
+        Snapshot the whole status table to its file.
+
+        Args:
+            dirty: Names changed since the last snapshot (unused, the
+                snapshot is always complete)
+        """
+        with self._lock:
+            snapshot = {name: dict(status) for name, status in self._status.items()}
+        self._status_backend.save(snapshot, set())
@@ -5,12 +5,14 @@ import time
 import os
 from typing import Dict, Any
 
-from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-from backend.src.services.gql_client import GQLClient
+from backend.src.config.settings import get_monitored_streamers, streamer_store
+from backend.src.services.gql_client import get_gql_client
+from backend.src.services.rate_limiter import get_rate_limit_stats
 from backend.src.services.eventsub_service import EventSubService  # Import the new EventSub service
 from backend.src.services.download_service import DownloadService
 from backend.src.services.token_manager import TokenManager
 from backend.src.services.backup_manager import backup_streamers_config
+from backend.src.services.event_bus import STREAM_OFFLINE, STREAM_ONLINE, get_event_bus
 
 class StreamMonitorService:
     """
@@ -49,6 +51,9 @@ class StreamMonitorService:
         # Share token manager with EventSub for authentication
         self.eventsub_service.token_manager = self.token_manager
 
+        # Shared GQL client - keeps its cache and connection pool between polls
+        self.gql_client = get_gql_client()
+
         # Initialize download service for recording streams
         self.download_service = DownloadService(websocket_manager, self.token_manager)
         
@@ -111,6 +116,7 @@ class StreamMonitorService:
                 # Only backup if 24 hours have passed since last backup
                 if current_time - self.last_backup_time >= 86400:  # 24 hours
                     print("[Monitor] Performing scheduled backup of streamers configuration")
+                    streamer_store.flush()
                     backup_result = backup_streamers_config(CONFIG_DIR, max_backups=5)
                     if backup_result:
                         self.last_backup_time = current_time
@@ -136,6 +142,15 @@ class StreamMonitorService:
         # Stop EventSub WebSocket service
         await self.eventsub_service.stop()
         
+        # Stop the download monitor and spare recording workers
+        await self.download_service.stop()
+        
+        # Write any coalesced streamer updates to disk
+        streamer_store.flush()
+        
+        # Close pooled GQL connections
+        await self.gql_client.close()
+        
         print("[Monitor] Stream monitoring service stopped")
         
     async def _monitoring_loop(self):
@@ -157,19 +172,23 @@ class StreamMonitorService:
         """
         Query Twitch for all monitored streamers and update their status.
         
-        Fetches current information for each streamer, detects status changes,
-        updates thumbnails, and broadcasts updates to clients via WebSockets.
-        When a streamer goes offline, their title is saved for later restoration.
+        Fetches current information for all streamers with batched GQL requests,
+        detects status changes, updates thumbnails, and broadcasts updates to
+        clients via WebSockets. When a streamer goes offline, their title is
+        saved for later restoration.
         """
         streamers = get_monitored_streamers()
-        gql_client = GQLClient()
+        
+        # Get channel info for every streamer in a few batched requests
+        channels_info = await self.gql_client.get_channels_info(
+            [settings.get("twitch_id") for settings in streamers.values()]
+        )
         
         for streamer, settings in streamers.items():
             try:
                 # Only update if we have a Twitch ID
                 if settings.get("twitch_id"):
-                    # Get channel info from Twitch
-                    channel_info = await gql_client.get_channel_info(settings["twitch_id"])
+                    channel_info = channels_info.get(settings["twitch_id"])
                     
                     if channel_info:
                         # Check if stream status has changed
@@ -177,7 +196,7 @@ class StreamMonitorService:
                         was_live = settings.get("isLive", False)
                         
                         # Always update status in the streamers dict
-                        streamers[streamer]["isLive"] = is_live
+                        changes = {"isLive": is_live}
                         
                         # If status changed, broadcast update
                         if is_live != was_live:
@@ -185,17 +204,17 @@ class StreamMonitorService:
                             if not is_live and was_live:
                                 # Save the current title (for when they go online again)
                                 if settings.get("title") and settings.get("title") != "Offline":
-                                    streamers[streamer]["lastTitle"] = settings.get("title")
+                                    changes["lastTitle"] = settings.get("title")
                                 
                                 # Set title to "Offline"
-                                streamers[streamer]["title"] = "Offline"
+                                changes["title"] = "Offline"
                                 
                                 print(f"[Monitor] {streamer} went offline. Setting title to 'Offline'")
                             
                             # If streamer went online, restore their last title if available
                             elif is_live and not was_live:
-                                if "lastTitle" in streamers[streamer]:
-                                    streamers[streamer]["title"] = streamers[streamer]["lastTitle"]
+                                if "lastTitle" in settings:
+                                    changes["title"] = settings["lastTitle"]
                                     print(f"[Monitor] {streamer} went online. Restored title from saved title")
                             
                             await self.websocket_manager.broadcast_live_status(
@@ -225,10 +244,10 @@ class StreamMonitorService:
                             
                             # Update the dictionary
                             if new_thumbnail:
-                                streamers[streamer]["thumbnail"] = new_thumbnail
+                                changes["thumbnail"] = new_thumbnail
                             
                             if new_title:
-                                streamers[streamer]["title"] = new_title
+                                changes["title"] = new_title
                             
                             # Always broadcast update for live streamers on each cycle
                             if new_thumbnail:
@@ -240,12 +259,21 @@ class StreamMonitorService:
                                 
                         
                         # Save changes to persistent storage
+                        streamer_store.patch(streamer, **changes)
                         self.last_update_time[streamer] = time.time()
+                        
+                        # Let the download service react to the transition
+                        if is_live != was_live:
+                            get_event_bus().publish(
+                                STREAM_ONLINE if is_live else STREAM_OFFLINE,
+                                streamer=streamer, user_id=settings["twitch_id"], source="poll"
+                            )
             except Exception as e:
                 print(f"[Monitor] Error updating {streamer}: {e}")
         
-        # Save streamer data with updates
-        update_monitored_streamers(streamers)
+        # Persist channel metadata so a restart doesn't re-fetch every channel.
+        # Only written when profile data changed, and off the event loop
+        await self.gql_client.save_cache_async()
 
         
     async def _on_token_refresh(self, new_token):
@@ -330,6 +358,9 @@ class StreamMonitorService:
                 - live_streamers: List of currently live streamers
                 - last_update: Timestamps of most recent updates
                 - eventsub: Status of the EventSub WebSocket service
+                - gql: Channel info cache and request coalescing counters
+                - event_bus: Live/offline event delivery counters
+                - recording_engine: Recording engine and its worker counters
         """
         streamers = get_monitored_streamers()
         live_streamers = [s for s, data in streamers.items() if data.get("isLive")]
@@ -343,7 +374,11 @@ class StreamMonitorService:
             "monitored_streamers": len(streamers),
             "live_streamers": live_streamers,
             "last_update": self.last_update_time,
-            "eventsub": eventsub_status
+            "eventsub": eventsub_status,
+            "gql": self.gql_client.get_stats(),
+            "rate_limits": get_rate_limit_stats(),
+            "event_bus": get_event_bus().get_stats(),
+            "recording_engine": self.download_service.get_engine_stats()
         }
     
     async def _supervision_loop(self):
@@ -384,7 +419,6 @@ class StreamMonitorService:
         # Check active connections
         active_connections = status.get("active_connections", 0)
         streamers = get_monitored_streamers()
-        expected_connections = min(3, (len(streamers) + 4) // 5)  # Each connection handles ~5 streamers
         
         # If we have streamers but no active connections, restart EventSub
         if len(streamers) > 0 and active_connections == 0:
@@ -429,8 +463,10 @@ class StreamMonitorService:
         subscriptions_count = len(self.eventsub_service.active_subscriptions)
         
         # Find streamers with IDs that should have subscriptions
+        # (streamers beyond EventSub limits are covered by polling instead)
+        uncovered = set(eventsub_status.get("uncovered_streamers", []))
         streamers_with_ids = [s for s, settings in streamers.items() 
-                            if settings.get("twitch_id")]
+                            if settings.get("twitch_id") and s not in uncovered]
         
         # Check for significant subscription mismatch
         if len(streamers_with_ids) > subscriptions_count + 3:
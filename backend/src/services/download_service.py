@@ -8,6 +8,23 @@ import json
 import time
 from typing import Dict, Set
 
+from backend.src.services.recording_latency import get_latency_tracker
+from backend.src.services.event_bus import STREAM_OFFLINE, STREAM_ONLINE, get_event_bus
+from backend.src.services.streamlink_pool import get_session_pool
+from backend.src.services.recording_processes import RecordingProcessPool
+from backend.src.services.hls_recorder import HLSRecorder, HLSRecording
+from backend.src.services.recording_handle import RecordingHandle, RECORDING_STOP_TIMEOUT
+from backend.src.config.constants import (
+    RECORDING_ENGINE, RECORDING_PROCESS_MAX_SPARES, RECORDING_PROCESS_SPARES, STREAMLINK_PREFETCH
+)
+
+# Channel URL handed to Streamlink
+TWITCH_STREAM_URL = "https://twitch.tv/{streamer}"
+
+# Seconds between full checks of all streamers. Live and offline transitions
+# arrive on the event bus; this only catches anything missed
+DOWNLOAD_SAFETY_CHECK_INTERVAL = 60
+
 class DownloadService:
     """
     Service for downloading and recording Twitch streams when they go live.
@@ -29,8 +46,14 @@ class DownloadService:
         self.running = False
         self.cancellation_flags = {}  # Maps streamers to their cancellation flags
         self.download_lock = asyncio.Lock() 
+        self.pending_starts = {}  # Maps streamers to an event set once their start_download() finished
         self.download_cooldowns = {}  # Track cooldown periods after natural completion
         self.cooldown_duration = 30  # 30-second cooldown
+        self.session_pool = get_session_pool()  # Shared Streamlink sessions
+        self.engine = RECORDING_ENGINE  # "thread", "process" or "hls"
+        self.recording_processes = None  # Worker processes of the process engine
+        self.hls_recorder = None  # Segment downloader of the hls engine
+        self._loop = None
         
     async def start(self):
         """
@@ -38,13 +61,71 @@ class DownloadService:
         Begins monitoring enabled streamers for download opportunities.
         """
         self.running = True
+        self._loop = asyncio.get_running_loop()
         # Load streamers with downloads enabled
         await self._load_configured_streamers()
+        if self.engine == "process":
+            # Start the supervisor and the spare worker processes
+            self.recording_processes = RecordingProcessPool(self._on_recording_message, self._spare_workers())
+            self.recording_processes.start()
+            print(f"[DownloadService] Recording in worker processes ({self.recording_processes.spares} kept ready)")
+        elif self.engine == "hls":
+            self.hls_recorder = HLSRecorder()
+            print(f"[DownloadService] Recording with the asyncio HLS downloader "
+                  f"({self.hls_recorder.prefetch} parallel segments, {self.hls_recorder.retries} retries)")
+        # React to live/offline transitions as soon as they are published
+        event_bus = get_event_bus()
+        event_bus.subscribe(STREAM_ONLINE, self._on_stream_online)
+        event_bus.subscribe(STREAM_OFFLINE, self._on_stream_offline)
+        # Load Streamlink before the first recording needs it
+        asyncio.create_task(self._warm_up_streamlink())
         #Immediately check for live streams to handle application restart case
         await self._initial_state_reconciliation()
         # Start monitoring for streams to download
         asyncio.create_task(self._download_monitor_loop())
         
+    async def stop(self):
+        """
+        Stop monitoring and shut down the spare recording worker processes.
+        
+        Running recordings are not stopped here.
+        """
+        self.running = False
+        event_bus = get_event_bus()
+        event_bus.unsubscribe(STREAM_ONLINE, self._on_stream_online)
+        event_bus.unsubscribe(STREAM_OFFLINE, self._on_stream_offline)
+        if self.recording_processes is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self.recording_processes.stop)
+        if self.hls_recorder is not None:
+            await self.hls_recorder.close()
+
+    async def _warm_up_streamlink(self):
+        """
+        Create the pooled Streamlink session and load the Twitch plugin.
+        
+        Runs in an executor so the import and plugin load don't block the
+        event loop.
+        """
+        try:
+            auth_token = await self._get_auth_token()
+            loop = asyncio.get_running_loop()
+            elapsed = await loop.run_in_executor(None, self.session_pool.warm_up, auth_token)
+            print(f"[DownloadService] Streamlink session ready in {elapsed:.2f}s")
+        except Exception as e:
+            print(f"[DownloadService] Error warming up Streamlink: {e}")
+
+    def _spare_workers(self):
+        """
+        Number of idle recording worker processes to keep ready.
+        
+        Returns:
+            int: RECORDING_PROCESS_SPARES if set, otherwise one per streamer
+            with downloads enabled, up to RECORDING_PROCESS_MAX_SPARES
+        """
+        if RECORDING_PROCESS_SPARES is not None:
+            return RECORDING_PROCESS_SPARES
+        return min(len(self.configured_streamers), RECORDING_PROCESS_MAX_SPARES)
+
     async def _load_configured_streamers(self):
         """
         Load the list of streamers that have downloads enabled.
@@ -60,21 +141,68 @@ class DownloadService:
             if settings.get("downloads_enabled", False)
         }
         
+    async def _on_stream_online(self, streamer, **event):
+        """
+        Start recording a streamer that just went live.
+        
+        Args:
+            streamer (str): Twitch username of the streamer
+            **event: Remaining event fields (user_id, source, published_at)
+        """
+        if not self.running or streamer not in self.configured_streamers:
+            return
+        if streamer in self.active_downloads:
+            return
+        
+        from backend.src.config.settings import streamer_store
+        settings = streamer_store.get(streamer)
+        if settings and settings.get("isLive", False):
+            await self.start_download(streamer, settings)
+
+    async def _on_stream_offline(self, streamer, **event):
+        """
+        Stop recording a streamer that just went offline.
+        
+        Args:
+            streamer (str): Twitch username of the streamer
+            **event: Remaining event fields (user_id, source, published_at)
+        """
+        if not self.running:
+            return
+        
+        # Let a download of this streamer that is being started right now
+        # register first
+        pending = self.pending_starts.get(streamer)
+        if pending:
+            await pending.wait()
+        
+        from backend.src.config.settings import streamer_store
+        if streamer in self.active_downloads and not streamer_store.get_field(streamer, "isLive", False):
+            await self.stop_download(streamer)
+            
+            # Send completion notification since the stream ended
+            await self.websocket_manager.broadcast_download_status(
+                streamer, "completed"
+            )
+
     async def _download_monitor_loop(self):
         """
-        Main monitoring loop that periodically checks for download opportunities.
+        Safety-net loop that periodically checks for download opportunities.
         
-        Runs continuously while the service is active, checking every 10 seconds
-        for streamers that should have downloads started or stopped based on
-        their current live status and configuration.
+        Downloads are started and stopped from live/offline events on the
+        event bus. This loop runs every DOWNLOAD_SAFETY_CHECK_INTERVAL seconds
+        while the service is active and catches any transition that was
+        missed, based on the stored live status and configuration.
         """
         # Main loop to check if downloads should be started/stopped
         while self.running:
+            await asyncio.sleep(DOWNLOAD_SAFETY_CHECK_INTERVAL)
+            if not self.running:
+                break
             try:
                 await self._check_downloads()
             except Exception as e:
                 print(f"[DownloadService] Error in monitor loop: {e}")
-            await asyncio.sleep(10)  # Check every 10 seconds
 
     async def _check_downloads(self):
         """
@@ -130,6 +258,25 @@ class DownloadService:
             settings (dict): Streamer's configuration settings containing resolution, 
                             storage path, and other metadata
         """
+        # A later start of the same streamer queues behind this one on the
+        # lock, so waiting for the newest event covers both
+        started = asyncio.Event()
+        self.pending_starts[streamer] = started
+        try:
+            await self._start_download(streamer, settings)
+        finally:
+            started.set()
+            if self.pending_starts.get(streamer) is started:
+                del self.pending_starts[streamer]
+
+    async def _start_download(self, streamer, settings):
+        """
+        Run start_download() for a streamer while it is tracked as pending.
+        
+        Args:
+            streamer (str): Twitch username of the streamer
+            settings (dict): Streamer's configuration settings
+        """
 
         # Lock and duplicate check at the very beginning
         async with self.download_lock:
@@ -145,32 +292,42 @@ class DownloadService:
                 print(f"[DownloadService] Download for {streamer} in cooldown period ({remaining}s remaining), skipping")
                 return
 
+            latency = get_latency_tracker()
+            latency.mark(streamer, "download_started", create=True)
+            
+            # Get auth token
+            auth_token = await self._get_auth_token()
+            if not auth_token:
+                print("[DownloadService] No auth cookie file found, will use alternative download method")
+            
+            # Resolve the streams while the live status and title are checked
+            # (worker processes resolve their own)
+            if STREAMLINK_PREFETCH and self.engine != "process":
+                self.session_pool.prefetch(streamer, TWITCH_STREAM_URL.format(streamer=streamer), auth_token)
+
             #Verify stream is still live
             try:
-                from backend.src.services.gql_client import GQLClient
-                gql_client = GQLClient()
+                from backend.src.services.gql_client import get_gql_client
+                gql_client = get_gql_client()
                 
                 # Get the streamer's Twitch ID
                 twitch_id = settings.get("twitch_id", "")
                 if not twitch_id:
                     # If no Twitch ID, look it up (you already have this logic below)
-                    from backend.src.config.settings import get_monitored_streamers
-                    streamers = get_monitored_streamers()
-                    if streamer in streamers:
-                        twitch_id = streamers[streamer].get("twitch_id", "")
+                    from backend.src.config.settings import streamer_store
+                    twitch_id = streamer_store.get_field(streamer, "twitch_id", "")
                 
                 if twitch_id:
                     # Fetch current channel info directly to verify it's still live
                     channel_info = await gql_client.get_channel_info(twitch_id)
                     if not channel_info or not channel_info.get("stream"):
                         print(f"[DownloadService] Stream is no longer live for {streamer}, aborting download")
+                        latency.discard(streamer)
+                        self.session_pool.discard(streamer)
                         
                         # Update streamer's live status in the configuration
-                        from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-                        streamers = get_monitored_streamers()
-                        if streamer in streamers:
-                            streamers[streamer]["isLive"] = False
-                            update_monitored_streamers(streamers)
+                        from backend.src.config.settings import streamer_store
+                        streamer_store.patch(streamer, isLive=False)
                         
                         # Notify WebSocket clients
                         await self.websocket_manager.broadcast_download_status(
@@ -181,6 +338,7 @@ class DownloadService:
                         )
                         
                         return
+                    latency.mark(streamer, "live_verified")
             except Exception as e:
                 print(f"[DownloadService] Error checking live status for {streamer}: {e}")
 
@@ -199,11 +357,6 @@ class DownloadService:
             # Ensure directory exists
             os.makedirs(save_path, exist_ok=True)
             
-            # Get auth token
-            auth_token = await self._get_auth_token()
-            if not auth_token:
-                print("[DownloadService] No auth cookie file found, will use alternative download method")
-            
             # Create filename with date and stream title
             import re
             
@@ -216,17 +369,15 @@ class DownloadService:
             if not stream_title or stream_title == "Offline" or stream_title == f"{streamer}'s Stream":
                 try:
                     # Create GQL client to fetch the current title
-                    from backend.src.services.gql_client import GQLClient
-                    gql_client = GQLClient()
+                    from backend.src.services.gql_client import get_gql_client
+                    gql_client = get_gql_client()
                     
                     # Get the streamer's Twitch ID
                     twitch_id = settings.get("twitch_id", "")
                     if not twitch_id:
                         # If no Twitch ID, look it up
-                        from backend.src.config.settings import get_monitored_streamers
-                        streamers = get_monitored_streamers()
-                        if streamer in streamers:
-                            twitch_id = streamers[streamer].get("twitch_id", "")
+                        from backend.src.config.settings import streamer_store
+                        twitch_id = streamer_store.get_field(streamer, "twitch_id", "")
                     
                     if twitch_id:
                         # Fetch current channel info
@@ -235,14 +386,13 @@ class DownloadService:
                             stream_title = channel_info.get("title")
                             
                             # Update the stored title in settings
-                            from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-                            streamers = get_monitored_streamers()
-                            if streamer in streamers:
-                                streamers[streamer]["title"] = stream_title
-                                update_monitored_streamers(streamers)
+                            from backend.src.config.settings import streamer_store
+                            streamer_store.patch(streamer, title=stream_title)
                     
                     # If we still don't have a title, we have no choice but to abort
                     if not stream_title or stream_title == "Offline" or stream_title == f"{streamer}'s Stream":
+                        latency.discard(streamer)
+                        self.session_pool.discard(streamer)
                         await self.websocket_manager.broadcast_download_status(
                             streamer, "error"
                         )
@@ -250,6 +400,8 @@ class DownloadService:
                         return
                         
                 except Exception as e:
+                    latency.discard(streamer)
+                    self.session_pool.discard(streamer)
                     print(f"[DownloadService] Error fetching stream title for {streamer}: {e}")
                     await self.websocket_manager.broadcast_download_status(
                         streamer, "error"
@@ -274,6 +426,8 @@ class DownloadService:
                 counter += 1
                 filepath = os.path.join(save_path, f"{base_filename} ({counter}).mp4")
             
+            latency.mark(streamer, "title_resolved")
+            
             # Create a stream downloader function that runs in a separate thread
             def download_stream():
                 try:
@@ -348,112 +502,199 @@ class DownloadService:
                     )
                     return False
             
-            # Create and start the download thread
-            import threading
+            if self.engine == "process":
+                # Hand the recording to a worker process
+                recording = self.recording_processes.launch(
+                    streamer, TWITCH_STREAM_URL.format(streamer=streamer),
+                    filepath, auth_token, selected_resolution
+                )
+                self.cancellation_flags[streamer] = recording.cancel
+                self.active_downloads[streamer] = {
+                    "process": recording,
+                    "filepath": filepath,
+                    "cancellation_flag": recording.cancel
+                }
+            elif self.engine == "hls":
+                # Download the segments on the event loop
+                import threading
 
-            self.cancellation_flags[streamer] = threading.Event()
+                self.cancellation_flags[streamer] = threading.Event()
+                recording = HLSRecording(streamer, filepath, self.cancellation_flags[streamer])
+                task = asyncio.create_task(
+                    self._record_hls(recording, auth_token, selected_resolution)
+                )
+                self.active_downloads[streamer] = {
+                    "task": task,
+                    "recording": recording,
+                    "filepath": filepath,
+                    "cancellation_flag": self.cancellation_flags[streamer]
+                }
+            else:
+                # Create and start the download thread
+                import threading
 
-            loop = asyncio.get_running_loop()
+                handle = RecordingHandle(streamer, filepath)
+                self.cancellation_flags[streamer] = handle.cancellation_flag
 
-            download_thread = threading.Thread(
-                target=self._download_stream_thread,
-                args=(streamer, filepath, auth_token, selected_resolution, self.cancellation_flags[streamer], loop)
-            )
-            download_thread.daemon = True
-            download_thread.start()
-            
-            # Store both the thread and additional information we'll need for cleanup
-            self.active_downloads[streamer] = {
-                "thread": download_thread,
-                "filepath": filepath,
-                "cancellation_flag": self.cancellation_flags[streamer]
-            }
+                loop = asyncio.get_running_loop()
+
+                download_thread = threading.Thread(
+                    target=self._download_stream_thread,
+                    args=(handle, auth_token, selected_resolution, loop),
+                    name=f"recording-{streamer}"
+                )
+                download_thread.daemon = True
+                handle.thread = download_thread
+                download_thread.start()
+                
+                # Store the thread, its handle and additional information we'll need for cleanup
+                self.active_downloads[streamer] = {
+                    "thread": download_thread,
+                    "handle": handle,
+                    "filepath": filepath,
+                    "cancellation_flag": self.cancellation_flags[streamer]
+                }
 
             # Update status in persistent storage - ADD THIS CODE HERE
-            from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-            streamers = get_monitored_streamers()
-            if streamer in streamers:
-                streamers[streamer]["downloadStatus"] = "downloading"
-                update_monitored_streamers(streamers)
+            from backend.src.config.settings import streamer_store
+            streamer_store.patch(streamer, downloadStatus="downloading")
 
             # Notify about download start - THIS LINE ALREADY EXISTS
             await self.websocket_manager.broadcast_download_status(
                 streamer, "downloading"
             )
 
-            print(f"[DownloadService] Started download thread for {streamer}")
+            print(f"[DownloadService] Started download {'thread' if self.engine == 'thread' else self.engine} for {streamer}")
     
     async def stop_download(self, streamer):
         """
         Stop an active download for a specific streamer.
         
-        Removes the download from tracking and broadcasts status update
-        to clients. Since we can't directly terminate threads, the daemon
-        thread will continue until the application exits.
+        Cancels the recording so that a blocked read wakes up and buffered
+        data is written out, then waits up to RECORDING_STOP_TIMEOUT seconds
+        for the file to be flushed to disk. Removes the download from
+        tracking and broadcasts status update to clients.
         
         Args:
             streamer (str): Twitch username of the streamer to stop downloading
+            
+        Returns:
+            dict or None: How the stop went (see _stop_recording), None if
+                          no download was active
         """
         if streamer in self.active_downloads:
             print(f"[DownloadService] Stopping download for {streamer}")
             
             download_info = self.active_downloads[streamer]
+            started = time.monotonic()
             
-            # Signal the thread to stop
+            # Signal the recording to stop and wait until its file is complete
             if streamer in self.cancellation_flags:
                 self.cancellation_flags[streamer].set()
+            result = await self._stop_recording(download_info)
+            result["stopped_in"] = round(time.monotonic() - started, 3)
             
-            # Give a short time for the thread to clean up resources
-            await asyncio.sleep(0.5)
-            
-            # Remove from tracking
-            del self.active_downloads[streamer]
-            
-            # Remove cancellation flag
-            if streamer in self.cancellation_flags:
-                del self.cancellation_flags[streamer]
+            # Remove from tracking, unless a new download took its place meanwhile
+            if self.active_downloads.get(streamer) is download_info:
+                del self.active_downloads[streamer]
+                
+                # Remove cancellation flag
+                if streamer in self.cancellation_flags:
+                    del self.cancellation_flags[streamer]
             
             # Update status in persistent storage
-            from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-            streamers = get_monitored_streamers()
-            if streamer in streamers:
-                streamers[streamer]["downloadStatus"] = "stopped"
-                update_monitored_streamers(streamers)
+            from backend.src.config.settings import streamer_store
+            streamer_store.patch(streamer, downloadStatus="stopped")
                 
             # Notify WebSocket clients
             await self.websocket_manager.broadcast_download_status(
                 streamer, "stopped"
             )
             
-            print(f"[DownloadService] Download stopped for {streamer}")
+            lost = result["bytes_lost"]
+            print(f"[DownloadService] Download stopped for {streamer} in {result['stopped_in']:.2f}s "
+                  f"({result['bytes_written']} bytes written, "
+                  f"{'unknown' if lost is None else lost} bytes lost)"
+                  + ("" if result["clean"] else " - recording did not finish in time"))
+            return result
 
-    def _download_stream_thread(self, streamer, filepath, auth_token, selected_resolution, cancellation_flag, loop):
+    async def _stop_recording(self, download_info):
+        """
+        Cancel a recording and wait for it to finish its file.
+        
+        Args:
+            download_info (dict): Entry of active_downloads
+            
+        Returns:
+            dict: bytes_written, bytes_lost (None if unknown) and clean
+                  (whether the recording finished within RECORDING_STOP_TIMEOUT)
+        """
+        deadline = time.monotonic() + RECORDING_STOP_TIMEOUT
+        
+        if "handle" in download_info:
+            # Thread engine: wake the blocked read, wait for the file to be synced
+            handle = download_info["handle"]
+            handle.cancel()
+            while not handle.finalized.is_set() and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            clean = handle.finalized.is_set()
+            return {
+                "bytes_written": handle.bytes_written,
+                "bytes_lost": handle.bytes_lost if clean else None,
+                "clean": clean,
+            }
+        
+        if "process" in download_info:
+            # Process engine: the worker wakes its own read; terminate it if it doesn't finish
+            recording = download_info["process"]
+            recording.cancel.set()
+            while not recording.finished and time.monotonic() < deadline:
+                await asyncio.sleep(0.05)
+            clean = recording.finished
+            if not clean and recording.is_alive():
+                recording.process.terminate()
+            return {
+                "bytes_written": recording.bytes_written,
+                "bytes_lost": recording.bytes_lost if clean else None,
+                "clean": clean,
+            }
+        
+        if "task" in download_info:
+            # HLS engine: abort segment downloads, give the writer time to sync the file
+            recording = download_info["recording"]
+            task = download_info["task"]
+            recording.stop()
+            done, _ = await asyncio.wait({task}, timeout=max(0, deadline - time.monotonic()))
+            clean = bool(done)
+            if not clean:
+                task.cancel()
+            return {
+                "bytes_written": recording.bytes_written,
+                "bytes_lost": recording.bytes_lost if clean else None,
+                "clean": clean,
+            }
+        
+        return {"bytes_written": 0, "bytes_lost": None, "clean": False}
+
+    def _download_stream_thread(self, handle, auth_token, selected_resolution, loop):
+        streamer = handle.streamer
+        filepath = handle.filepath
         try:
-            import streamlink
-            from streamlink.session import Streamlink
-            
-            # Create a new Streamlink session
-            session = Streamlink()
-            
-            # Configure session (same configuration as before)
-            session.set_option("stream-timeout", 60)
-            session.set_option("ringbuffer-size", 32 * 1024 * 1024)  # 32M
-            
-            # Configure auth
-            if auth_token:
-                session.set_option("http-cookies", {"auth-token": auth_token})
-                session.set_option("http-headers", {
-                    "Authorization": f"OAuth {auth_token}"
-                })
-            else:
-                session.set_option("twitch-disable-ads", True)
+            thread_started = time.monotonic()
+            latency = get_latency_tracker()
             
-            # Get streams
-            streams = session.streams(f"https://twitch.tv/{streamer}")
+            # Get streams with the pooled session, prefetched if possible
+            streams, resolve_details = self.session_pool.resolve(
+                streamer, TWITCH_STREAM_URL.format(streamer=streamer), auth_token
+            )
             
             if not streams:
                 print(f"[DownloadService] No streams found for {streamer}")
+                latency.discard(streamer)
+                handle.finalized.set()
+                self._notify_thread_completion(handle, 1, loop)
                 return False
+            latency.mark(streamer, "streams_resolved")
             
             # Get stream with selected resolution if available, otherwise best quality
             if selected_resolution in streams:
@@ -463,61 +704,206 @@ class DownloadService:
                 stream = streams["best"]
                 print(f"[DownloadService] Selected resolution {selected_resolution} not available, using best")
             
-            # Open stream
+            # Open stream and register it with the handle, so a stop can unblock reads
             fd = stream.open()
+            if not handle.attach_stream(fd):
+                handle.close_stream()
+                handle.finalized.set()
+                print(f"[DownloadService] Download cancelled for {streamer}")
+                return False
+            latency.mark(streamer, "stream_opened")
+            latency.annotate(streamer, cold_start=round(time.monotonic() - thread_started, 4), **resolve_details)
             
-            # Track this for cleanup
-            self._current_fd = fd
-            
-            # Write to file
-            with open(filepath, "wb") as f:
-                while not cancellation_flag.is_set():
+            # Write to file. After a cancel, reads no longer block and
+            # return what is still buffered, so that gets written out too
+            first_write = True
+            try:
+                with open(filepath, "wb") as f:
                     try:
-                        data = fd.read(1024 * 1024)  # Read 1MB at a time
-                        if not data:
-                            break
-                        f.write(data)
-                    except Exception as e:
-                        print(f"[DownloadService] Error during stream read: {e}")
-                        break
-                
-                # Properly flush the file
-                f.flush()
-            
-            # Ensure stream is properly closed
-            if fd:
-                try:
-                    fd.close()
-                except:
-                    pass
-                self._current_fd = None
+                        while not handle.draining_expired():
+                            try:
+                                data = fd.read(1024 * 1024)  # Read 1MB at a time
+                            except Exception as e:
+                                if not handle.cancelled:
+                                    print(f"[DownloadService] Error during stream read: {e}")
+                                break
+                            if not data:
+                                break
+                            try:
+                                f.write(data)
+                            except OSError:
+                                handle.bytes_lost += len(data)
+                                raise
+                            handle.bytes_written += len(data)
+                            if first_write:
+                                first_write = False
+                                latency.finish(streamer, filepath=filepath)
+                    finally:
+                        # Flush and fsync before anyone waiting on the stop continues
+                        handle.finalize(f)
+            finally:
+                # Ensure stream is properly closed
+                handle.close_stream()
             
-            if cancellation_flag.is_set():
+            if handle.cancelled:
                 print(f"[DownloadService] Download cancelled for {streamer}")
                 return False
                     
             print(f"[DownloadService] Download completed for {streamer}")
-            # Use the passed loop instead of trying to get it in the thread
-            asyncio.run_coroutine_threadsafe(
-                self._handle_download_completion(streamer, 0),  # 0 = success
-                loop
-            )
+            self._notify_thread_completion(handle, 0, loop)  # 0 = success
             return True
                 
         except Exception as e:
+            handle.finalized.set()
+            if handle.cancelled:
+                print(f"[DownloadService] Download cancelled for {streamer}")
+                return False
             print(f"[DownloadService] Error in download thread: {e}")
             import traceback
             traceback.print_exc()
-            # Also use the passed loop here if needed
-            try:
+            get_latency_tracker().discard(streamer)
+            self._notify_thread_completion(handle, 1, loop)  # 1 = error
+            return False
+
+    def _notify_thread_completion(self, handle, return_code, loop):
+        """
+        Hand a finished thread recording to the event loop.
+        
+        Skipped if the download was stopped and a new one took its place.
+        
+        Args:
+            handle (RecordingHandle): Handle of the finished recording
+            return_code (int): 0 on success, 1 on error
+            loop: Event loop of the service
+        """
+        current = self.active_downloads.get(handle.streamer, {})
+        if current.get("handle") is not handle:
+            return
+        try:
+            asyncio.run_coroutine_threadsafe(
+                self._handle_download_completion(handle.streamer, return_code),
+                loop
+            )
+        except Exception as loop_error:
+            print(f"[DownloadService] Error in completion notification: {loop_error}")
+        
+    async def _record_hls(self, recording, auth_token, selected_resolution):
+        """
+        Resolve a stream's playlist and record it with the HLS downloader.
+        
+        Args:
+            recording (HLSRecording): The recording to run
+            auth_token (str): Twitch auth-token cookie, or None
+            selected_resolution (str): Preferred quality, "best" if unavailable
+        """
+        streamer = recording.streamer
+        latency = get_latency_tracker()
+        try:
+            thread_started = time.monotonic()
+            loop = asyncio.get_running_loop()
+            
+            # Resolution is blocking; prefetched streams are used if available
+            streams, resolve_details = await loop.run_in_executor(
+                None, self.session_pool.resolve,
+                streamer, TWITCH_STREAM_URL.format(streamer=streamer), auth_token
+            )
+            if not streams:
+                print(f"[DownloadService] No streams found for {streamer}")
+                latency.discard(streamer)
+                return_code = 1
+            else:
+                latency.mark(streamer, "streams_resolved")
+                if selected_resolution in streams:
+                    stream = streams[selected_resolution]
+                else:
+                    stream = streams["best"]
+                    print(f"[DownloadService] Selected resolution {selected_resolution} not available, using best")
+                
+                playlist_url = getattr(stream, "url", None)
+                if not playlist_url:
+                    raise ValueError(f"{type(stream).__name__} is not an HLS stream")
+                latency.annotate(streamer, cold_start=round(time.monotonic() - thread_started, 4), **resolve_details)
+                
+                return_code = await self.hls_recorder.record(recording, playlist_url)
+        except Exception as e:
+            print(f"[DownloadService] Error in HLS recording of {streamer}: {e}")
+            latency.discard(streamer)
+            return_code = 1
+        
+        if recording.cancelled:
+            print(f"[DownloadService] Download cancelled for {streamer}")
+            return
+        
+        if return_code == 0:
+            print(f"[DownloadService] Download completed for {streamer}")
+        current = self.active_downloads.get(streamer, {})
+        if current.get("recording") is recording:
+            await self._handle_download_completion(streamer, return_code)
+
+    def _on_recording_message(self, recording, message):
+        """
+        Handle a message from a recording worker process.
+        
+        Called from the recording supervisor thread, so anything touching
+        the service's state is handed to the event loop.
+        
+        Args:
+            recording (RecordingProcess): Handle of the worker
+            message (tuple): Message as described in recording_processes
+        """
+        streamer = recording.streamer
+        kind = message[0]
+        latency = get_latency_tracker()
+        
+        if kind == "log":
+            print(message[1])
+        elif kind == "stage":
+            latency.mark(streamer, message[1], at=message[2])
+            if message[1] == "stream_opened" and recording.started_at is not None:
+                # Measured from the hand-over, so taking a spare or starting
+                # a new worker counts too
+                latency.annotate(streamer, cold_start=round(message[2] - recording.started_at, 4))
+        elif kind == "details":
+            latency.annotate(streamer, **message[1])
+        elif kind == "first_byte":
+            latency.finish(streamer, filepath=recording.filepath, at=message[1])
+        elif kind == "cancelled":
+            print(f"[DownloadService] Download cancelled for {streamer}")
+        elif kind == "done":
+            return_code, error = message[1], message[2]
+            if return_code == 0:
+                print(f"[DownloadService] Download completed for {streamer}")
+            else:
+                print(f"[DownloadService] Error in download process for {streamer}: {error}")
+                latency.discard(streamer)
+            
+            # A recording that was stopped and restarted already has a new worker
+            current = self.active_downloads.get(streamer, {})
+            if current.get("process") is recording and self._loop is not None:
                 asyncio.run_coroutine_threadsafe(
-                    self._handle_download_completion(streamer, 1),  # 1 = error
-                    loop
+                    self._handle_download_completion(streamer, return_code),
+                    self._loop
                 )
-            except Exception as loop_error:
-                print(f"[DownloadService] Error in completion notification: {loop_error}")
-            return False
+
+    def get_engine_stats(self):
+        """
+        Get the recording engine in use and its counters.
         
+        Returns:
+            dict: Engine name, number of active downloads and the recording
+                  thread (thread engine), worker process (process engine) or
+                  segment (hls engine) counters
+        """
+        stats = {"engine": self.engine, "active": len(self.active_downloads)}
+        handles = [info["handle"] for info in list(self.active_downloads.values()) if "handle" in info]
+        if handles:
+            stats["threads"] = [handle.get_stats() for handle in handles]
+        if self.recording_processes is not None:
+            stats["processes"] = self.recording_processes.get_stats()
+        if self.hls_recorder is not None:
+            stats["hls"] = self.hls_recorder.get_stats()
+        return stats
+
     async def _handle_download_completion(self, streamer, return_code):
         """
         Handle download completion for a streamer.
@@ -529,17 +915,13 @@ class DownloadService:
         # Set a cooldown to prevent immediate restart
         self.download_cooldowns[streamer] = time.time() + self.cooldown_duration
         
-        # Get streamers data to update status
-        from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
-        streamers = get_monitored_streamers()
+        from backend.src.config.settings import streamer_store
         
         status = "completed" if return_code == 0 else "error"
         
         # Update the status in persistent storage
-        if streamer in streamers:
+        if streamer_store.patch(streamer, downloadStatus=status):
             print(f"[DownloadService] Updating downloadStatus for {streamer} to {status}")
-            streamers[streamer]["downloadStatus"] = status
-            update_monitored_streamers(streamers)
         
         # Broadcast status update to clients
         print(f"[DownloadService] Broadcasting download status for {streamer}: {status}")
@@ -563,10 +945,18 @@ class DownloadService:
         if enabled:
             # Add to configured streamers
             self.configured_streamers.add(streamer)
+            if self.recording_processes is not None:
+                self.recording_processes.set_spares(self._spare_workers())
+            
+            # Start right away if the streamer is already live, without
+            # holding up the caller
+            asyncio.create_task(self._on_stream_online(streamer))
         else:
             # Remove from configured streamers
             if streamer in self.configured_streamers:
                 self.configured_streamers.remove(streamer)
+            if self.recording_processes is not None:
+                self.recording_processes.set_spares(self._spare_workers())
                 
             # IMPORTANT: Stop any active download immediately when disabled
             if streamer in self.active_downloads:
@@ -582,18 +972,25 @@ class DownloadService:
         """
         
         # Get all configured streamers with downloads enabled
-        from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
+        from backend.src.config.settings import get_monitored_streamers, streamer_store
         streamers = get_monitored_streamers()
         
         # Create GQL client to query Twitch directly
-        from backend.src.services.gql_client import GQLClient
-        gql_client = GQLClient()
+        from backend.src.services.gql_client import get_gql_client
+        gql_client = get_gql_client()
         
         # Track which streamers were found to be live
         updated_streamers = {}
         live_streamers_found = []
         
-        # Query each configured streamer's status
+        # Query fresh status for all configured streamers in batched requests
+        channels_info = await gql_client.get_channels_info([
+            settings.get("twitch_id", "")
+            for streamer_name, settings in streamers.items()
+            if streamer_name in self.configured_streamers
+        ])
+        
+        # Reconcile each configured streamer's status
         for streamer_name, settings in streamers.items():
             # Skip streamers that don't have downloads enabled
             if streamer_name not in self.configured_streamers:
@@ -606,21 +1003,24 @@ class DownloadService:
                 continue
                 
             try:
-                # Direct query to Twitch API for fresh status
-                channel_info = await gql_client.get_channel_info(twitch_id)
+                # Fresh status from the batched query
+                channel_info = channels_info.get(twitch_id)
                 
                 if channel_info:
                     # Determine if the streamer is live from fresh data
                     is_live = bool(channel_info.get("stream"))
                     
                     # Update the cached state
-                    streamers[streamer_name]["isLive"] = is_live
+                    fresh_fields = {"isLive": is_live}
                     
                     # Update metadata if available
                     if channel_info.get("title"):
-                        streamers[streamer_name]["title"] = channel_info.get("title")
+                        fresh_fields["title"] = channel_info.get("title")
                     if channel_info.get("thumbnail"):
-                        streamers[streamer_name]["thumbnail"] = channel_info.get("thumbnail")
+                        fresh_fields["thumbnail"] = channel_info.get("thumbnail")
+                    
+                    streamers[streamer_name].update(fresh_fields)
+                    streamer_store.patch(streamer_name, **fresh_fields)
                     
                     # Start download if streamer is live and not already downloading
                     if is_live and streamer_name not in self.active_downloads:
@@ -631,9 +1031,6 @@ class DownloadService:
             except Exception as e:
                 print(f"[DownloadService] Error reconciling {streamer_name}: {e}")
         
-        # Save the updated streamer data
-        update_monitored_streamers(streamers)
-        
     
     async def _get_auth_token(self):
         """
@@ -0,0 +1,149 @@
+"""
+In-process publish/subscribe bus for stream state changes.
+
+EventSubService and the polling fallback in StreamMonitorService find out
+that a stream went live or offline; DownloadService has to act on it. They
+used to meet only through the streamer settings, which the download monitor
+re-read every few seconds, so a recording started up to one poll interval
+after the go-live. Publishing the transition lets subscribers react at once.
+
+publish() never waits for subscribers: each async handler runs as its own
+task, so a slow handler (starting a download takes seconds) doesn't hold up
+the EventSub receive path or other subscribers. Handler errors are logged
+and counted, never raised to the publisher.
+
+Usage:
+    bus = get_event_bus()
+    bus.subscribe(STREAM_ONLINE, on_online)
+    bus.publish(STREAM_ONLINE, streamer="name", user_id="123", source="eventsub")
+"""
+
+import asyncio
+import inspect
+import time
+from typing import Any, Callable, Dict, List, Optional, Set
+
+# Topics
+STREAM_ONLINE = "stream.online"
+STREAM_OFFLINE = "stream.offline"
+
+
+class EventBus:
+    """
+    Topic-based fan-out of events to in-process subscribers.
+
+    Attributes:
+        _subscribers (Dict[str, List[Callable]]): Topic to handlers, in
+            subscription order
+        _tasks (Set[asyncio.Task]): Handler tasks still running
+        _stats (Dict[str, int]): Published, delivered and failed counters
+    """
+
+    def __init__(self):
+        """Initialize a bus without subscribers."""
+        self._subscribers: Dict[str, List[Callable[..., Any]]] = {}
+        self._tasks: Set[asyncio.Task] = set()
+        self._stats = {"published": 0, "delivered": 0, "failed": 0}
+
+    def subscribe(self, topic: str, handler: Callable[..., Any]) -> None:
+        """
+        Register a handler for a topic.
+
+        Args:
+            topic: Topic name, e.g. STREAM_ONLINE
+            handler: Function or coroutine function called with the event's
+                keyword arguments
+        """
+        handlers = self._subscribers.setdefault(topic, [])
+        if handler not in handlers:
+            handlers.append(handler)
+
+    def unsubscribe(self, topic: str, handler: Callable[..., Any]) -> None:
+        """
+        Remove a handler from a topic.
+
+        Args:
+            topic: Topic name
+            handler: Handler passed to subscribe()
+        """
+        handlers = self._subscribers.get(topic, [])
+        if handler in handlers:
+            handlers.remove(handler)
+
+    def publish(self, topic: str, **event: Any) -> int:
+        """
+        Deliver an event to the topic's subscribers without waiting for them.
+
+        Must be called from the event loop. Plain functions are called
+        directly, coroutine functions are scheduled as tasks.
+
+        Args:
+            topic: Topic name
+            **event: Event fields passed to every handler; "published_at" is
+                added if missing
+
+        Returns:
+            int: Number of handlers the event was delivered to
+        """
+        self._stats["published"] += 1
+        event.setdefault("published_at", time.time())
+
+        handlers = list(self._subscribers.get(topic, []))
+        for handler in handlers:
+            if inspect.iscoroutinefunction(handler):
+                task = asyncio.create_task(self._run(topic, handler, event))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+            else:
+                self._call(topic, handler, event)
+        return len(handlers)
+
+    async def _run(self, topic: str, handler: Callable[..., Any], event: Dict[str, Any]) -> None:
+        """Run an async handler, logging its errors."""
+        try:
+            await handler(**event)
+            self._stats["delivered"] += 1
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self._stats["failed"] += 1
+            print(f"[EventBus] Error in {topic} handler {getattr(handler, '__qualname__', handler)}: {e}")
+
+    def _call(self, topic: str, handler: Callable[..., Any], event: Dict[str, Any]) -> None:
+        """Call a plain handler, logging its errors."""
+        try:
+            handler(**event)
+            self._stats["delivered"] += 1
+        except Exception as e:
+            self._stats["failed"] += 1
+            print(f"[EventBus] Error in {topic} handler {getattr(handler, '__qualname__', handler)}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return delivery counters.
+
+        Returns:
+            Dict[str, Any]: Published, delivered and failed counts, handlers
+            still running and subscribers per topic
+        """
+        return {
+            **self._stats,
+            "running": len(self._tasks),
+            "subscribers": {topic: len(handlers) for topic, handlers in self._subscribers.items()},
+        }
+
+
+_event_bus: Optional[EventBus] = None
+
+
+def get_event_bus() -> EventBus:
+    """
+    Return the process-wide event bus.
+
+    Returns:
+        EventBus: Shared bus, created on first use
+    """
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = EventBus()
+    return _event_bus
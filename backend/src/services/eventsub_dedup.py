@@ -0,0 +1,168 @@
+"""
+Duplicate and ordering guard for EventSub notifications.
+
+Twitch delivers notifications at least once. With several connections,
+reconnect handoffs and redeliveries, the same stream.online can arrive more
+than once, and an old notification can arrive after a newer one. Handling
+each delivery rewrites the streamer settings, broadcasts to the frontend
+and may trigger subscription changes, so repeats and stale events are
+dropped before any of that happens:
+
+- metadata.message_id is remembered for a time window (bounded in size);
+  a message seen before is a duplicate
+- per broadcaster, the time of the last applied event of each type is
+  kept. A stream.online is out of order if its event.started_at is older
+  than the last stream.online's. Any other event is out of order if its
+  metadata.message_timestamp is older than the last event of any type
+
+stream.online is only compared with stream.online. Twitch often sends
+stream.offline late, so after a quick restart the new stream's started_at
+can be earlier than the offline message's timestamp even though the
+go-live is newer.
+
+Usage:
+    guard = NotificationGuard()
+    reason = guard.check(data)
+    if reason:
+        return  # "duplicate" or "out_of_order"
+"""
+
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+# Seconds a message ID is remembered (Twitch redelivers within minutes)
+NOTIFICATION_DEDUP_WINDOW = 10 * 60
+
+# Maximum number of message IDs remembered
+NOTIFICATION_DEDUP_MAX_ENTRIES = 10000
+
+
+def parse_event_time(value: Optional[str]) -> Optional[float]:
+    """
+    Parse an RFC3339 timestamp as sent by Twitch.
+
+    Twitch sends up to nanosecond precision, which older versions of
+    datetime.fromisoformat() reject, so the fraction is cut to microseconds.
+
+    Args:
+        value: Timestamp such as "2023-07-19T14:56:51.634234626Z"
+
+    Returns:
+        Optional[float]: Epoch seconds, or None if missing or invalid
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.endswith("Z"):
+        value = value[:-1] + "+00:00"
+    if "." in value:
+        head, rest = value.split(".", 1)
+        digits = len(rest) - len(rest.lstrip("0123456789"))
+        value = f"{head}.{rest[:min(digits, 6)]}{rest[digits:]}"
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+class NotificationGuard:
+    """
+    Drops duplicate and out-of-order EventSub notifications.
+
+    Attributes:
+        window (float): Seconds a message ID is remembered
+        max_entries (int): Maximum number of message IDs remembered
+        _seen (OrderedDict): Message ID to time received, oldest first
+        _last_event (Dict[str, Dict[str, float]]): Broadcaster user_id to
+            event type to the time of the last applied event of that type
+        _stats (Dict[str, int]): Accepted, duplicate and out-of-order counters
+    """
+
+    def __init__(self, window: float = NOTIFICATION_DEDUP_WINDOW,
+                 max_entries: int = NOTIFICATION_DEDUP_MAX_ENTRIES):
+        """
+        Initialize an empty guard.
+
+        Args:
+            window: Seconds a message ID is remembered
+            max_entries: Maximum number of message IDs remembered
+        """
+        self.window = window
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[str, float]" = OrderedDict()
+        self._last_event: Dict[str, Dict[str, float]] = {}
+        self._stats = {"accepted": 0, "duplicates": 0, "out_of_order": 0}
+
+    def _expire(self, now: float) -> None:
+        """Forget message IDs older than the window or beyond the size bound."""
+        while self._seen:
+            message_id, received = next(iter(self._seen.items()))
+            if now - received < self.window and len(self._seen) <= self.max_entries:
+                break
+            del self._seen[message_id]
+
+    def check(self, data: Dict[str, Any], now: Optional[float] = None) -> Optional[str]:
+        """
+        Check a notification and record it if it should be handled.
+
+        Args:
+            data: Notification message as received on the WebSocket
+            now: Current time, defaults to time.monotonic()
+
+        Returns:
+            Optional[str]: "duplicate" or "out_of_order" if the notification
+            should be dropped, None if it should be handled
+        """
+        now = time.monotonic() if now is None else now
+        self._expire(now)
+
+        metadata = data.get("metadata") or {}
+        message_id = metadata.get("message_id")
+        if message_id and message_id in self._seen:
+            self._stats["duplicates"] += 1
+            return "duplicate"
+
+        event = (data.get("payload") or {}).get("event") or {}
+        user_id = event.get("broadcaster_user_id")
+        event_type = metadata.get("subscription_type", "")
+        if event_type == "stream.online":
+            event_time = parse_event_time(event.get("started_at")) or parse_event_time(metadata.get("message_timestamp"))
+        else:
+            event_time = parse_event_time(metadata.get("message_timestamp"))
+
+        if user_id and event_time is not None:
+            last = self._last_event.setdefault(user_id, {})
+            if event_type == "stream.online":
+                # started_at and message timestamps are different clocks
+                newest = last.get(event_type)
+            else:
+                newest = max(last.values(), default=None)
+            if newest is not None and event_time < newest:
+                self._stats["out_of_order"] += 1
+                if message_id:
+                    self._seen[message_id] = now
+                return "out_of_order"
+            last[event_type] = max(event_time, last.get(event_type, event_time))
+
+        if message_id:
+            self._seen[message_id] = now
+        self._stats["accepted"] += 1
+        return None
+
+    def reset(self) -> None:
+        """Forget all message IDs and event times."""
+        self._seen.clear()
+        self._last_event.clear()
+        self._stats = {"accepted": 0, "duplicates": 0, "out_of_order": 0}
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return guard counters.
+
+        Returns:
+            Dict[str, Any]: Accepted, duplicate and out-of-order counts plus
+            the number of remembered message IDs
+        """
+        return {**self._stats, "remembered": len(self._seen)}
@@ -0,0 +1,203 @@
+"""
+Queue between the EventSub receive loops and notification processing.
+
+Handling a notification writes the streamer settings, broadcasts to the
+frontend and may call Helix. Doing that inline in the WebSocket receive
+loop delays reading the next frame, which can trip the receive timeout and
+Twitch's keepalive deadline. The receive loop only enqueues instead, and a
+pool of workers does the processing.
+
+Events of one broadcaster must be handled in the order they arrived, so the
+queue is split into one bounded queue per worker and each broadcaster is
+always routed to the same worker. Different broadcasters are processed in
+parallel.
+
+Enqueuing never waits. If a worker's queue is full the notification is
+dropped and counted; the periodic status polling of the background service
+corrects the streamer's status.
+
+Usage:
+    dispatcher = NotificationDispatcher(handler=service._handle_notification)
+    dispatcher.start()
+    dispatcher.submit(data)
+    await dispatcher.stop()
+"""
+
+import asyncio
+import time
+import zlib
+from typing import Any, Awaitable, Callable, Dict, List
+
+# Workers processing notifications in parallel
+NOTIFICATION_WORKERS = 4
+
+# Maximum notifications waiting per worker
+NOTIFICATION_QUEUE_SIZE = 250
+
+# Seconds stop() waits for queued notifications to be processed
+NOTIFICATION_DRAIN_TIMEOUT = 5.0
+
+
+class NotificationDispatcher:
+    """
+    Per-broadcaster ordered worker pool for EventSub notifications.
+
+    Attributes:
+        workers (int): Number of workers (and queues)
+        queue_size (int): Maximum notifications waiting per worker
+        _handler (Callable): async handler(data) processing one notification
+        _queues (List[asyncio.Queue]): One queue per worker, items are
+            (enqueue time, data)
+        _tasks (List[asyncio.Task]): Worker tasks
+        _stats (Dict[str, Any]): Throughput, drop and lag counters
+    """
+
+    def __init__(self, handler: Callable[[Dict[str, Any]], Awaitable[None]],
+                 workers: int = NOTIFICATION_WORKERS,
+                 queue_size: int = NOTIFICATION_QUEUE_SIZE):
+        """
+        Initialize the dispatcher without starting it.
+
+        Args:
+            handler: async handler(data) processing one notification
+            workers: Number of workers
+            queue_size: Maximum notifications waiting per worker
+        """
+        self._handler = handler
+        self.workers = max(1, workers)
+        self.queue_size = queue_size
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        """Return zeroed counters."""
+        return {
+            "enqueued": 0,
+            "processed": 0,
+            "failed": 0,
+            "dropped": 0,
+            "max_depth": 0,
+            "last_lag": 0.0,
+            "max_lag": 0.0,
+            "total_lag": 0.0,
+            "total_processing": 0.0,
+        }
+
+    @property
+    def running(self) -> bool:
+        """Whether the workers are running."""
+        return any(not task.done() for task in self._tasks)
+
+    @property
+    def depth(self) -> int:
+        """Number of notifications waiting to be processed."""
+        return sum(queue.qsize() for queue in self._queues)
+
+    def start(self) -> None:
+        """Create the queues and start the workers in the running event loop."""
+        if self.running:
+            return
+        self._queues = [asyncio.Queue(maxsize=self.queue_size) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(queue)) for queue in self._queues]
+
+    async def stop(self, drain_timeout: float = NOTIFICATION_DRAIN_TIMEOUT) -> None:
+        """
+        Stop the workers, giving queued notifications a moment to finish.
+
+        Args:
+            drain_timeout: Seconds to wait for the queues to empty
+        """
+        if self._queues and drain_timeout > 0:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(queue.join() for queue in self._queues)),
+                    timeout=drain_timeout,
+                )
+            except asyncio.TimeoutError:
+                print(f"[EventSub] Discarding {self.depth} queued notifications on shutdown")
+
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queues = []
+
+    def _queue_for(self, data: Dict[str, Any]) -> asyncio.Queue:
+        """Return the queue of the notification's broadcaster."""
+        event = (data.get("payload") or {}).get("event") or {}
+        key = str(event.get("broadcaster_user_id", ""))
+        return self._queues[zlib.crc32(key.encode()) % len(self._queues)]
+
+    def submit(self, data: Dict[str, Any]) -> bool:
+        """
+        Queue a notification for processing without waiting.
+
+        Args:
+            data: Notification message as received on the WebSocket
+
+        Returns:
+            bool: True if queued, False if it was dropped
+        """
+        if not self._queues:
+            self._stats["dropped"] += 1
+            print("[EventSub] Notification dispatcher is not running, dropping notification")
+            return False
+
+        try:
+            self._queue_for(data).put_nowait((time.monotonic(), data))
+        except asyncio.QueueFull:
+            self._stats["dropped"] += 1
+            print(f"[EventSub] Notification queue full, dropping "
+                  f"{(data.get('metadata') or {}).get('subscription_type')} notification")
+            return False
+
+        self._stats["enqueued"] += 1
+        self._stats["max_depth"] = max(self._stats["max_depth"], self.depth)
+        return True
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        """Process one queue's notifications in order."""
+        while True:
+            enqueued_at, data = await queue.get()
+            started = time.monotonic()
+            lag = started - enqueued_at
+            self._stats["last_lag"] = lag
+            self._stats["max_lag"] = max(self._stats["max_lag"], lag)
+            self._stats["total_lag"] += lag
+            try:
+                await self._handler(data)
+                self._stats["processed"] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self._stats["failed"] += 1
+                print(f"[EventSub] Error processing notification: {e}")
+            finally:
+                self._stats["total_processing"] += time.monotonic() - started
+                queue.task_done()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return queue depth, throughput and lag metrics.
+
+        Returns:
+            Dict[str, Any]: Current depth, counters, and lag (enqueue to start
+            of processing) and processing times in seconds
+        """
+        stats = self._stats
+        handled = stats["processed"] + stats["failed"]
+        return {
+            "depth": self.depth,
+            "max_depth": stats["max_depth"],
+            "workers": self.workers,
+            "enqueued": stats["enqueued"],
+            "processed": stats["processed"],
+            "failed": stats["failed"],
+            "dropped": stats["dropped"],
+            "last_lag": round(stats["last_lag"], 4),
+            "max_lag": round(stats["max_lag"], 4),
+            "avg_lag": round(stats["total_lag"] / handled, 4) if handled else 0.0,
+            "avg_processing": round(stats["total_processing"] / handled, 4) if handled else 0.0,
+        }
@@ -0,0 +1,309 @@
+"""
+Declarative reconciliation of EventSub subscriptions.
+
+Instead of creating and deleting subscriptions by hand on every event, the
+EventSubService describes the subscriptions it wants - both stream event
+types per monitored channel in dual mode, otherwise the one matching its
+live status, on the session of the channel's shard - and the reconciler
+makes Twitch match:
+
+1. list the subscriptions Twitch actually has
+2. diff them against the desired set
+3. create what's missing and delete what's no longer wanted, concurrently
+   (the shared Helix rate limiter paces the requests)
+
+Passes run when something changes (a session is welcomed, a channel goes
+live, the roster changes, a subscription is revoked) and periodically as a
+safety net. Requests that arrive while a pass is running are folded into
+the next pass, so a burst of events costs one listing and one set of
+changes.
+
+Only stream.online/stream.offline WebSocket subscriptions are considered.
+Enabled subscriptions on sessions this process never owned are left alone,
+they may belong to another client of the same token.
+
+Usage:
+    reconciler = SubscriptionReconciler(
+        desired=service._desired_subscriptions,
+        list_actual=service._list_twitch_subscriptions,
+        create=service._create_subscription,
+        delete=service._delete_subscription,
+    )
+    reconciler.start()
+    reconciler.add_session(session_id)
+    reconciler.request()
+"""
+
+import asyncio
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+# Event types managed by the reconciler
+STREAM_EVENT_TYPES = ("stream.online", "stream.offline")
+
+# Seconds between full passes against a fresh listing
+RECONCILE_INTERVAL = 15 * 60
+
+# Seconds to wait after a request so a burst of events is handled in one pass
+RECONCILE_DEBOUNCE = 0.5
+
+# (broadcaster user_id, event type, WebSocket session_id)
+SubscriptionKey = Tuple[str, str, str]
+
+
+def subscription_key(sub: Dict[str, Any]) -> Optional[SubscriptionKey]:
+    """
+    Return the reconciliation key of a Helix subscription object.
+
+    Args:
+        sub: Subscription object as returned by Helix
+
+    Returns:
+        Optional[SubscriptionKey]: (user_id, event_type, session_id), or None
+        for subscriptions the reconciler doesn't manage
+    """
+    transport = sub.get("transport") or {}
+    user_id = (sub.get("condition") or {}).get("broadcaster_user_id")
+    if transport.get("method") != "websocket" or sub.get("type") not in STREAM_EVENT_TYPES or not user_id:
+        return None
+    return (user_id, sub["type"], transport.get("session_id"))
+
+
+def diff_subscriptions(desired: Dict[SubscriptionKey, str],
+                       actual: List[Dict[str, Any]],
+                       owned_sessions: Set[str]) -> Dict[str, Any]:
+    """
+    Compute the changes that turn the actual subscriptions into the desired ones.
+
+    Args:
+        desired: Desired subscription keys mapped to the streamer name
+        actual: Subscription objects currently on Twitch
+        owned_sessions: Session IDs this process has used
+
+    Returns:
+        Dict[str, Any]: {"create": [(key, streamer_name)],
+        "delete": [subscription objects], "keep": {key: subscription}}
+    """
+    keep: Dict[SubscriptionKey, Dict[str, Any]] = {}
+    delete: List[Dict[str, Any]] = []
+
+    for sub in actual:
+        key = subscription_key(sub)
+        if key is None:
+            continue
+
+        enabled = sub.get("status") == "enabled"
+        if enabled and key in desired and key not in keep:
+            keep[key] = sub
+        elif key in keep or not enabled or key[2] in owned_sessions:
+            # Duplicates, dead subscriptions and anything of ours that is no
+            # longer wanted (wrong type, old session, removed streamer)
+            delete.append(sub)
+
+    create = [(key, name) for key, name in desired.items() if key not in keep]
+    return {"create": create, "delete": delete, "keep": keep}
+
+
+class SubscriptionReconciler:
+    """
+    Converges Twitch's EventSub subscriptions to a desired set.
+
+    The reconciler owns the record of which subscriptions exist; the
+    service derives its views (active subscriptions, subscriptions per
+    session) from it instead of maintaining them by hand.
+
+    Attributes:
+        interval (float): Seconds between periodic passes
+        debounce (float): Seconds to wait after a request before a pass
+        owned_sessions (Set[str]): Session IDs this process has used
+        tracked (Dict[SubscriptionKey, str]): Subscriptions known to exist
+            after the last pass, mapped to the streamer name
+        _desired (Callable): Returns the desired subscription keys
+        _list_actual (Callable): Lists Twitch's subscriptions, takes a
+            refresh flag
+        _create (Callable): Creates a subscription, returns success
+        _delete (Callable): Deletes a subscription by ID, returns success
+        _wakeup (Optional[asyncio.Event]): Set when a pass is requested
+        _task (Optional[asyncio.Task]): Background loop running the passes
+        _lock (Optional[asyncio.Lock]): Serializes passes
+        _stats (Dict[str, Any]): Pass and change counters
+    """
+
+    def __init__(self,
+                 desired: Callable[[], Dict[SubscriptionKey, str]],
+                 list_actual: Callable[[bool], Awaitable[List[Dict[str, Any]]]],
+                 create: Callable[[str, str, str, str], Awaitable[bool]],
+                 delete: Callable[[str], Awaitable[bool]],
+                 interval: float = RECONCILE_INTERVAL,
+                 debounce: float = RECONCILE_DEBOUNCE):
+        """
+        Initialize the reconciler without starting it.
+
+        Args:
+            desired: Returns {(user_id, event_type, session_id): streamer_name}
+            list_actual: async list_actual(refresh) returning subscription objects
+            create: async create(session_id, user_id, streamer_name, event_type)
+            delete: async delete(subscription_id)
+            interval: Seconds between periodic passes
+            debounce: Seconds to wait after a request before a pass
+        """
+        self._desired = desired
+        self._list_actual = list_actual
+        self._create = create
+        self._delete = delete
+        self.interval = interval
+        self.debounce = debounce
+
+        self.owned_sessions: Set[str] = set()
+        self.tracked: Dict[SubscriptionKey, str] = {}
+
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._stats = self._empty_stats()
+
+    @staticmethod
+    def _empty_stats() -> Dict[str, Any]:
+        """Return zeroed pass counters."""
+        return {
+            "passes": 0,
+            "created": 0,
+            "deleted": 0,
+            "failed": 0,
+            "last_pass": 0,
+            "last_error": None,
+        }
+
+    def reset(self) -> None:
+        """Forget all sessions and tracked subscriptions."""
+        self.owned_sessions = set()
+        self.tracked = {}
+        self._stats = self._empty_stats()
+
+    def add_session(self, session_id: str) -> None:
+        """Record a session ID as ours so leftovers on it get cleaned up."""
+        self.owned_sessions.add(session_id)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Start the background loop in the running event loop."""
+        self._wakeup = asyncio.Event()
+        self._lock = asyncio.Lock()
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        """Stop the background loop, waiting for a running pass to finish."""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+
+    def request(self) -> None:
+        """Ask for a pass soon. Cheap, can be called on every event."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def _run(self) -> None:
+        """Run a pass whenever requested, and a full pass every interval."""
+        while True:
+            try:
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.interval)
+                    refresh = False
+                except asyncio.TimeoutError:
+                    # Periodic safety net against a fresh listing
+                    refresh = True
+
+                await asyncio.sleep(self.debounce)
+                self._wakeup.clear()
+                await self.reconcile(refresh=refresh)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"[EventSub] Error in subscription reconciler: {e}")
+                await asyncio.sleep(5)
+
+    # ------------------------------------------------------------------
+    # Reconciliation
+    # ------------------------------------------------------------------
+
+    async def reconcile(self, refresh: bool = False) -> Dict[str, int]:
+        """
+        Run one pass: list, diff and apply.
+
+        Args:
+            refresh: List again even if a recent listing is available
+
+        Returns:
+            Dict[str, int]: Numbers of subscriptions created, deleted and
+            failed changes in this pass
+        """
+        lock = self._lock or asyncio.Lock()
+        async with lock:
+            try:
+                actual = await self._list_actual(refresh)
+            except Exception as e:
+                self._stats["last_error"] = str(e)
+                print(f"[EventSub] Reconciler could not list subscriptions: {e}")
+                return {"created": 0, "deleted": 0, "failed": 0}
+
+            # Read the desired state after listing, so events that arrived
+            # while waiting for Twitch are included
+            desired = self._desired()
+            changes = diff_subscriptions(desired, actual, self.owned_sessions)
+
+            creates = [
+                self._create(session_id, user_id, name, event_type)
+                for (user_id, event_type, session_id), name in changes["create"]
+            ]
+            deletes = [self._delete(sub["id"]) for sub in changes["delete"] if sub.get("id")]
+            results = await asyncio.gather(*creates, *deletes, return_exceptions=True)
+
+            create_results = results[:len(creates)]
+            delete_results = results[len(creates):]
+
+            tracked = {key: desired[key] for key in changes["keep"]}
+            for (key, name), result in zip(changes["create"], create_results):
+                if result is True:
+                    tracked[key] = name
+            self.tracked = tracked
+
+            created = sum(1 for r in create_results if r is True)
+            deleted = sum(1 for r in delete_results if r is True)
+            failed = len(results) - created - deleted
+
+            self._stats["passes"] += 1
+            self._stats["created"] += created
+            self._stats["deleted"] += deleted
+            self._stats["failed"] += failed
+            self._stats["last_pass"] = time.time()
+            self._stats["last_error"] = None
+
+            if results:
+                print(f"[EventSub] Reconciled subscriptions: {created} created, {deleted} deleted"
+                      + (f", {failed} failed" if failed else "")
+                      + f" ({len(tracked)}/{len(desired)} in place)")
+
+            return {"created": created, "deleted": deleted, "failed": failed}
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Summarize the reconciler state.
+
+        Returns:
+            Dict[str, Any]: Tracked subscription count, owned sessions and
+            pass counters
+        """
+        return {
+            **self._stats,
+            "tracked": len(self.tracked),
+            "owned_sessions": len(self.owned_sessions),
+            "running": self._task is not None and not self._task.done(),
+        }
@@ -5,7 +5,6 @@ import json
 import time
 import os
 import traceback
-import random
 import logging
 from typing import Dict, Set, List, Any, Optional
 import websockets
@@ -13,13 +12,30 @@ import aiohttp
 import ssl
 import certifi
 
-from backend.src.config.constants import EVENTSUB_CLIENT_ID
-from backend.src.config.settings import get_monitored_streamers, update_monitored_streamers
+from backend.src.config.constants import EVENTSUB_CLIENT_ID, EVENTSUB_DUAL_SUBSCRIPTIONS
+from backend.src.config.settings import get_monitored_streamers, streamer_store
+from backend.src.services.eventsub_shards import EventSubShardPlanner
+from backend.src.services.rate_limiter import get_rate_limiter
+from backend.src.services.helix_subscriptions import EVENTSUB_SUBSCRIPTIONS_URL, SubscriptionSnapshot
+from backend.src.services.eventsub_reconciler import SubscriptionReconciler
+from backend.src.services.eventsub_dedup import NotificationGuard, parse_event_time
+from backend.src.services.eventsub_dispatcher import NotificationDispatcher
+from backend.src.services.recording_latency import get_latency_tracker
+from backend.src.services.gql_client import get_gql_client
+from backend.src.services.event_bus import STREAM_OFFLINE, STREAM_ONLINE, get_event_bus
 
 # Set up a dedicated logger for EventSub with levels
 logger = logging.getLogger("eventsub")
 logger.setLevel(logging.INFO)  # Set default level - can be changed to DEBUG for more details
 
+EVENTSUB_WEBSOCKET_URL = "wss://eventsub.wss.twitch.tv/ws"
+
+# Seconds to wait for the welcome on a session_reconnect URL (Twitch allows 30)
+HANDOFF_WELCOME_TIMEOUT = 30
+
+# Seconds to keep reading the old socket for messages sent before the handoff
+HANDOFF_DRAIN_TIMEOUT = 0.5
+
 class EventSubService:
     """
     Service that manages Twitch EventSub WebSocket connections for real-time
@@ -37,32 +53,80 @@ class EventSubService:
         self.websocket_manager = websocket_manager
         self.running = False
         self.ws_connections = []  # Active WebSocket connections to Twitch
-        self.active_subscriptions = {}  # Tracks stream ID to subscription mapping
-        self.session_ids = []  # Active session identifiers
         self.token = None  # Twitch OAuth token
         self.token_error = None  # Stores auth error messages
         self.max_connections = 3  # Maximum parallel connections to Twitch
         self.connection_tasks = []  # AsyncIO tasks for active connections
         
-        # Tracks ongoing unsubscribe operations to prevent duplicates
-        self.pending_unsubscribes = set()
-        
-        # Maps session IDs to subscriptions for better reconnection handling
-        self.subscriptions_by_session = {}  # session_id -> {user_id: event_type}
+        # Assigns streamers to connections within Twitch's transport limits
+        self.shard_planner = EventSubShardPlanner(max_sessions=self.max_connections,
+                                                  dual=EVENTSUB_DUAL_SUBSCRIPTIONS)
+        self.reported_uncovered = []  # Uncovered streamers already logged
         
         # Connection state tracking for efficient reconnection
         self.last_connection_state = {}
-        self.reconnect_urls = {}
+        self.handoff_stats = {"completed": 0, "failed": 0}
+        
+        # Token bucket shared by every Helix caller, adapts to Ratelimit-* headers
+        self.helix_limiter = get_rate_limiter("helix")
+        
+        # Drops redelivered and stale notifications before they're handled
+        self.notification_guard = NotificationGuard()
+        
+        # Workers handling notifications, so the receive loops only enqueue
+        self.notification_dispatcher = NotificationDispatcher(handler=self._handle_notification)
+        
+        # Short-lived copy of Twitch's subscription list, shared by cleanup paths
+        self.subscription_snapshot = SubscriptionSnapshot()
+        self._cost_listing = 0  # Listing the planner's external cost was taken from
         
-        # Rate limiting for Twitch API
-        self.subscription_rate_limiter = asyncio.Semaphore(5)
-        self.retry_after = 0  # Timestamp when to retry after hitting rate limits
+        # Converges Twitch's subscriptions to the ones the shards need. It is
+        # the only writer of subscription state; the views below derive from it
+        self.reconciler = SubscriptionReconciler(
+            desired=self._desired_subscriptions,
+            list_actual=self._list_twitch_subscriptions,
+            create=self._create_subscription,
+            delete=self._delete_subscription,
+        )
+
+    @property
+    def active_subscriptions(self):
+        """
+        Subscriptions in place after the last reconciliation, by streamer.
+        
+        Returns:
+            dict: user_id -> {"streamer", "event_types", "session_id"}
+        """
+        by_user = {}
+        for (user_id, event_type, session_id), name in sorted(self.reconciler.tracked.items()):
+            entry = by_user.setdefault(user_id, {"streamer": name, "event_types": [], "session_id": session_id})
+            entry["event_types"].append(event_type)
+        return by_user
+    
+    @property
+    def subscriptions_by_session(self):
+        """
+        Subscriptions in place after the last reconciliation, by session.
+        
+        Returns:
+            dict: session_id -> {user_id: {"streamer", "event_types"}}
+        """
+        by_session = {session_id: {} for session_id in self.session_ids}
+        for (user_id, event_type, session_id), name in sorted(self.reconciler.tracked.items()):
+            entry = by_session.setdefault(session_id, {}).setdefault(user_id, {"streamer": name, "event_types": []})
+            entry["event_types"].append(event_type)
+        return by_session
+    
+    @property
+    def session_ids(self):
+        """Session IDs of the currently welcomed connections."""
+        return [conn["session_id"] for conn in self.ws_connections if conn.get("session_id")]
 
     async def start(self):
         """
         Start the EventSub service and establish WebSocket connections to Twitch.
         
-        Initializes state, obtains authentication tokens, sets up periodic cleanup tasks,
+        Initializes state, obtains authentication tokens, starts the subscription reconciler,
         and establishes WebSocket connections to Twitch's EventSub service for real-time
         stream status notifications.
         
@@ -75,13 +139,14 @@ class EventSubService:
         
         # Reset state
         self.ws_connections = []
-        self.active_subscriptions = {}
-        self.session_ids = []
         self.connection_tasks = []
-        self.pending_unsubscribes = set()
         self.last_connection_state = {}
-        self.reconnect_urls = {}
-        self.subscriptions_by_session = {}
+        self.handoff_stats = {"completed": 0, "failed": 0}
+        self.notification_guard.reset()
+        self.reconciler.reset()
+        self.shard_planner = EventSubShardPlanner(max_sessions=self.max_connections,
+                                                  dual=EVENTSUB_DUAL_SUBSCRIPTIONS)
+        self.reported_uncovered = []
         
         # Token now provided by StreamMonitorService - don't load from disk again
         if not self.token:
@@ -99,8 +164,10 @@ class EventSubService:
                 print("[EventSub] No access token provided and no token_manager available")
                 return
 
-        # Start the periodic cleanup scheduler - reduce frequency to every 12 hours
-        asyncio.create_task(self._start_cleanup_scheduler())
+        # Start the subscription reconciler, which also replaces the periodic
+        # duplicate cleanup sweep
+        self.reconciler.start()
+        self.notification_dispatcher.start()
 
         # Start the connection manager task
         if self.token:
@@ -114,6 +181,12 @@ class EventSubService:
         print("[EventSub] Stopping service...")
         self.running = False
         
+        # Stop reconciling so nothing is re-created while unsubscribing
+        await self.reconciler.stop()
+        
+        # Let queued notifications finish before the subscriptions go away
+        await self.notification_dispatcher.stop()
+        
         # First unsubscribe all active subscriptions before canceling tasks
         await self._unsubscribe_all()
         
@@ -128,10 +201,7 @@ class EventSubService:
                 
         self.connection_tasks = []
         self.ws_connections = []
-        self.active_subscriptions = {}
-        self.session_ids = []
-        self.pending_unsubscribes = set()
-        self.subscriptions_by_session = {}
+        self.reconciler.reset()
         print("[EventSub] Service stopped")
 
     async def _manage_connections(self):
@@ -139,19 +209,8 @@ class EventSubService:
         first_run = True
         while self.running:
             try:
-                # Get current streamers
-                streamers = get_monitored_streamers()
-                
-                # Group streamers by online/offline status
-                online_streamers = []
-                offline_streamers = []
-                
-                for streamer, settings in streamers.items():
-                    if settings.get("twitch_id"):
-                        if settings.get("isLive", False):
-                            online_streamers.append((settings["twitch_id"], streamer))
-                        else:
-                            offline_streamers.append((settings["twitch_id"], streamer))
+                # Get current streamers grouped by online/offline status
+                online_streamers, offline_streamers = self._group_streamers()
                 
                 # Calculate how many connections we need
                 total_streamers = len(online_streamers) + len(offline_streamers)
@@ -166,7 +225,8 @@ class EventSubService:
                     print(f"[EventSub] No active connections detected, attempting to re-establish")
                     await self._create_connections(online_streamers, offline_streamers)
                 else:
-                    # Check for failed connections and restart if needed
+                    # Pick up added/removed streamers, then restart failed connections
+                    await self._rebalance_connections(online_streamers, offline_streamers)
                     await self._check_connections()
                     
             except Exception as e:
@@ -175,13 +235,111 @@ class EventSubService:
             # Check connections every 60 seconds
             await asyncio.sleep(60)
             
+    def _group_streamers(self):
+        """
+        Group monitored streamers with a Twitch ID by live status.
+        
+        Returns:
+            tuple: (online_streamers, offline_streamers), each a list of
+                   (user_id, streamer_name) tuples
+        """
+        online_streamers = []
+        offline_streamers = []
+        
+        for streamer, settings in get_monitored_streamers().items():
+            if settings.get("twitch_id"):
+                if settings.get("isLive", False):
+                    online_streamers.append((settings["twitch_id"], streamer))
+                else:
+                    offline_streamers.append((settings["twitch_id"], streamer))
+                    
+        return online_streamers, offline_streamers
+    
+    def _get_connection(self, connection_id):
+        """
+        Find the connection entry for a shard.
+        
+        Args:
+            connection_id: Shard index used as the connection identifier
+            
+        Returns:
+            dict: The connection entry, or None if the shard has no connection
+        """
+        for conn in self.ws_connections:
+            if conn["connection_id"] == connection_id:
+                return conn
+        return None
+    
+    def _start_connection(self, connection_id):
+        """
+        Start (or restart) the WebSocket connection for a shard.
+        
+        Args:
+            connection_id: Shard index used as the connection identifier
+        """
+        streamers = self.shard_planner.members(connection_id)
+        task = asyncio.create_task(self._handle_connection(streamers, connection_id))
+        self.connection_tasks.append(task)
+        
+        entry = {
+            "task": task,
+            "streamers": streamers,
+            "connection_id": connection_id,
+            "session_id": None,
+            "status": "connecting"
+        }
+        
+        conn = self._get_connection(connection_id)
+        if conn is not None:
+            conn.update(entry)
+        else:
+            self.ws_connections.append(entry)
+    
+    def _end_session(self, connection_id):
+        """
+        Forget a connection's session after it closed.
+        
+        Its subscriptions are no longer desired, so the next reconciliation
+        pass removes them from Twitch if they're still listed.
+        
+        Args:
+            connection_id: Shard index used as the connection identifier
+        """
+        conn = self._get_connection(connection_id)
+        if conn is not None and conn.get("session_id"):
+            conn["session_id"] = None
+            self.reconciler.request()
+    
+    def _report_uncovered(self, uncovered):
+        """
+        Log streamers that don't fit within Twitch's EventSub limits.
+        
+        Only logs when the set changes, so the connection manager doesn't
+        repeat the same warning every cycle.
+        
+        Args:
+            uncovered: Names of streamers without an EventSub subscription
+        """
+        if uncovered == self.reported_uncovered:
+            return
+        self.reported_uncovered = list(uncovered)
+        
+        if uncovered:
+            status = self.shard_planner.get_status()
+            print(f"[EventSub] WARNING: {len(uncovered)} streamers exceed EventSub limits "
+                  f"({status['capacity']} channels, max_total_cost {status['max_total_cost']}) "
+                  f"and will only be checked by polling: {', '.join(uncovered)}")
+        else:
+            print("[EventSub] All streamers are covered by EventSub subscriptions")
+    
     async def _create_connections(self, online_streamers, offline_streamers):
         """
         Create WebSocket connections to Twitch EventSub service for groups of streamers.
         
-        Divides streamers into batches to stay within Twitch's connection limits,
-        and creates WebSocket connections for each batch. Each connection can handle
-        multiple subscription events.
+        Packs streamers into shards with the shard planner, which respects
+        Twitch's per-session subscription limit, the connection limit and the
+        token's total subscription cost, and creates one WebSocket connection
+        per shard. Streamers that don't fit are reported instead of dropped.
         
         Args:
             online_streamers: List of tuples (user_id, streamer_name) for online streamers
@@ -197,28 +355,168 @@ class EventSubService:
             print("[EventSub] No streamers to monitor")
             return
             
-        # Split into batches - Twitch has a limit on subscriptions per connection
-        # Each subscription has a cost of 1, and each connection has a max total cost of 10
-        batch_size = 5  # Reduced from 10 to leave some room for error
-        streamers_batches = []
-        
-        for i in range(0, len(all_streamers), batch_size):
-            batch = all_streamers[i:i+batch_size]
-            streamers_batches.append(batch)
+        changes = self.shard_planner.plan(all_streamers)
+        self._report_mode()
+        
+        for connection_id in range(len(self.shard_planner.shards)):
+            if self.shard_planner.members(connection_id):
+                self._start_connection(connection_id)
+                
+        self._report_uncovered(changes["uncovered"])
+    
+    async def _rebalance_connections(self, online_streamers, offline_streamers):
+        """
+        Apply roster changes to the running connections incrementally.
+        
+        Updates the shard plan, starts connections for shards that don't have
+        one yet and lets the reconciler create and delete the difference.
+        Existing subscriptions are not moved, unless the roster outgrew dual
+        mode (or shrank back into it) and every channel is placed again.
+        
+        Args:
+            online_streamers: List of tuples (user_id, streamer_name) for online streamers
+            offline_streamers: List of tuples (user_id, streamer_name) for offline streamers
+        """
+        all_streamers = [(user_id, streamer, True) for user_id, streamer in online_streamers]
+        all_streamers.extend([(user_id, streamer, False) for user_id, streamer in offline_streamers])
+        
+        changes = self.shard_planner.plan(all_streamers)
+        
+        if changes["mode_changed"]:
+            self._report_mode()
+        else:
+            for members in changes["removed"].values():
+                for _, streamer_name, _ in members:
+                    # Streamers shed for lack of budget are reported as uncovered below
+                    if streamer_name not in changes["uncovered"]:
+                        print(f"[EventSub] Releasing subscription for removed streamer {streamer_name}")
+        
+        for connection_id in changes["added"]:
+            conn = self._get_connection(connection_id)
+            if conn is None or conn["task"].done():
+                # The new session is reconciled once it's welcomed
+                self._start_connection(connection_id)
+                
+        if changes["added"] or changes["removed"]:
+            self.reconciler.request()
+                    
+        self._report_uncovered(changes["uncovered"])
+    
+    def _report_mode(self):
+        """Log which subscription mode the shard plan is using."""
+        planner = self.shard_planner
+        if planner.dual:
+            print("[EventSub] Subscribing to stream.online and stream.offline for every streamer")
+        elif planner.prefer_dual:
+            print(f"[EventSub] {planner.covered_count + len(planner.uncovered)} streamers exceed the budget for two subscriptions "
+                  f"each, subscribing to one event per streamer")
+    
+    def _desired_subscriptions(self):
+        """
+        Describe the subscriptions the shards need right now.
+        
+        Every member of a shard whose connection has been welcomed needs
+        subscriptions on that session: both stream.online and stream.offline
+        in dual mode, otherwise stream.offline while live and stream.online
+        while offline.
+        
+        Returns:
+            dict: (user_id, event_type, session_id) -> streamer_name
+        """
+        dual = self.shard_planner.dual
+        desired = {}
+        for conn in self.ws_connections:
+            session_id = conn.get("session_id")
+            if not session_id or conn["status"] not in ("connected", "reconnecting"):
+                continue
+            for user_id, streamer_name, is_live in self.shard_planner.members(conn["connection_id"]):
+                if dual:
+                    event_types = ("stream.online", "stream.offline")
+                else:
+                    event_types = ("stream.offline" if is_live else "stream.online",)
+                for event_type in event_types:
+                    desired[(user_id, event_type, session_id)] = streamer_name
+        return desired
+    
+    async def _get_helix_headers(self):
+        """
+        Build Helix request headers with the freshest available token.
+        
+        Returns:
+            dict: Headers with Client-ID and Authorization, or None without a token
+        """
+        token_to_use = None
+        if hasattr(self, 'token_manager') and self.token_manager:
+            token_to_use, _ = await self.token_manager.get_access_token()
+        if not token_to_use:
+            token_to_use = self.token
+        if not token_to_use:
+            return None
+        return {
+            "Client-ID": EVENTSUB_CLIENT_ID,
+            "Authorization": f"Bearer {token_to_use}",
+        }
+    
+    async def _list_twitch_subscriptions(self, refresh=False):
+        """
+        List Twitch's current subscriptions for the reconciler.
+        
+        Args:
+            refresh: List again even if the shared snapshot is still fresh
             
+        Returns:
+            list: Subscription objects from every page
+        """
+        headers = await self._get_helix_headers()
+        if not headers:
+            raise RuntimeError("No token available")
+            
+        subscriptions = await self.subscription_snapshot.get(headers, refresh=refresh)
+        self._update_cost_from_listing()
+        return subscriptions
+    
+    def _update_cost_from_listing(self):
+        """
+        Learn the cost used by other clients of the token from the last listing.
         
-        for i, batch in enumerate(streamers_batches[:self.max_connections]):
-            streamer_names = [name for _, name, _ in batch]
-
+        Our own cost is what the listing shows on sessions this process
+        owns, so both figures describe the same moment. Each listing is
+        applied once.
+        """
+        snapshot = self.subscription_snapshot
+        if snapshot.listings == self._cost_listing or snapshot.total_cost is None:
+            return
+        self._cost_listing = snapshot.listings
+        own_cost = sum(
+            cost for session_id, cost in snapshot.session_costs.items()
+            if session_id in self.reconciler.owned_sessions
+        )
+        self.shard_planner.update_limits(
+            total_cost=snapshot.total_cost,
+            max_total_cost=snapshot.max_total_cost,
+            own_cost=own_cost
+        )
+    
+    async def _delete_subscription(self, sub_id):
+        """
+        Delete a single subscription for the reconciler.
+        
+        Args:
+            sub_id: ID of the subscription to delete
             
-            task = asyncio.create_task(self._handle_connection(batch, i))
-            self.connection_tasks.append(task)
-            self.ws_connections.append({
-                "task": task,
-                "streamers": batch,
-                "connection_id": i,
-                "status": "connecting"
-            })
+        Returns:
+            bool: True if the subscription is gone
+        """
+        headers = await self._get_helix_headers()
+        if not headers:
+            return False
+            
+        ssl_context = ssl.create_default_context(cafile=certifi.where())
+        async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
+            status, error_text = await self._delete_subscription_request(session, sub_id, headers)
+        if status not in (204, 404):
+            print(f"[EventSub] Failed to delete subscription {sub_id}: {status} - {error_text}")
+        return status in (204, 404)
             
     async def _check_connections(self):
         """
@@ -228,8 +526,8 @@ class EventSubService:
         or failed, and restarts them with the same set of streamers to maintain
         continuous monitoring.
         """
-        for i, conn in enumerate(self.ws_connections):
-            if conn["task"].done():
+        for conn in list(self.ws_connections):
+            if conn["task"].done() and conn["status"] != "idle":
                 try:
                     # Get the result to check for exceptions
                     conn["task"].result()
@@ -240,22 +538,138 @@ class EventSubService:
                 except Exception as e:
                     print(f"[EventSub] Connection {conn['connection_id']} failed with error: {e}")
                 
-                # Either way, restart the connection
-                streamers = conn["streamers"]
+                # Either way, restart the connection with the shard's current members
+                streamers = self.shard_planner.members(conn["connection_id"])
+                if not streamers:
+                    conn["status"] = "idle"
+                    continue
+                    
                 print(f"[EventSub] Restarting connection {conn['connection_id']} with {len(streamers)} streamers")
-                
-                # Start a new connection task
-                new_task = asyncio.create_task(self._handle_connection(streamers, conn["connection_id"]))
-                self.connection_tasks.append(new_task)
-                
-                # Update the connection object
-                self.ws_connections[i] = {
-                    "task": new_task,
-                    "streamers": streamers,
-                    "connection_id": conn["connection_id"],
-                    "status": "connecting"
-                }
+                self._start_connection(conn["connection_id"])
+        
+    async def _connect_websocket(self, url):
+        """
+        Open a WebSocket connection to an EventSub endpoint.
+        
+        Args:
+            url: EventSub WebSocket URL, or a session_reconnect URL
+            
+        Returns:
+            The connected WebSocket client
+        """
+        # Plain ws:// is only used against a local test server
+        ssl_context = ssl.create_default_context(cafile=certifi.where()) if url.startswith("wss://") else None
+        return await websockets.connect(
+            url, 
+            close_timeout=30,  # Increase from 5 to 30
+            ping_interval=25,  # Add regular pings
+            ping_timeout=10,   # How long to wait for pong
+            additional_headers={    # Add proper headers
+                'User-Agent': 'NazareinsTwitchDownloader/1.0',
+                'Origin': 'https://twitch.tv'
+            },
+            ssl=ssl_context  # Add this parameter
+        )
+    
+    async def _open_handoff(self, reconnect_url):
+        """
+        Connect to a session_reconnect URL and wait for its welcome.
         
+        Args:
+            reconnect_url: URL from the session_reconnect message
+            
+        Returns:
+            tuple: (websocket, session_id) of the welcomed connection
+            
+        Raises:
+            RuntimeError: If the first message is not a session_welcome
+        """
+        websocket = await self._connect_websocket(reconnect_url)
+        try:
+            welcome_msg = await asyncio.wait_for(websocket.recv(), timeout=HANDOFF_WELCOME_TIMEOUT)
+            welcome_data = json.loads(welcome_msg)
+            message_type = welcome_data["metadata"]["message_type"]
+            if message_type != "session_welcome":
+                raise RuntimeError(f"Unexpected message type: {message_type}")
+            return websocket, welcome_data["payload"]["session"]["id"]
+        except BaseException:
+            await websocket.close()
+            raise
+    
+    async def _cancel_handoff(self, handoff):
+        """
+        Abandon a handoff, closing its socket if it was already opened.
+        
+        Args:
+            handoff: Task running _open_handoff()
+        """
+        if not handoff.done():
+            handoff.cancel()
+        try:
+            websocket, _ = await handoff
+        except (asyncio.CancelledError, Exception):
+            return
+        await websocket.close()
+    
+    async def _finish_handoff(self, connection_id, old_websocket, receive, handoff):
+        """
+        Switch a connection over to the socket opened for a session_reconnect.
+        
+        Twitch moves the session's subscriptions to the new socket by itself,
+        so no subscription is touched. Notifications still arriving on the old
+        socket are handled before it's closed.
+        
+        Args:
+            connection_id: Connection being handed over
+            old_websocket: Socket that received the session_reconnect
+            receive: Pending recv() on the old socket, if any
+            handoff: Finished task running _open_handoff()
+            
+        Returns:
+            The new websocket, or None if the handoff failed and the old socket
+            stays in use
+        """
+        try:
+            new_websocket, session_id = handoff.result() if handoff.done() else await handoff
+        except Exception as e:
+            self.handoff_stats["failed"] += 1
+            print(f"[EventSub] Connection {connection_id}: Reconnect handoff failed: {e}")
+            for conn in self.ws_connections:
+                if conn["connection_id"] == connection_id and conn["status"] == "reconnecting":
+                    conn["status"] = "connected"
+            return None
+        
+        # Drain what the old socket still has before closing it
+        try:
+            while True:
+                if receive is None:
+                    receive = asyncio.ensure_future(old_websocket.recv())
+                message = await asyncio.wait_for(receive, timeout=HANDOFF_DRAIN_TIMEOUT)
+                receive = None
+                data = json.loads(message)
+                if data["metadata"]["message_type"] == "notification":
+                    self.notification_dispatcher.submit(data)
+        except (asyncio.TimeoutError, websockets.exceptions.ConnectionClosed, json.JSONDecodeError, KeyError):
+            pass
+        await old_websocket.close()
+        
+        previous_session = None
+        for conn in self.ws_connections:
+            if conn["connection_id"] == connection_id:
+                previous_session = conn.get("session_id")
+                conn["session_id"] = session_id
+                conn["status"] = "connected"
+        
+        if session_id != previous_session:
+            # Subscriptions now report the new session, list them again
+            self.reconciler.add_session(session_id)
+            self.subscription_snapshot.invalidate()
+            self.reconciler.request()
+        
+        self.handoff_stats["completed"] += 1
+        print(f"[EventSub] Connection {connection_id}: Handed over to new socket, subscriptions carried over")
+        return new_websocket
+    
     async def _handle_connection(self, streamers, connection_id):
         """
         Manage a single WebSocket connection to Twitch's EventSub service.
@@ -270,14 +684,16 @@ class EventSubService:
             connection_id: Unique identifier for this connection
             
         Note:
-            Each connection has a limit of subscriptions it can handle (typically 10).
+            The streamers to subscribe are re-read from the shard planner when the
+            session welcome arrives, so streamers assigned while connecting are included.
+            A session_reconnect is handed over without leaving the loop: the new socket
+            is opened and welcomed while the old one keeps being read.
             The method implements retry logic with exponential backoff when connection failures occur.
         """
         retry_count = 0
         max_retries = 15  # max retries
         initial_retry_delay = 2  # seconds
         retry_delay = initial_retry_delay
-        connection_session_id = None  # Track the session ID for this connection
         
         streamer_names = [name for _, name, _ in streamers]
         
@@ -288,29 +704,10 @@ class EventSubService:
         
         while retry_count < max_retries and self.running:
             try:
-                # Check if we have a reconnect URL for this connection
-                reconnect_url = self.reconnect_urls.get(connection_id)
-                ws_url = reconnect_url if reconnect_url else "wss://eventsub.wss.twitch.tv/ws"
-
-                if reconnect_url:
-                    print(f"[EventSub] Connection {connection_id}: Using reconnect URL")
-                    # Clear the reconnect URL after using it - they're typically one-time use
-                    del self.reconnect_urls[connection_id]
-                
-                ssl_context = ssl.create_default_context(cafile=certifi.where())
-
-                # Connect to EventSub WebSocket
-                async with websockets.connect(
-                    ws_url, 
-                    close_timeout=30,  # Increase from 5 to 30
-                    ping_interval=25,  # Add regular pings
-                    ping_timeout=10,   # How long to wait for pong
-                    additional_headers={    # Add proper headers
-                        'User-Agent': 'NazareinsTwitchDownloader/1.0',
-                        'Origin': 'https://twitch.tv'
-                    },
-                    ssl=ssl_context  # Add this parameter
-                ) as websocket:
+                websocket = await self._connect_websocket(EVENTSUB_WEBSOCKET_URL)
+                receive = None  # Pending recv() on the current socket
+                handoff = None  # Task opening the reconnect_url socket after a session_reconnect
+                try:
                     print(f"[EventSub] Connection {connection_id}: Connected successfully")
                     
                     # Update status
@@ -325,137 +722,77 @@ class EventSubService:
                         
                         if welcome_data["metadata"]["message_type"] == "session_welcome":
                             session_id = welcome_data["payload"]["session"]["id"]
-                            connection_session_id = session_id  # Store the session ID for this connection
                             
-                            # Store the session ID
-                            if session_id not in self.session_ids:
-                                self.session_ids.append(session_id)
-                            
-                            # Initialize session tracking
-                            if session_id not in self.subscriptions_by_session:
-                                self.subscriptions_by_session[session_id] = {}
+                            for conn in self.ws_connections:
+                                if conn["connection_id"] == connection_id:
+                                    conn["session_id"] = session_id
                             
+                            # Pick up the shard's current members
+                            streamers = self.shard_planner.members(connection_id)
+                            streamer_names = [name for _, name, _ in streamers]
                             
                             # Reset retry parameters on successful connection
                             retry_count = 0
                             retry_delay = initial_retry_delay
                             
-                            # Clear any old subscriptions for streamers in this batch
-                            # This helps avoid duplication when reconnecting
-                            for user_id, streamer_name, _ in streamers:
-                                # If this streamer is already subscribed in another active session,
-                                # unsubscribe them first to prevent duplicate subscriptions
-                                await self._check_and_clean_streamer_subscriptions(user_id, streamer_name)
-                            
-                            # Add a short delay to allow unsubscribe operations to complete
-                            await asyncio.sleep(1)
-                            await self._check_existing_subscriptions_with_twitch(session_id)
-
-                            # Add this new code to clean up existing subscriptions:
-                            # Clean up any existing subscriptions found during the check
-                            if self.active_subscriptions:
-                                
-                                # Create a copy of the IDs to avoid modifying while iterating
-                                existing_user_ids = list(self.active_subscriptions.keys())
-                                
-                                # Delete each existing subscription
-                                for user_id in existing_user_ids:
-                                    streamer_info = self.active_subscriptions.get(user_id, {})
-                                    streamer_name = streamer_info.get("streamer", "unknown")
-                                    await self.remove_streamer_subscription(user_id, quiet=False)
-                                
-                                # Wait for all removals to complete
-                                await asyncio.sleep(1)
-                                
-                            # Create subscriptions with rate limiting and retry logic
-                            subscriptions_created = 0
-
-                            
-                            for user_id, streamer_name, is_online in streamers:
-                                # If online, subscribe to offline events; if offline, subscribe to online events
-                                event_type = "stream.offline" if is_online else "stream.online"
-                                
-                                # Check if we're above the rate limit threshold
-                                current_time = time.time()
-                                if current_time < self.retry_after:
-                                    wait_time = self.retry_after - current_time
-                                    print(f"[EventSub] Rate limited, waiting {wait_time:.1f} seconds before continuing")
-                                    await asyncio.sleep(wait_time)
-                                
-                                # Use semaphore for rate limiting
-                                async with self.subscription_rate_limiter:
-                                    try:
-                                        success = await self._create_subscription(session_id, user_id, streamer_name, event_type)
-                                        
-                                        if success:
-                                            subscriptions_created += 1
-                                            # Store in both tracking dictionaries
-                                            self.active_subscriptions[user_id] = {
-                                                "streamer": streamer_name,
-                                                "event_type": event_type,
-                                                "session_id": session_id
-                                            }
-                                            
-                                            # Also track by session for reconnection management
-                                            self.subscriptions_by_session[session_id][user_id] = {
-                                                "streamer": streamer_name,
-                                                "event_type": event_type
-                                            }
-                                        else:
-                                            print(f"[EventSub] Failed to subscribe to {event_type} for {streamer_name}")
-                                    except Exception as sub_err:
-                                        print(f"[EventSub] Error creating subscription for {streamer_name}: {sub_err}")
-                                
-                                # Add a small delay between subscription requests to avoid rate limiting
-                                await asyncio.sleep(0.2)
-                            
-
+                            # The reconciler subscribes the shard's members on this
+                            # session and removes leftovers from earlier sessions
+                            self.reconciler.add_session(session_id)
+                            self.subscription_snapshot.invalidate()
+                            self.reconciler.request()
                             
                             # Process incoming WebSocket messages
                             while self.running:
                                 try:
+                                    if receive is None:
+                                        receive = asyncio.ensure_future(websocket.recv())
+                                    waiting = {receive} if handoff is None else {receive, handoff}
+                                    
                                     # Set a timeout on receive to detect disconnections
-                                    message = await asyncio.wait_for(websocket.recv(), timeout=60)
-                                    data = json.loads(message)
+                                    done, _ = await asyncio.wait(waiting, timeout=60, return_when=asyncio.FIRST_COMPLETED)
+                                    
+                                    if handoff is not None and handoff in done:
+                                        # The new socket is welcomed, switch over to it
+                                        new_websocket = await self._finish_handoff(connection_id, websocket, receive, handoff)
+                                        handoff = None
+                                        if new_websocket is not None:
+                                            websocket, receive = new_websocket, None
+                                        continue
+                                    
+                                    if not done:
+                                        raise asyncio.TimeoutError()
+                                    
+                                    finished, receive = receive, None
+                                    data = json.loads(finished.result())
                                     message_type = data["metadata"]["message_type"]
                                     
                                     if message_type == "notification":
-                                        await self._handle_notification(data)
+                                        # Handled by the dispatcher's workers so
+                                        # reading the next frame never waits
+                                        self.notification_dispatcher.submit(data)
                                     elif message_type == "session_keepalive":
                                         # Just log an occasional keepalive
                                         pass
                                     elif message_type == "session_reconnect":
-                                        # Handle reconnect by storing the URL for later use
+                                        # Open the new socket first and keep reading this one
+                                        # until the new one is welcomed, so nothing is missed
                                         reconnect_url = data["payload"]["session"]["reconnect_url"]
-                                        print(f"[EventSub] Connection {connection_id}: Received reconnect message with URL")
-                                        
-                                        # Store reconnect URL for this connection
-                                        self.reconnect_urls[connection_id] = reconnect_url
+                                        print(f"[EventSub] Connection {connection_id}: Received reconnect message, handing over to new URL")
                                         
                                         # Update status
                                         for conn in self.ws_connections:
                                             if conn["connection_id"] == connection_id:
                                                 conn["status"] = "reconnecting"
                                         
-                                        # Close current connection for reconnection
-                                        await websocket.close()
-                                        
-                                        break  # Exit the inner loop to reconnect
+                                        if handoff is not None:
+                                            await self._cancel_handoff(handoff)
+                                        handoff = asyncio.ensure_future(self._open_handoff(reconnect_url))
                                     elif message_type == "revocation":
                                         print(f"[EventSub] Connection {connection_id}: Subscription revoked: {data['payload']['subscription']['type']}")
                                         
-                                        # Extract the user_id from the condition
-                                        revoked_user_id = data['payload']['subscription']['condition'].get('broadcaster_user_id')
-                                        
-                                        # Remove from active subscriptions
-                                        if revoked_user_id in self.active_subscriptions:
-                                            # Also remove from session tracking
-                                            sub_session_id = self.active_subscriptions[revoked_user_id].get("session_id")
-                                            if sub_session_id and sub_session_id in self.subscriptions_by_session:
-                                                if revoked_user_id in self.subscriptions_by_session[sub_session_id]:
-                                                    del self.subscriptions_by_session[sub_session_id][revoked_user_id]
-                                            
-                                            del self.active_subscriptions[revoked_user_id]
+                                        # Forget it and let the reconciler re-create it if still wanted
+                                        self.subscription_snapshot.discard([data['payload']['subscription'].get('id')])
+                                        self.reconciler.request()
                                 except asyncio.TimeoutError:
                                     # Send a ping to check if the connection is still alive
                                     try:
@@ -469,6 +806,14 @@ class EventSubService:
                                             1006, "Connection closed abnormally (ping timeout)"
                                         )
                                 except websockets.exceptions.ConnectionClosed:
+                                    if handoff is not None:
+                                        # Twitch closes the old socket once the new one is welcomed
+                                        new_websocket = await self._finish_handoff(connection_id, websocket, None, handoff)
+                                        handoff = None
+                                        if new_websocket is not None:
+                                            websocket = new_websocket
+                                            continue
+                                    
                                     print(f"[EventSub] Connection {connection_id}: WebSocket connection closed unexpectedly")
                                     
                                     # Update status
@@ -491,6 +836,13 @@ class EventSubService:
                     
                     # If we made it here, reset retry count on successful connection
                     retry_count = 0
+                finally:
+                    if receive is not None:
+                        receive.cancel()
+                    if handoff is not None:
+                        await self._cancel_handoff(handoff)
+                    await websocket.close()
+                    
                     
             except websockets.exceptions.ConnectionClosed as e:
                 
@@ -516,25 +868,8 @@ class EventSubService:
                     if conn["connection_id"] == connection_id:
                         conn["status"] = "disconnected"
                 
-                # Clean up this session from session_ids if it's tracked
-                if connection_session_id in self.session_ids:
-                    self.session_ids.remove(connection_session_id)
-                    
-                    # Clean up subscriptions associated with this session
-                    if connection_session_id in self.subscriptions_by_session:
-                        print(f"[EventSub] Connection {connection_id}: Cleaning up {len(self.subscriptions_by_session[connection_session_id])} subscriptions from closed session")
-                        
-                        # Create a list to avoid modifying during iteration
-                        user_ids_to_remove = list(self.subscriptions_by_session[connection_session_id].keys())
-                        
-                        # Remove from active_subscriptions
-                        for user_id in user_ids_to_remove:
-                            if user_id in self.active_subscriptions and \
-                            self.active_subscriptions[user_id].get("session_id") == connection_session_id:
-                                del self.active_subscriptions[user_id]
-                                            
-                        # Clear session tracking
-                        del self.subscriptions_by_session[connection_session_id]
+                # The session is gone, its subscriptions are reconciled away
+                self._end_session(connection_id)
                 
                 retry_count += 1
                 print(f"[EventSub] Connection {connection_id}: Retrying in {retry_delay} seconds... ({retry_count}/{max_retries})")
@@ -549,20 +884,8 @@ class EventSubService:
                     if conn["connection_id"] == connection_id:
                         conn["status"] = "error"
                 
-                # Clean up this session from session_ids if it's tracked
-                if connection_session_id in self.session_ids:
-                    self.session_ids.remove(connection_session_id)
-                    
-                    # Clean up subscriptions associated with this session
-                    if connection_session_id in self.subscriptions_by_session:
-                        # Remove from active_subscriptions
-                        for user_id in list(self.subscriptions_by_session[connection_session_id].keys()):
-                            if user_id in self.active_subscriptions and \
-                               self.active_subscriptions[user_id].get("session_id") == connection_session_id:
-                                del self.active_subscriptions[user_id]
-                        
-                        # Clear session tracking
-                        del self.subscriptions_by_session[connection_session_id]
+                # The session is gone, its subscriptions are reconciled away
+                self._end_session(connection_id)
                 
                 retry_count += 1
                 print(f"[EventSub] Connection {connection_id}: Retrying in {retry_delay} seconds... ({retry_count}/{max_retries})")
@@ -580,96 +903,6 @@ class EventSubService:
         # Return to allow the connection manager to detect failures
         return
     
-    async def _check_and_clean_streamer_subscriptions(self, user_id, streamer_name):
-        """
-        Check if a streamer already has active subscriptions and clean them up if needed.
-        
-        Args:
-            user_id: Twitch user ID of the streamer
-            streamer_name: Twitch username of the streamer
-        """
-        if user_id in self.active_subscriptions:
-            print(f"[EventSub] Streamer {streamer_name} already has an active subscription, cleaning up")
-            await self.remove_streamer_subscription(user_id, quiet=True)
-            # Add a small delay to allow the unsubscribe to complete
-            await asyncio.sleep(0.5)
-
-    async def _check_existing_subscriptions_with_twitch(self, session_id):
-        """
-        Query Twitch API to fetch and track existing subscriptions.
-        
-        Maps existing Twitch subscriptions to our internal tracking system to
-        maintain consistency between our records and Twitch's actual state.
-        
-        Args:
-            session_id: The EventSub session ID to associate with found subscriptions
-        """
-        token_to_use = None
-        if hasattr(self, 'token_manager') and self.token_manager:
-            token_to_use, _ = await self.token_manager.get_access_token()
-        if not token_to_use:
-            token_to_use = self.token
-        if not token_to_use:
-            return
-        
-        try:
-            url = "https://api.twitch.tv/helix/eventsub/subscriptions"
-            headers = {
-                "Client-ID": EVENTSUB_CLIENT_ID,
-                "Authorization": f"Bearer {token_to_use}",  # Use the fresh token
-            }
-                
-            # Create SSL context
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        subscriptions = data.get("data", [])
-                        
-                        # Map existing subscriptions to our internal tracking
-                        for sub in subscriptions:
-                            condition = sub.get("condition", {})
-                            user_id = condition.get("broadcaster_user_id")
-                            
-                            if user_id and sub.get("transport", {}).get("method") == "websocket":
-                                # Only track WebSocket subscriptions
-                                event_type = sub.get("type")
-                                
-                                # Find the streamer name for this user_id
-                                streamer_name = None
-                                streamers = get_monitored_streamers()
-                                for streamer, settings in streamers.items():
-                                    if settings.get("twitch_id") == user_id:
-                                        streamer_name = streamer
-                                        break
-                                
-                                if streamer_name:
-                                    
-                                    # Add to our tracking
-                                    self.active_subscriptions[user_id] = {
-                                        "streamer": streamer_name,
-                                        "event_type": event_type,
-                                        "session_id": session_id
-                                    }
-                                    
-                                    # Also track by session
-                                    if session_id not in self.subscriptions_by_session:
-                                        self.subscriptions_by_session[session_id] = {}
-                                        
-                                    self.subscriptions_by_session[session_id][user_id] = {
-                                        "streamer": streamer_name,
-                                        "event_type": event_type
-                                    }
-                        
-                        
-                    else:
-                        print(f"[EventSub] Failed to check existing subscriptions: {response.status}")
-                        
-        except Exception as e:
-            print(f"[EventSub] Error checking existing subscriptions: {e}")
-    
     async def _create_subscription(self, session_id, user_id, streamer_name, event_type):
         """
         Create a new EventSub subscription via Twitch API.
@@ -686,7 +919,7 @@ class EventSubService:
         Returns:
             bool: True if subscription was successfully created, False otherwise
         """
-        url = "https://api.twitch.tv/helix/eventsub/subscriptions"
+        url = EVENTSUB_SUBSCRIPTIONS_URL
         
         # Fetch the latest token
         token_to_use = None
@@ -725,59 +958,50 @@ class EventSubService:
                 
                 async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
                     # Add a timeout to the request to avoid hanging
-                    async with session.post(url, headers=headers, json=payload, timeout=30) as response:
-                        if response.status == 202:
-                            print(f"[EventSub] Successfully subscribed to {event_type} events for {streamer_name} ({user_id})")
-                            return True
-                        # Replace the current rate limit handling code with:
-                        elif response.status == 429:  # Rate limited
-                            # Get retry-after header if present
-                            retry_after = response.headers.get('Retry-After')
-                            try:
-                                base_wait = 5  # Base delay in seconds
-                                max_wait = 60  # Maximum delay in seconds
-                                
-                                if retry_after:
-                                    wait_seconds = int(retry_after)
-                                else:
-                                    # Use exponential backoff based on the attempt number
-                                    wait_seconds = min(base_wait * (2 ** current_attempt), max_wait)
-                                
-                                # Add some jitter to avoid all clients retrying at the same time
-                                wait_seconds = wait_seconds * (0.9 + 0.2 * random.random())
-                                    
-                                self.retry_after = time.time() + wait_seconds
-                                
-                                print(f"[EventSub] Rate limited. Will retry after {wait_seconds:.1f} seconds")
-                                await asyncio.sleep(wait_seconds)
-                                current_attempt += 1
-                                continue
-                            except ValueError:
-                                # Default if we can't parse the value
-                                wait_seconds = base_wait * (2 ** current_attempt)
-                                self.retry_after = time.time() + wait_seconds
-                                await asyncio.sleep(wait_seconds)
+                    async with self.helix_limiter.limit():
+                        async with session.post(url, headers=headers, json=payload, timeout=30) as response:
+                            self.helix_limiter.observe(response.status, response.headers)
+                            if response.status == 202:
+                                print(f"[EventSub] Successfully subscribed to {event_type} events for {streamer_name} ({user_id})")
+                            
+                                # Learn the token's real cost limits for shard planning
+                                try:
+                                    data = await response.json()
+                                    created = (data.get("data") or [{}])[0]
+                                    self.subscription_snapshot.add(created)
+                                    # total_cost is applied from listings only, other
+                                    # creates of this pass may or may not be in it
+                                    self.shard_planner.update_limits(
+                                        max_total_cost=data.get("max_total_cost"),
+                                        cost=created.get("cost")
+                                    )
+                                except Exception:
+                                    pass
+                                return True
+                            elif response.status == 429:  # Rate limited
+                                # The limiter has paused the Helix family until the
+                                # reset, the next attempt waits for it
                                 current_attempt += 1
                                 continue
-                        else:
-                            response_text = await response.text()
-                            print(f"[EventSub] Failed to subscribe to {event_type} events for {streamer_name}: {response.status} - {response_text}")
+                            else:
+                                response_text = await response.text()
+                                print(f"[EventSub] Failed to subscribe to {event_type} events for {streamer_name}: {response.status} - {response_text}")
                             
-                            # Store token error for display in UI
-                            if response.status == 401:
-                                self.token_error = f"Token unauthorized: {response_text}"
-                                print(f"[EventSub] Token appears to be invalid, will trigger refresh")
-                                if hasattr(self, 'token_manager') and self.token_manager:
-                                    # Force a token refresh
-                                    print("[EventSub] Requesting token refresh...")
-                                    fresh_token, refreshed = await self.token_manager.get_access_token(force_refresh=True)
-                                    if refreshed and fresh_token:
-                                        print(f"[EventSub] Successfully refreshed token, will retry on next cycle")
-                                        # Update our token
-                                        self.token = fresh_token
-                                        self.token_error = None
+                                # Store token error for display in UI
+                                if response.status == 401:
+                                    self.token_error = f"Token unauthorized: {response_text}"
+                                    print(f"[EventSub] Token appears to be invalid, will trigger refresh")
+                                    if hasattr(self, 'token_manager') and self.token_manager:
+                                        # Force a token refresh
+                                        print("[EventSub] Requesting token refresh...")
+                                        fresh_token, refreshed = await self.token_manager.get_access_token(force_refresh=True)
+                                        if refreshed and fresh_token:
+                                            print(f"[EventSub] Successfully refreshed token, will retry on next cycle")
+                                            # Update our token
+                                            self.token = fresh_token
+                                            self.token_error = None
                             
-                            return False
+                                return False
             except asyncio.TimeoutError:
                 print(f"[EventSub] Timeout creating subscription for {streamer_name}")
                 current_attempt += 1
@@ -789,6 +1013,37 @@ class EventSubService:
         print(f"[EventSub] Failed to create subscription after {max_attempts} attempts")
         return False
             
+    async def _delete_subscription_request(self, session, sub_id, headers, timeout=None):
+        """
+        Send one subscription DELETE request through the shared Helix rate limiter.
+        
+        A 429 pauses the limiter until Twitch's reset time; the request is
+        then retried once. Deleted (or already missing) subscriptions are
+        dropped from the shared subscription snapshot.
+        
+        Args:
+            session: aiohttp session to send the request with
+            sub_id: ID of the subscription to delete
+            headers: Request headers with Client-ID and Authorization
+            timeout: Optional request timeout in seconds
+            
+        Returns:
+            tuple: (HTTP status, response text for failed requests)
+        """
+        for attempt in range(2):
+            async with self.helix_limiter.limit():
+                async with session.delete(EVENTSUB_SUBSCRIPTIONS_URL, params={"id": sub_id},
+                                          headers=headers, timeout=timeout) as response:
+                    self.helix_limiter.observe(response.status, response.headers)
+                    if response.status in (204, 404):
+                        self.subscription_snapshot.discard([sub_id])
+                    if response.status == 204:
+                        return response.status, ""
+                    if response.status == 429 and attempt == 0:
+                        continue
+                    return response.status, await response.text()
+        return 429, ""
+
     async def _unsubscribe_all(self):
         """
         Unsubscribe from all active EventSub subscriptions on Twitch.
@@ -810,8 +1065,6 @@ class EventSubService:
         print("[EventSub] Performing complete subscription cleanup...")
         
         try:
-            # Get all active subscriptions from Twitch
-            url = "https://api.twitch.tv/helix/eventsub/subscriptions"
             headers = {
                 "Client-ID": EVENTSUB_CLIENT_ID,
                 "Authorization": f"Bearer {token_to_use}",  # Use fresh token
@@ -820,480 +1073,186 @@ class EventSubService:
             ssl_context = ssl.create_default_context(cafile=certifi.where())
             
             async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        subscriptions = data.get("data", [])
-                        
-                        if not subscriptions:
-                            print("[EventSub] No active subscriptions found on Twitch")
-                            return
-                        
-                        print(f"[EventSub] Found {len(subscriptions)} subscriptions to clean up")
-                        
-                        # Group subscriptions by user_id for better logging
-                        subs_by_user = {}
-                        for sub in subscriptions:
-                            sub_id = sub.get("id")
-                            user_id = sub.get("condition", {}).get("broadcaster_user_id")
-                            
-                            if user_id:
-                                if user_id not in subs_by_user:
-                                    subs_by_user[user_id] = []
-                                subs_by_user[user_id].append(sub_id)
-                        
-                        # Delete subscriptions one by one but log as batches
-                        deleted_count = 0
-                        total_users = len(subs_by_user)
-                        current_user = 0
-                        
-                        # Use semaphore to limit concurrent deletion requests
-                        delete_semaphore = asyncio.Semaphore(5)
-                        
-                        async def delete_subscription(sub_id):
-                            nonlocal deleted_count
-                            delete_url = f"{url}?id={sub_id}"
-                            try:
-                                async with delete_semaphore:
-                                    async with session.delete(delete_url, headers=headers) as delete_response:
-                                        if delete_response.status == 204:  # Success
-                                            deleted_count += 1
-                                        elif delete_response.status == 429:  # Rate limited
-                                            retry_after = delete_response.headers.get('Retry-After', '5')
-                                            try:
-                                                wait_seconds = int(retry_after)
-                                            except ValueError:
-                                                wait_seconds = 5
-                                            
-                                            print(f"[EventSub] Rate limited on deletion, waiting {wait_seconds} seconds")
-                                            await asyncio.sleep(wait_seconds)
-                                            
-                                            # Retry once after waiting
-                                            async with session.delete(delete_url, headers=headers) as retry_response:
-                                                if retry_response.status == 204:
-                                                    deleted_count += 1
-                                        else:
-                                            error_text = await delete_response.text()
-                                            print(f"[EventSub] Failed to delete subscription {sub_id}: {delete_response.status} - {error_text}")
-                            except Exception as e:
-                                print(f"[EventSub] Error deleting subscription {sub_id}: {e}")
-                        
-                        # Create tasks for all deletions
-                        delete_tasks = []
-                        for user_id, sub_ids in subs_by_user.items():
-                            current_user += 1
-                            # Only log progress every 5 users or at the end
-                            if current_user % 5 == 0 or current_user == total_users:
-                                print(f"[EventSub] Cleanup progress: {current_user}/{total_users} users")
-                                
-                            # Create tasks for all subscriptions for this user
-                            for sub_id in sub_ids:
-                                delete_tasks.append(asyncio.create_task(delete_subscription(sub_id)))
-                        
-                        # Wait for all deletion tasks to complete
-                        if delete_tasks:
-                            await asyncio.gather(*delete_tasks, return_exceptions=True)
-                        
-                        print(f"[EventSub] Successfully cleaned up {deleted_count}/{sum(len(subs) for subs in subs_by_user.values())} subscriptions")
-                        
-                        # Wait a moment to ensure Twitch processes all deletions
-                        await asyncio.sleep(1)
-                    else:
-                        error_text = await response.text()
-                        print(f"[EventSub] Failed to get subscriptions: {response.status} - {error_text}")
-        except Exception as e:
-            print(f"[EventSub] Error during subscription cleanup: {e}")
-
-    async def _start_cleanup_scheduler(self):
-        """
-        Start a scheduled task to periodically clean up duplicate subscriptions.
-        
-        Runs every 12 hours to identify and remove duplicate subscriptions that
-        may have been created due to reconnection events or API errors.
-        """
-        while self.running:
-            try:
-                # Run cleanup every 12 hours
-                await asyncio.sleep(12 * 60 * 60)
+                # Read every page before deleting anything, deletions shift the cursor
+                subscriptions = await self.subscription_snapshot.get(headers, refresh=True)
                 
-                # Only run cleanup if we have active subscriptions
-                if self.active_subscriptions:
-                    await self._check_and_clean_duplicates()
-            except asyncio.CancelledError:
-                break
-            except Exception as e:
-                print(f"[EventSub] Error in cleanup scheduler: {e}")
-                await asyncio.sleep(60)  # Wait a minute before retrying
+                if not subscriptions:
+                    print("[EventSub] No active subscriptions found on Twitch")
+                    return
                 
-    async def _check_and_clean_duplicates(self):
-        """
-        Identify and remove duplicate EventSub subscriptions.
-        
-        Queries Twitch API for all current subscriptions, identifies duplicates
-        (multiple subscriptions for the same user_id and event type), and removes
-        extra subscriptions to maintain a clean state.
-        """
-        if not self.token:
-            return
-            
-        try:
-            url = "https://api.twitch.tv/helix/eventsub/subscriptions"
-            headers = {
-                "Client-ID": EVENTSUB_CLIENT_ID,
-                "Authorization": f"Bearer {self.token}",
-            }
-            
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        subscriptions = data.get("data", [])
-                        
-                        # Group subscriptions by user_id and type to find duplicates
-                        grouped_subs = {}
-                        for sub in subscriptions:
-                            user_id = sub.get("condition", {}).get("broadcaster_user_id")
-                            sub_type = sub.get("type")
-                            if user_id and sub_type:
-                                key = f"{user_id}:{sub_type}"
-                                if key not in grouped_subs:
-                                    grouped_subs[key] = []
-                                grouped_subs[key].append(sub)
-                        
-                        # Find duplicates
-                        duplicates = {key: subs for key, subs in grouped_subs.items() if len(subs) > 1}
-                        
-                        if duplicates:
-                            # Log summary of duplicates found
-                            duplicate_count = sum(len(subs) - 1 for subs in duplicates.values())
-                            
-                            # Use a semaphore to rate limit deletion requests
-                            semaphore = asyncio.Semaphore(5)
-                            deleted_count = 0
-                            
-                            # Function to delete a single subscription with rate limiting
-                            async def delete_subscription(sub_id):
-                                nonlocal deleted_count
-                                try:
-                                    async with semaphore:
-                                        delete_url = f"{url}?id={sub_id}"
-                                        async with session.delete(delete_url, headers=headers) as delete_response:
-                                            if delete_response.status == 204:
-                                                deleted_count += 1
-                                                return True
-                                            elif delete_response.status == 429:  # Rate limited
-                                                retry_after = delete_response.headers.get('Retry-After', '5')
-                                                try:
-                                                    wait_seconds = int(retry_after)
-                                                except ValueError:
-                                                    wait_seconds = 5
-                                                
-                                                print(f"[EventSub] Rate limited, waiting {wait_seconds} seconds")
-                                                await asyncio.sleep(wait_seconds)
-                                                
-                                                # Retry once
-                                                async with session.delete(delete_url, headers=headers) as retry_response:
-                                                    if retry_response.status == 204:
-                                                        deleted_count += 1
-                                                        return True
-                                            
-                                            error_text = await delete_response.text()
-                                            print(f"[EventSub] Failed to delete duplicate: {delete_response.status} - {error_text}")
-                                            return False
-                                except Exception as e:
-                                    print(f"[EventSub] Error deleting duplicate subscription: {e}")
-                                    return False
-                            
-                            # Create tasks for all duplicate deletions
-                            delete_tasks = []
-                            for key, subs in duplicates.items():
-                                user_id, sub_type = key.split(":")
-                                
-                                # Keep the first one, delete the rest
-                                for sub in subs[1:]:
-                                    sub_id = sub.get("id")
-                                    if sub_id:
-                                        delete_tasks.append(asyncio.create_task(delete_subscription(sub_id)))
-                            
-                            # Wait for all deletion tasks to complete
-                            if delete_tasks:
-                                await asyncio.gather(*delete_tasks, return_exceptions=True)
-                            
+                print(f"[EventSub] Found {len(subscriptions)} subscriptions to clean up")
+                
+                # Group subscriptions by user_id for better logging
+                subs_by_user = {}
+                for sub in subscriptions:
+                    sub_id = sub.get("id")
+                    user_id = sub.get("condition", {}).get("broadcaster_user_id")
+                    
+                    if user_id:
+                        if user_id not in subs_by_user:
+                            subs_by_user[user_id] = []
+                        subs_by_user[user_id].append(sub_id)
+                
+                # Delete subscriptions one by one but log as batches
+                deleted_count = 0
+                total_users = len(subs_by_user)
+                current_user = 0
+                
+                async def delete_subscription(sub_id):
+                    nonlocal deleted_count
+                    try:
+                        status, error_text = await self._delete_subscription_request(session, sub_id, headers)
+                        if status == 204:  # Success
+                            deleted_count += 1
                         else:
-                            print("[EventSub] No duplicate subscriptions found")
+                            print(f"[EventSub] Failed to delete subscription {sub_id}: {status} - {error_text}")
+                    except Exception as e:
+                        print(f"[EventSub] Error deleting subscription {sub_id}: {e}")
+                
+                # Create tasks for all deletions
+                delete_tasks = []
+                for user_id, sub_ids in subs_by_user.items():
+                    current_user += 1
+                    # Only log progress every 5 users or at the end
+                    if current_user % 5 == 0 or current_user == total_users:
+                        print(f"[EventSub] Cleanup progress: {current_user}/{total_users} users")
+                        
+                    # Create tasks for all subscriptions for this user
+                    for sub_id in sub_ids:
+                        delete_tasks.append(asyncio.create_task(delete_subscription(sub_id)))
+                
+                # Wait for all deletion tasks to complete
+                if delete_tasks:
+                    await asyncio.gather(*delete_tasks, return_exceptions=True)
+                
+                print(f"[EventSub] Successfully cleaned up {deleted_count}/{sum(len(subs) for subs in subs_by_user.values())} subscriptions")
+                
+                # Wait a moment to ensure Twitch processes all deletions
+                await asyncio.sleep(1)
         except Exception as e:
-            print(f"[EventSub] Error checking for duplicate subscriptions: {e}")
+            print(f"[EventSub] Error during subscription cleanup: {e}")
 
     async def _handle_notification(self, data):
         """
         Process a notification event received from Twitch.
         
         Parses notification data, identifies the affected streamer, updates their status
-        in the local database, and broadcasts updates to WebSocket clients. Also handles
-        subscription switching between online/offline events based on stream status changes.
+        in the local database, and broadcasts updates to WebSocket clients. The new live
+        status is recorded in the shard plan, and the reconciler switches the subscription
+        between online/offline events.
+        
+        Runs on a NotificationDispatcher worker, in arrival order per broadcaster.
+        Notifications that were already handled (same message_id) or that are older
+        than the last event handled for the broadcaster are dropped first. Errors
+        are left to the dispatcher, which logs and counts them.
         
         Args:
             data: Event data received from Twitch containing notification details
         """
-        try:
-            event_type = data["metadata"]["subscription_type"]
-            event_data = data["payload"]["event"]
-            user_id = event_data["broadcaster_user_id"]
+        drop_reason = self.notification_guard.check(data)
+        if drop_reason:
+            print(f"[EventSub] Dropped {drop_reason.replace('_', '-')} notification "
+                  f"{data['metadata'].get('message_id')} ({data['metadata'].get('subscription_type')})")
+            return
+        
+        event_type = data["metadata"]["subscription_type"]
+        event_data = data["payload"]["event"]
+        user_id = event_data["broadcaster_user_id"]
+        
+        # Lookup the streamer name from user_id
+        streamer_name = streamer_store.get_name_by_twitch_id(user_id)
+                
+        if not streamer_name:
+            print(f"[EventSub] Received event for unknown user_id: {user_id}")
+            return
             
-            # Lookup the streamer name from user_id
-            streamers = get_monitored_streamers()
-            streamer_name = None
+        # Process the event based on type
+        if event_type == "stream.online":
+            # Extract the stream type from the event data
+            stream_type = event_data.get("type", "")
             
-            for streamer, settings in streamers.items():
-                if settings.get("twitch_id") == user_id:
-                    streamer_name = streamer
-                    break
-                    
-            if not streamer_name:
-                print(f"[EventSub] Received event for unknown user_id: {user_id}")
+            # Only proceed if this is an actual live stream, not a rerun or other type
+            if stream_type != "live":
+                print(f"[EventSub] 🔴 {streamer_name} started a {stream_type} (not a live stream). Ignoring.")
                 return
                 
-            # Process the event based on type
-            if event_type == "stream.online":
-                # Extract the stream type from the event data
-                stream_type = event_data.get("type", "")
-                
-                # Only proceed if this is an actual live stream, not a rerun or other type
-                if stream_type != "live":
-                    print(f"[EventSub] 🔴 {streamer_name} started a {stream_type} (not a live stream). Ignoring.")
-                    return
-                    
-                print(f"[EventSub] 🔴 {streamer_name} JUST WENT LIVE!")
+            print(f"[EventSub] 🔴 {streamer_name} JUST WENT LIVE!")
+            
+            # The cached stream status still says offline, and the
+            # download's live check must not trust it
+            get_gql_client().expire_stream_status(user_id)
+            
+            # Update streamer status in our database
+            if streamer_store.contains(streamer_name):
+                # Time the way to the first recorded byte
+                latency = get_latency_tracker()
+                if streamer_store.get_field(streamer_name, "downloads_enabled", False):
+                    latency.begin(streamer_name, event_time=parse_event_time(data["metadata"].get("message_timestamp")))
                 
-                # Update streamer status in our database
-                if streamer_name in streamers:
-                    old_state = streamers[streamer_name].get("isLive", False)
-                    streamers[streamer_name]["isLive"] = True
-                    update_monitored_streamers(streamers)
-                    
-                    # Notify WebSocket clients
-                    if self.websocket_manager:
-                        await self.websocket_manager.broadcast_live_status(streamer_name, True)
-                        
-                        # We don't have the title and thumbnail yet, but we'll update anyway
-                        # The background service will fetch the full details soon
-                        await self.websocket_manager.broadcast_status_update(
-                            "twitch", 
-                            streamer_name, 
-                            {"isLive": True}
-                        )
-                        
-                    # Change subscription type without excessive logging
-                    if user_id in self.active_subscriptions and not old_state:
-                        session_id = self.active_subscriptions[user_id].get("session_id")
-                        if session_id:
-                            # Remove old subscription quietly
-                            await self.remove_streamer_subscription(user_id, quiet=True)
-                            # Create new subscription type
-                            await self._create_subscription(session_id, user_id, streamer_name, "stream.offline")
-                            self.active_subscriptions[user_id] = {
-                                "streamer": streamer_name,
-                                "event_type": "stream.offline", 
-                                "session_id": session_id
-                            }
-                            
-                            # Update session tracking
-                            if session_id in self.subscriptions_by_session:
-                                self.subscriptions_by_session[session_id][user_id] = {
-                                    "streamer": streamer_name,
-                                    "event_type": "stream.offline"
-                                }
+                streamer_store.patch(streamer_name, isLive=True)
+                latency.mark(streamer_name, "status_saved")
+                get_event_bus().publish(STREAM_ONLINE, streamer=streamer_name, user_id=user_id, source="eventsub")
                 
-            elif event_type == "stream.offline":
-                print(f"[EventSub] ⚫ {streamer_name} is now OFFLINE")
+                # Outside dual mode this now wants stream.offline, the
+                # reconciler swaps the subscription
+                self.shard_planner.set_live(user_id, True)
+                if not self.shard_planner.dual:
+                    self.reconciler.request()
                 
-                # Update streamer status in our database
-                if streamer_name in streamers:
-                    old_state = streamers[streamer_name].get("isLive", False)
-                    streamers[streamer_name]["isLive"] = False
-                    
-                    # Save the current title temporarily (for when they go online again)
-                    if streamers[streamer_name].get("title") and streamers[streamer_name].get("title") != "Offline":
-                        streamers[streamer_name]["lastTitle"] = streamers[streamer_name].get("title")
-                        
-                    # Set title to "Offline"
-                    streamers[streamer_name]["title"] = "Offline"
+                # Notify WebSocket clients
+                if self.websocket_manager:
+                    await self.websocket_manager.broadcast_live_status(streamer_name, True)
                     
-                    update_monitored_streamers(streamers)
-                    
-                    # Notify WebSocket clients
-                    if self.websocket_manager:
-                        await self.websocket_manager.broadcast_live_status(streamer_name, False)
-                        await self.websocket_manager.broadcast_status_update(
-                            "twitch", 
-                            streamer_name, 
-                            {"isLive": False, "title": "Offline"}
-                        )
-                        
-                    # Change subscription type without excessive logging
-                    if user_id in self.active_subscriptions and old_state:
-                        session_id = self.active_subscriptions[user_id].get("session_id")
-                        if session_id:
-                            # Remove old subscription quietly
-                            await self.remove_streamer_subscription(user_id, quiet=True)
-                            # Create new subscription
-                            await self._create_subscription(session_id, user_id, streamer_name, "stream.online")
-                            self.active_subscriptions[user_id] = {
-                                "streamer": streamer_name,
-                                "event_type": "stream.online",
-                                "session_id": session_id
-                            }
-                            
-                            # Update session tracking
-                            if session_id in self.subscriptions_by_session:
-                                self.subscriptions_by_session[session_id][user_id] = {
-                                    "streamer": streamer_name,
-                                    "event_type": "stream.online"
-                                }
-        except Exception as e:
-            print(f"[EventSub] Error handling notification: {e}")
-
-    async def _reconnect_websockets(self):
-        """
-        Attempt to reconnect all WebSocket connections after disconnection.
-        
-        Creates new connections with the same streamers as before, tracks old
-        session IDs for cleanup, and ensures subscription continuity during
-        the reconnection process.
-        
-        Returns:
-            bool: True if reconnection was successful, False otherwise
-        """
-        print("[EventSub] Attempting to reconnect WebSocket connections")
-        
-        # Stop any existing connections
-        for task in self.connection_tasks:
-            if not task.done():
-                task.cancel()
-        
-        # Clear existing state
-        self.ws_connections = []
-        
-        # Keep track of session IDs and subscriptions for cleanup
-        old_session_ids = self.session_ids.copy()
-        old_subscriptions_by_session = self.subscriptions_by_session.copy()
-        
-        # Reset session state
-        self.session_ids = []
-        self.connection_tasks = []
-        
-        # Get current streamers
-        streamers = get_monitored_streamers()
-        
-        # Group streamers by online/offline status
-        online_streamers = []
-        offline_streamers = []
-        
-        for streamer, settings in streamers.items():
-            if settings.get("twitch_id"):
-                if settings.get("isLive", False):
-                    online_streamers.append((settings["twitch_id"], streamer))
-                else:
-                    offline_streamers.append((settings["twitch_id"], streamer))
-        
-        # Create new connections
-        await self._create_connections(online_streamers, offline_streamers)
-        
-        # Wait for connections to establish
-        await asyncio.sleep(3)
-        
-        # Check if connections were successful
-        if self.session_ids:
-            print(f"[EventSub] Reconnection successful, established {len(self.session_ids)} sessions")
-            
-            # Clean up old sessions in the background
-            asyncio.create_task(self._cleanup_old_sessions(old_session_ids, old_subscriptions_by_session))
+                    # We don't have the title and thumbnail yet, but we'll update anyway
+                    # The background service will fetch the full details soon
+                    await self.websocket_manager.broadcast_status_update(
+                        "twitch", 
+                        streamer_name, 
+                        {"isLive": True}
+                    )
             
-            return True
-        else:
-            print("[EventSub] Reconnection failed, no sessions established")
-            return False
+        elif event_type == "stream.offline":
+            print(f"[EventSub] ⚫ {streamer_name} is now OFFLINE")
+            get_gql_client().expire_stream_status(user_id)
             
-    async def _cleanup_old_sessions(self, old_session_ids, old_subscriptions_by_session):
-        """
-        Clean up subscriptions from previous WebSocket sessions after reconnection.
-        
-        Args:
-            old_session_ids: List of session IDs from previous connections
-            old_subscriptions_by_session: Mapping of session IDs to subscriptions
-        """
-        print(f"[EventSub] Cleaning up {len(old_session_ids)} old sessions")
-        
-        try:
-            # Get all current subscriptions from Twitch
-            if not self.token:
-                return
+            # Update streamer status in our database
+            if streamer_store.contains(streamer_name):
+                current_title = streamer_store.get_field(streamer_name, "title")
+                offline_fields = {"isLive": False}
                 
-            url = "https://api.twitch.tv/helix/eventsub/subscriptions"
-            headers = {
-                "Client-ID": EVENTSUB_CLIENT_ID,
-                "Authorization": f"Bearer {self.token}",
-            }
-            
-            ssl_context = ssl.create_default_context(cafile=certifi.where())
-            
-            async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                async with session.get(url, headers=headers) as response:
-                    if response.status == 200:
-                        data = await response.json()
-                        subscriptions = data.get("data", [])
-                        
-                        # Filter for subscriptions belonging to old sessions
-                        old_sub_ids = []
-                        for sub in subscriptions:
-                            transport = sub.get("transport", {})
-                            if transport.get("method") == "websocket":
-                                session_id = transport.get("session_id")
-                                if session_id in old_session_ids:
-                                    old_sub_ids.append(sub.get("id"))
-                        
-                        if old_sub_ids:
-                            print(f"[EventSub] Found {len(old_sub_ids)} subscriptions from old sessions to clean up")
-                            
-                            # Use a semaphore to limit concurrent deletion requests
-                            semaphore = asyncio.Semaphore(5)
-                            
-                            # Create delete tasks
-                            delete_tasks = []
-                            for sub_id in old_sub_ids:
-                                delete_url = f"{url}?id={sub_id}"
-                                
-                                async def delete_single_sub(sub_id, delete_url):
-                                    try:
-                                        async with semaphore:
-                                            async with session.delete(delete_url, headers=headers) as delete_response:
-                                                return delete_response.status == 204
-                                    except Exception:
-                                        return False
-                                
-                                delete_tasks.append(asyncio.create_task(
-                                    delete_single_sub(sub_id, delete_url)
-                                ))
-                            
-                            # Wait for all deletions to complete
-                            results = await asyncio.gather(*delete_tasks, return_exceptions=True)
-                            success_count = sum(1 for r in results if r is True)
-                            
-                            print(f"[EventSub] Successfully cleaned up {success_count}/{len(old_sub_ids)} old subscriptions")
-                        else:
-                            print(f"[EventSub] No subscriptions found for old sessions")
-        except Exception as e:
-            print(f"[EventSub] Error cleaning up old sessions: {e}")
+                # Save the current title temporarily (for when they go online again)
+                if current_title and current_title != "Offline":
+                    offline_fields["lastTitle"] = current_title
+                    
+                # Set title to "Offline"
+                offline_fields["title"] = "Offline"
+                
+                streamer_store.patch(streamer_name, **offline_fields)
+                get_event_bus().publish(STREAM_OFFLINE, streamer=streamer_name, user_id=user_id, source="eventsub")
+                
+                # Outside dual mode this now wants stream.online, the
+                # reconciler swaps the subscription
+                self.shard_planner.set_live(user_id, False)
+                if not self.shard_planner.dual:
+                    self.reconciler.request()
+                
+                # Notify WebSocket clients
+                if self.websocket_manager:
+                    await self.websocket_manager.broadcast_live_status(streamer_name, False)
+                    await self.websocket_manager.broadcast_status_update(
+                        "twitch", 
+                        streamer_name, 
+                        {"isLive": False, "title": "Offline"}
+                    )
 
     async def add_streamer_subscription(self, user_id, streamer_name, is_live):
         """
         Add a new streamer subscription to the EventSub service.
         
         Creates a new subscription for a streamer without requiring a full service restart.
-        Handles session selection, load balancing across available connections, and
-        rate limiting for Twitch API requests.
+        The shard planner picks the connection with the most room; if that shard has no
+        connection yet, one is started. The reconciler creates the subscription once the
+        shard's session is up.
         
         Args:
             user_id: Twitch user ID of the streamer
@@ -1301,7 +1260,7 @@ class EventSubService:
             is_live: Current live status of the streamer (determines event type to subscribe to)
             
         Returns:
-            bool: True if subscription was successfully created, False otherwise
+            bool: True if the subscription was scheduled, False otherwise
         """
         print(f"[EventSub] Adding subscription for {streamer_name}")
         
@@ -1309,252 +1268,46 @@ class EventSubService:
         if not self.token:
             print(f"[EventSub] Missing token, can't add subscription")
             return False
-        
-        # Check for active sessions - if none, try to reconnect
-        if not self.session_ids:
-            print(f"[EventSub] No active sessions, attempting to reconnect before adding subscription")
-            try:
-                reconnect_success = await self._reconnect_websockets()
-                if not reconnect_success:
-                    print(f"[EventSub] Reconnection failed, can't add subscription")
-                    return False
-            except Exception as e:
-                print(f"[EventSub] Error during reconnection: {e}")
-                return False
-                
-        # Determine event type based on current status
-        event_type = "stream.offline" if is_live else "stream.online"
-        
-        # First check if this streamer already has a subscription
-        await self._check_and_clean_streamer_subscriptions(user_id, streamer_name)
-        
-        # Find a connection that has available capacity
-        # Twitch has a max of 10 subscriptions per connection
-        connection_selected = False
-        session_id = None
-        
-        # Count subscriptions per session
-        session_counts = {}
-        for session_id in self.session_ids:
-            if session_id in self.subscriptions_by_session:
-                session_counts[session_id] = len(self.subscriptions_by_session[session_id])
-            else:
-                session_counts[session_id] = 0
-        
-        # Find a session with space available
-        for session_id, count in session_counts.items():
-            if count < 8:  # Reduced from 10 to provide buffer
-                connection_selected = True
-                break
-        
-        # If no connection with space, use the one with the least subscriptions
-        if not connection_selected and self.session_ids:
-            session_id = min(session_counts, key=session_counts.get)
-            print(f"[EventSub] Warning: Adding to session {session_id} with {session_counts[session_id]} subscriptions")
-            connection_selected = True
-        elif not self.session_ids:
-            print(f"[EventSub] No active sessions available")
+            
+        # Place the streamer in a shard within Twitch's limits
+        connection_id = self.shard_planner.assign(user_id, streamer_name, is_live)
+        if connection_id is None:
+            self._report_uncovered(self.shard_planner.uncovered_names())
             return False
-        
-        # If we have a session, try to create subscription
-        if session_id:
-            # Check for rate limits before attempting subscription
-            current_time = time.time()
-            if current_time < self.retry_after:
-                wait_time = self.retry_after - current_time
-                print(f"[EventSub] Rate limited, waiting {wait_time:.1f} seconds before adding subscription")
-                await asyncio.sleep(wait_time)
             
-            # Use the rate limiter
-            async with self.subscription_rate_limiter:
-                success = await self._create_subscription(session_id, user_id, streamer_name, event_type)
-                
-                if success:
-                    print(f"[EventSub] Successfully added subscription to {event_type} for {streamer_name}")
-                    self.active_subscriptions[user_id] = {
-                        "streamer": streamer_name,
-                        "event_type": event_type,
-                        "session_id": session_id
-                    }
-                    
-                    # Add to session tracking
-                    if session_id not in self.subscriptions_by_session:
-                        self.subscriptions_by_session[session_id] = {}
-                        
-                    self.subscriptions_by_session[session_id][user_id] = {
-                        "streamer": streamer_name,
-                        "event_type": event_type
-                    }
-                    
-                    return True
-                else:
-                    print(f"[EventSub] Failed to add subscription for {streamer_name}")
-        else:
-            print(f"[EventSub] No active sessions available")
-        
-        return False
-    
+        conn = self._get_connection(connection_id)
+        if conn is None or conn["task"].done():
+            print(f"[EventSub] Starting connection {connection_id} for {streamer_name}")
+            self._start_connection(connection_id)
+            return True
+            
+        self.reconciler.request()
+        return True
+
     async def remove_streamer_subscription(self, user_id, quiet=False):
         """
         Remove a streamer's EventSub subscription.
         
-        Deletes the subscription from Twitch's servers and updates local tracking.
-        Handles cases where the subscription might not exist or multiple
-        subscriptions might need to be removed.
+        Releases the streamer from the shard plan; the reconciler deletes every
+        subscription Twitch still has for them on our sessions.
         
         Args:
             user_id: Twitch user ID of the streamer
             quiet: Whether to suppress detailed log messages
             
         Returns:
-            bool: True if subscription was successfully removed, False otherwise
+            bool: True if the streamer was monitored through EventSub, False otherwise
         """
-        
-        # Check if this user_id is already being unsubscribed
-        if user_id in self.pending_unsubscribes:
-            # Print statement removed
-            return True
-            
-        # Add to pending set
-        self.pending_unsubscribes.add(user_id)
-        
-        try:
-            # Check if we have this subscription in our internal tracking
-            if user_id not in self.active_subscriptions:
-                self.pending_unsubscribes.remove(user_id)
-                return False
-            
-            # Get subscription details
-            subscription = self.active_subscriptions[user_id]
-            streamer_name = subscription.get("streamer", "unknown")
-            session_id = subscription.get("session_id")
+        subscription = self.active_subscriptions.get(user_id)
+        connection_id = self.shard_planner.release(user_id)
+        if connection_id is None and subscription is None:
+            return False
             
-            # Also remove from session tracking
-            if session_id in self.subscriptions_by_session and user_id in self.subscriptions_by_session[session_id]:
-                del self.subscriptions_by_session[session_id][user_id]
+        if not quiet and subscription:
+            print(f"[EventSub] Removing subscription for {subscription['streamer']}")
             
-            # With WebSocket transport, we need to explicitly delete the subscription from Twitch API
-            try:
-                url = "https://api.twitch.tv/helix/eventsub/subscriptions"
-                
-                # Use the token from token_manager or the stored one
-                token_to_use = None
-                if hasattr(self, 'token_manager') and self.token_manager:
-                    token_to_use, _ = await self.token_manager.get_access_token()
-                
-                if not token_to_use:
-                    token_to_use = self.token
-                    
-                if not token_to_use:
-                    if not quiet:
-                        print(f"[EventSub] No token available for deleting subscription for {streamer_name}")
-                    # Still remove from our tracking dictionary
-                    if user_id in self.active_subscriptions:
-                        del self.active_subscriptions[user_id]
-                    self.pending_unsubscribes.remove(user_id)
-                    return False
-                    
-                headers = {
-                    "Client-ID": EVENTSUB_CLIENT_ID,
-                    "Authorization": f"Bearer {token_to_use}",
-                }
-                
-                # First, get all active subscriptions to find the one(s) for this user_id
-                ssl_context = ssl.create_default_context(cafile=certifi.where())
-                
-                async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context)) as session:
-                    async with session.get(url, headers=headers, timeout=30) as response:
-                        if response.status == 200:
-                            data = await response.json()
-                            subscriptions = data.get("data", [])
-                            
-                            # Create a dictionary to track unique subscriptions by ID
-                            unique_subs_by_id = {}
-                            
-                            # Find subscriptions for this user_id and deduplicate by ID
-                            for sub in subscriptions:
-                                condition = sub.get("condition", {})
-                                if condition.get("broadcaster_user_id") == user_id:
-                                    sub_id = sub.get("id")
-                                    sub_type = sub.get("type")
-                                    if sub_id:
-                                        unique_subs_by_id[sub_id] = sub_type
-                            
-                            if not unique_subs_by_id:
-                                if not quiet:
-                                    print(f"[EventSub] No subscriptions found on Twitch for {streamer_name}")
-                                # Still remove from our tracking dictionary
-                                if user_id in self.active_subscriptions:
-                                    del self.active_subscriptions[user_id]
-                                self.pending_unsubscribes.remove(user_id)
-                                return True
-                            
-                            # Delete each unique subscription found
-                            success = True
-                            deleted_count = 0
-                            
-                            # Use a semaphore to limit concurrent deletions
-                            delete_semaphore = asyncio.Semaphore(3)
-                            
-                            async def delete_single_subscription(sub_id):
-                                nonlocal deleted_count
-                                try:
-                                    async with delete_semaphore:
-                                        delete_url = f"{url}?id={sub_id}"
-                                        async with session.delete(delete_url, headers=headers, timeout=10) as delete_response:
-                                            if delete_response.status == 204:  # Success for DELETE is 204 No Content
-                                                deleted_count += 1
-                                                return True
-                                            else:
-                                                if not quiet:
-                                                    error_text = await delete_response.text()
-                                                    print(f"[EventSub] Failed to delete subscription {sub_id}: {delete_response.status} - {error_text}")
-                                                return False
-                                except Exception as e:
-                                    if not quiet:
-                                        print(f"[EventSub] Exception while deleting subscription {sub_id}: {e}")
-                                    return False
-                            
-                            # Create tasks for all deletions
-                            delete_tasks = []
-                            for sub_id in unique_subs_by_id:
-                                delete_tasks.append(asyncio.create_task(delete_single_subscription(sub_id)))
-                            
-                            # Wait for all deletions to complete
-                            if delete_tasks:
-                                results = await asyncio.gather(*delete_tasks, return_exceptions=True)
-                                success = all(isinstance(r, bool) and r for r in results)
-                            
-                            # Remove from our tracking regardless of API success
-                            if user_id in self.active_subscriptions:
-                                del self.active_subscriptions[user_id]
-                            
-                            self.pending_unsubscribes.remove(user_id)
-                            return success
-                        else:
-                            if not quiet:
-                                error_text = await response.text()
-                                print(f"[EventSub] Failed to get subscriptions: {response.status} - {error_text}")
-                            # Still remove from our tracking dictionary
-                            if user_id in self.active_subscriptions:
-                                del self.active_subscriptions[user_id]
-                            self.pending_unsubscribes.remove(user_id)
-                            return False
-            except Exception as e:
-                if not quiet:
-                    print(f"[EventSub] Error removing subscription for {streamer_name}: {e}")
-                # Still remove from our tracking dictionary to avoid issues
-                if user_id in self.active_subscriptions:
-                    del self.active_subscriptions[user_id]
-                self.pending_unsubscribes.remove(user_id)
-                return False
-        except Exception as e:
-            if not quiet:
-                print(f"[EventSub] Unhandled error in remove_streamer_subscription: {e}")
-            # Make sure to remove from pending set
-            if user_id in self.pending_unsubscribes:
-                self.pending_unsubscribes.remove(user_id)
-            return False
+        self.reconciler.request()
+        return True
 
     def get_status(self):
         """
@@ -1593,12 +1346,13 @@ class EventSubService:
                 live_streamers.append(streamer)
         
         # Count subscriptions per session
-        session_counts = {}
-        for session_id in self.session_ids:
-            if session_id in self.subscriptions_by_session:
-                session_counts[session_id] = len(self.subscriptions_by_session[session_id])
-            else:
-                session_counts[session_id] = 0
+        session_counts = {
+            session_id: len(subscriptions)
+            for session_id, subscriptions in self.subscriptions_by_session.items()
+            if session_id in self.session_ids
+        }
+        
+        shard_status = self.shard_planner.get_status()
         
         return {
             "status": "active" if active_connections > 0 else "inactive",
@@ -1615,5 +1369,12 @@ class EventSubService:
             "uptime": time.time() - getattr(self, 'initialization_time', time.time()),
             "connection_tasks": len(self.connection_tasks),
             "session_ids": len(self.session_ids),
-            "session_subscription_counts": session_counts
+            "session_subscription_counts": session_counts,
+            "shards": shard_status,
+            "uncovered_streamers": shard_status["uncovered_streamers"],
+            "subscription_snapshot": self.subscription_snapshot.get_stats(),
+            "reconnect_handoffs": dict(self.handoff_stats),
+            "notifications": self.notification_guard.get_stats(),
+            "notification_queue": self.notification_dispatcher.get_stats(),
+            "reconciler": self.reconciler.get_status()
         }
\ No newline at end of file
@@ -0,0 +1,434 @@
+"""
+Shard planner for EventSub WebSocket subscriptions.
+
+Twitch limits WebSocket EventSub per client ID and user token:
+
+- at most 3 enabled WebSocket connections (sessions)
+- at most 300 enabled subscriptions per session
+- a combined subscription cost of max_total_cost (10 by default), shared
+  by all WebSocket subscriptions of the token
+
+The planner assigns each monitored channel to a shard (one shard per
+WebSocket session) so that none of these limits is exceeded, spreads
+channels across as many sessions as allowed, and keeps existing
+assignments stable when the roster changes so only the difference has to
+be subscribed or unsubscribed. Channels that don't fit are reported as
+uncovered instead of being dropped silently.
+
+The budget and subscription cost are updated from the max_total_cost and
+cost fields Twitch returns when a subscription is created. The cost used
+by other clients of the token is derived from a full subscription listing,
+where total_cost and the subscriptions on our own sessions are read
+together.
+
+In dual mode every channel keeps both stream.online and stream.offline
+subscribed, so a live status change needs no API calls and no transition
+can be missed. That doubles the subscriptions (and cost) per channel; the
+planner only uses dual mode while the whole roster still fits, and falls
+back to one subscription per channel otherwise, preferring coverage.
+Switching modes re-creates every subscription, so the planner only
+switches back into dual mode when DUAL_MODE_MARGIN channels are still
+free. A roster or cost figure right at the limit therefore doesn't flip
+modes on every rebalance.
+
+Usage:
+    planner = EventSubShardPlanner(max_sessions=3, dual=True)
+    changes = planner.plan([(user_id, streamer_name, is_live), ...])
+    for shard_id, members in changes["added"].items():
+        ...
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+# Twitch EventSub WebSocket transport limits
+MAX_WEBSOCKET_SESSIONS = 3
+MAX_SUBSCRIPTIONS_PER_SESSION = 300
+DEFAULT_MAX_TOTAL_COST = 10
+DEFAULT_SUBSCRIPTION_COST = 1
+
+# Channels that must still fit in dual mode before switching back to it
+DUAL_MODE_MARGIN = 1
+
+
+class EventSubShardPlanner:
+    """
+    Packs channel subscriptions into WebSocket shards.
+
+    Every monitored channel needs one subscription at a time (stream.online
+    while offline, stream.offline while live), or both in dual mode, so a
+    channel is the unit of placement. New channels go to the least loaded
+    shard with room; existing channels never move between shards unless
+    their shard disappears or the mode changes.
+
+    Attributes:
+        max_sessions (int): Maximum number of WebSocket sessions
+        max_per_session (int): Maximum subscriptions per session
+        max_total_cost (int): Cost budget shared by all subscriptions
+        subscription_cost (int): Cost of a single subscription
+        external_cost (int): Cost used by subscriptions this planner
+            doesn't manage (learned from Twitch's total_cost)
+        prefer_dual (bool): Whether dual mode should be used when it fits
+        dual (bool): Whether dual mode is currently active
+        shards (List[Dict[str, Tuple[str, bool]]]): Per shard mapping of
+            user_id to (streamer_name, is_live)
+        uncovered (Dict[str, Tuple[str, bool]]): Channels that didn't fit
+        _placed_at (Dict[str, int]): Placement sequence number per channel,
+            the latest placed channels are shed first when the budget shrinks
+    """
+
+    def __init__(self, max_sessions: int = MAX_WEBSOCKET_SESSIONS,
+                 max_per_session: int = MAX_SUBSCRIPTIONS_PER_SESSION,
+                 max_total_cost: int = DEFAULT_MAX_TOTAL_COST,
+                 subscription_cost: int = DEFAULT_SUBSCRIPTION_COST,
+                 dual: bool = False):
+        """
+        Initialize an empty plan.
+
+        Args:
+            max_sessions: Maximum number of WebSocket sessions
+            max_per_session: Maximum subscriptions per session
+            max_total_cost: Cost budget shared by all subscriptions
+            subscription_cost: Cost of a single subscription
+            dual: Subscribe to both stream.online and stream.offline per
+                channel while the roster fits
+        """
+        self.max_sessions = max_sessions
+        self.max_per_session = max_per_session
+        self.max_total_cost = max_total_cost
+        self.subscription_cost = subscription_cost
+        self.external_cost = 0
+        self.prefer_dual = dual
+        self.dual = False
+        self.shards: List[Dict[str, Tuple[str, bool]]] = []
+        self.uncovered: Dict[str, Tuple[str, bool]] = {}
+        self._placed_at: Dict[str, int] = {}
+        self._placements = 0
+
+    # ------------------------------------------------------------------
+    # Capacity
+    # ------------------------------------------------------------------
+
+    @property
+    def covered_count(self) -> int:
+        """Number of channels currently assigned to a shard."""
+        return sum(len(shard) for shard in self.shards)
+
+    @property
+    def subscriptions_per_channel(self) -> int:
+        """Number of subscriptions each channel uses in the current mode."""
+        return 2 if self.dual else 1
+
+    @property
+    def channels_per_session(self) -> int:
+        """Number of channels that fit in one session in the current mode."""
+        return self.max_per_session // self.subscriptions_per_channel
+
+    def _capacity_for(self, per_channel: int) -> int:
+        """
+        Number of channels that can be covered with a given number of
+        subscriptions per channel.
+
+        Args:
+            per_channel: Subscriptions each channel uses
+
+        Returns:
+            int: The smaller of the session limit and the cost budget
+        """
+        session_capacity = self.max_sessions * (self.max_per_session // per_channel)
+        channel_cost = self.subscription_cost * per_channel
+        if channel_cost <= 0:
+            return session_capacity
+        budget = max(0, self.max_total_cost - self.external_cost)
+        return min(session_capacity, budget // channel_cost)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Total number of channels that can be covered in the current mode.
+
+        Returns:
+            int: The smaller of the session limit and the cost budget
+        """
+        return self._capacity_for(self.subscriptions_per_channel)
+
+    def update_limits(self, total_cost: Optional[int] = None,
+                      max_total_cost: Optional[int] = None,
+                      cost: Optional[int] = None,
+                      own_cost: Optional[int] = None) -> None:
+        """
+        Update the cost limits from a Helix EventSub response.
+
+        total_cost and own_cost must come from the same subscription
+        listing. A create response's total_cost can't be split reliably
+        while other creates are still in flight, so pass only
+        max_total_cost and cost from those.
+
+        Args:
+            total_cost: Cost used by all subscriptions of the token
+            max_total_cost: Cost budget of the token
+            cost: Cost of the subscription that was just created
+            own_cost: Cost of the subscriptions on this service's sessions,
+                used to tell our cost apart from other clients'
+        """
+        if max_total_cost is not None:
+            self.max_total_cost = max_total_cost
+        if cost is not None:
+            self.subscription_cost = cost
+        if total_cost is not None and own_cost is not None:
+            # Whatever Twitch counts beyond our own subscriptions belongs to
+            # other clients of the same token
+            self.external_cost = max(0, total_cost - own_cost)
+
+    def _target_shard_count(self, channels: int) -> int:
+        """Return how many shards to spread the given number of channels over."""
+        if channels <= 0:
+            return 0
+        return min(self.max_sessions, channels)
+
+    # ------------------------------------------------------------------
+    # Planning
+    # ------------------------------------------------------------------
+
+    def shard_of(self, user_id: str) -> Optional[int]:
+        """
+        Return the shard a channel is assigned to.
+
+        Args:
+            user_id: Twitch user ID of the streamer
+
+        Returns:
+            Optional[int]: Shard index, or None if unassigned or uncovered
+        """
+        for shard_id, shard in enumerate(self.shards):
+            if user_id in shard:
+                return shard_id
+        return None
+
+    def members(self, shard_id: int) -> List[Tuple[str, str, bool]]:
+        """
+        Return the channels assigned to a shard.
+
+        Args:
+            shard_id: Shard index
+
+        Returns:
+            List[Tuple[str, str, bool]]: (user_id, streamer_name, is_live)
+            tuples, in the format used by EventSubService connections
+        """
+        if shard_id >= len(self.shards):
+            return []
+        return [(user_id, name, is_live) for user_id, (name, is_live) in self.shards[shard_id].items()]
+
+    def _place(self, user_id: str, name: str, is_live: bool, shard_count: int) -> Optional[int]:
+        """
+        Assign a channel to the least loaded shard with room.
+
+        Args:
+            user_id: Twitch user ID of the streamer
+            name: Twitch username of the streamer
+            is_live: Current live status
+            shard_count: Number of shards that may be used
+
+        Returns:
+            Optional[int]: Shard index, or None if the channel doesn't fit
+        """
+        if self.covered_count >= self.capacity:
+            return None
+
+        while len(self.shards) < shard_count:
+            self.shards.append({})
+
+        candidates = [
+            shard_id for shard_id in range(len(self.shards))
+            if len(self.shards[shard_id]) < self.channels_per_session
+        ]
+        if not candidates:
+            return None
+
+        shard_id = min(candidates, key=lambda i: len(self.shards[i]))
+        self.shards[shard_id][user_id] = (name, is_live)
+        self._placements += 1
+        self._placed_at[user_id] = self._placements
+        return shard_id
+
+    def _shed(self, removed: Dict[int, List[Tuple[str, str, bool]]]) -> None:
+        """
+        Release the most recently placed channels until the plan fits the capacity.
+
+        Args:
+            removed: Per shard list the released channels are added to
+        """
+        while self.covered_count > self.capacity:
+            user_id = max(
+                (user_id for shard in self.shards for user_id in shard),
+                key=lambda user_id: self._placed_at.get(user_id, 0),
+            )
+            shard_id = self.shard_of(user_id)
+            name, is_live = self.shards[shard_id].pop(user_id)
+            self._placed_at.pop(user_id, None)
+            removed.setdefault(shard_id, []).append((user_id, name, is_live))
+
+    def plan(self, streamers: List[Tuple[str, str, bool]]) -> Dict[str, Any]:
+        """
+        Rebalance incrementally against the current roster.
+
+        Channels that are no longer monitored are released, channels that
+        are still monitored keep their shard, and new channels (or
+        previously uncovered ones, if room opened up) are placed. If the
+        cost budget shrank below the covered channels, the most recently
+        placed ones are released and reported as uncovered.
+
+        Dual mode is kept while the whole roster fits with two subscriptions
+        per channel and switched off when it doesn't. Once channels are
+        placed, it is only switched back on with DUAL_MODE_MARGIN channels
+        to spare. A mode change changes the room per shard, so every channel
+        is placed again.
+
+        Args:
+            streamers: (user_id, streamer_name, is_live) for every monitored
+                channel with a Twitch ID
+
+        Returns:
+            Dict[str, Any]: {"added": {shard_id: [(user_id, name, is_live)]},
+            "removed": {shard_id: [(user_id, name, is_live)]},
+            "uncovered": [streamer_name, ...], "dual": bool,
+            "mode_changed": bool}
+        """
+        wanted = {user_id: (name, is_live) for user_id, name, is_live in streamers}
+        added: Dict[int, List[Tuple[str, str, bool]]] = {}
+        removed: Dict[int, List[Tuple[str, str, bool]]] = {}
+
+        # Prefer covering every channel over watching both transitions
+        dual_capacity = self._capacity_for(2)
+        if self.dual or not self.shards:
+            dual = self.prefer_dual and len(wanted) <= dual_capacity
+        else:
+            # Switching back re-creates every subscription, only do it with room to spare
+            dual = self.prefer_dual and len(wanted) + DUAL_MODE_MARGIN <= dual_capacity
+        mode_changed = dual != self.dual
+        if mode_changed:
+            self.dual = dual
+            for shard_id, shard in enumerate(self.shards):
+                for user_id, (name, is_live) in shard.items():
+                    removed.setdefault(shard_id, []).append((user_id, name, is_live))
+            self.shards = []
+            self._placed_at = {}
+
+        # Release channels that are gone and refresh names/status of the rest
+        for shard_id, shard in enumerate(self.shards):
+            for user_id in list(shard.keys()):
+                if user_id not in wanted:
+                    name, is_live = shard.pop(user_id)
+                    self._placed_at.pop(user_id, None)
+                    removed.setdefault(shard_id, []).append((user_id, name, is_live))
+                else:
+                    shard[user_id] = wanted[user_id]
+
+        # The cost budget may have shrunk (other clients of the token, a
+        # lower max_total_cost); those channels become uncovered below
+        self._shed(removed)
+
+        # Drop trailing empty shards so their sessions can be closed
+        while self.shards and not self.shards[-1]:
+            self.shards.pop()
+
+        # Place new and previously uncovered channels
+        self.uncovered = {}
+        shard_count = self._target_shard_count(min(len(wanted), self.capacity))
+        for user_id, (name, is_live) in wanted.items():
+            if self.shard_of(user_id) is not None:
+                continue
+            shard_id = self._place(user_id, name, is_live, shard_count)
+            if shard_id is None:
+                self.uncovered[user_id] = (name, is_live)
+            else:
+                added.setdefault(shard_id, []).append((user_id, name, is_live))
+
+        return {
+            "added": added,
+            "removed": removed,
+            "uncovered": self.uncovered_names(),
+            "dual": self.dual,
+            "mode_changed": mode_changed,
+        }
+
+    def assign(self, user_id: str, name: str, is_live: bool) -> Optional[int]:
+        """
+        Place a single new channel without recomputing the whole plan.
+
+        Args:
+            user_id: Twitch user ID of the streamer
+            name: Twitch username of the streamer
+            is_live: Current live status
+
+        Returns:
+            Optional[int]: Shard index, or None if the channel is uncovered
+        """
+        shard_id = self.shard_of(user_id)
+        if shard_id is not None:
+            self.shards[shard_id][user_id] = (name, is_live)
+            return shard_id
+
+        shard_count = self._target_shard_count(self.covered_count + 1)
+        shard_id = self._place(user_id, name, is_live, shard_count)
+        if shard_id is None:
+            self.uncovered[user_id] = (name, is_live)
+        else:
+            self.uncovered.pop(user_id, None)
+        return shard_id
+
+    def release(self, user_id: str) -> Optional[int]:
+        """
+        Remove a channel from the plan.
+
+        Args:
+            user_id: Twitch user ID of the streamer
+
+        Returns:
+            Optional[int]: Shard index the channel was assigned to, if any
+        """
+        self.uncovered.pop(user_id, None)
+        self._placed_at.pop(user_id, None)
+        shard_id = self.shard_of(user_id)
+        if shard_id is not None:
+            del self.shards[shard_id][user_id]
+        return shard_id
+
+    def set_live(self, user_id: str, is_live: bool) -> None:
+        """
+        Record a channel's live status so restarted shards subscribe to the
+        right event type.
+
+        Args:
+            user_id: Twitch user ID of the streamer
+            is_live: Current live status
+        """
+        shard_id = self.shard_of(user_id)
+        if shard_id is not None:
+            name, _ = self.shards[shard_id][user_id]
+            self.shards[shard_id][user_id] = (name, is_live)
+
+    def uncovered_names(self) -> List[str]:
+        """Return the names of channels that could not be placed."""
+        return sorted(name for name, _ in self.uncovered.values())
+
+    def get_status(self) -> Dict[str, Any]:
+        """
+        Summarize the plan for status reporting.
+
+        Returns:
+            Dict[str, Any]: Shard sizes, limits and uncovered channels
+        """
+        return {
+            "shards": [len(shard) for shard in self.shards],
+            "covered": self.covered_count,
+            "capacity": self.capacity,
+            "max_sessions": self.max_sessions,
+            "max_per_session": self.max_per_session,
+            "max_total_cost": self.max_total_cost,
+            "subscription_cost": self.subscription_cost,
+            "external_cost": self.external_cost,
+            "dual": self.dual,
+            "subscriptions_per_channel": self.subscriptions_per_channel,
+            "uncovered_streamers": self.uncovered_names(),
+        }
@@ -8,10 +8,12 @@ The GQLClient class offers methods to:
 - Look up channel IDs from usernames
 - Check stream status for multiple streamers
 - Get detailed channel information with efficient caching
-- Manage SSL contexts and connection handling
+- Fetch many channels at once with batched users(ids/logins) queries
+- Persist long-lived channel metadata across restarts
+- Manage SSL contexts and a pooled keep-alive connection
 
 Usage:
-    client = GQLClient()
+    client = get_gql_client()
     
     # Look up channel IDs
     ids = await client.lookup_channel_ids(["streamer1", "streamer2"])
@@ -21,15 +23,64 @@ Usage:
     
     # Get detailed channel info
     channel_info = await client.get_channel_info("channel_id")
+    
+    # Get channel info for many channels in a few requests
+    channels = await client.get_channels_info(["id1", "id2", ...])
 """
 
 from typing import Dict, Any, List, Optional
 import asyncio
+import json
+import os
 import aiohttp
-import time
 import ssl
 import certifi
-from backend.src.config.constants import TWITCH_GQL_URL, CLIENT_ID
+from backend.src.config.constants import (
+    TWITCH_GQL_URL,
+    CLIENT_ID,
+    GQL_BATCH_SIZE,
+    GQL_POOL_LIMIT,
+    GQL_KEEPALIVE_TIMEOUT,
+    GQL_CACHE_MAX_ENTRIES,
+)
+from backend.src.services.ttl_cache import TTLCache
+from backend.src.services.rate_limiter import get_rate_limiter
+
+# Fields fetched for every channel in channel info queries
+CHANNEL_INFO_FIELDS = """
+    id
+    login
+    displayName
+    profileImageURL(width: 150)
+    offlineImageURL
+    stream {
+        id
+        title
+        viewersCount
+        previewImageURL(width: 440, height: 248)
+        game {
+            name
+        }
+    }
+"""
+
+# Fields fetched when only the stream status of cached channels is outdated
+STREAM_STATUS_FIELDS = """
+    id
+    stream {
+        id
+        title
+        viewersCount
+        previewImageURL(width: 440, height: 248)
+        game {
+            name
+        }
+    }
+"""
+
+# Channel info fields by how quickly they change
+PROFILE_FIELDS = ["id", "login", "displayName", "profileImageURL", "offlineImageURL"]
+STREAM_FIELDS = ["stream", "isLive", "title", "thumbnail", "viewersCount", "game"]
 
 
 class GQLClient:
@@ -38,41 +89,245 @@ class GQLClient:
     
     This client handles authentication, rate limiting, request timeouts,
     response caching, and SSL configuration for secure API communication.
+    All requests share one aiohttp session with a keep-alive connection
+    pool, so repeated lookups skip the TCP and TLS handshakes. Use
+    get_gql_client() to get the process-wide instance.
     
     Attributes:
         headers (Dict[str, str]): HTTP headers for GraphQL requests
-        _rate_limit_semaphore (asyncio.Semaphore): Semaphore for API rate limiting
+        _rate_limiter (RateLimiter): Shared limiter for the GQL endpoint family
         _request_timeout (aiohttp.ClientTimeout): Timeout configuration for requests
-        _cache (Dict): Cache storage for API responses
-        _cache_ttl (Dict): Time-to-live values for different cache types
+        _cache (TTLCache): Bounded channel info cache with per-field TTLs
+        _background_tasks (Set[asyncio.Task]): Running stale-while-revalidate refreshes
+        _cache_file (Optional[str]): File the profile part of the cache is persisted to
         _ssl_context (ssl.SSLContext): SSL context for secure connections
+        _pool_limit (int): Maximum number of pooled connections
+        _keepalive_timeout (float): Seconds idle connections are kept open
+        _session (Optional[aiohttp.ClientSession]): Lazily created shared session
+        _inflight (Dict[str, asyncio.Future]): Lookups currently in progress,
+            shared by concurrent callers for the same cache key
+        _stats (Dict[str, int]): Fetch, coalesce and revalidation counters
     """
 
-    def __init__(self):
+    def __init__(self, pool_limit: int = GQL_POOL_LIMIT,
+                 keepalive_timeout: float = GQL_KEEPALIVE_TIMEOUT,
+                 cache_file: Optional[str] = None):
         """
         Initialize the GraphQL client with default configuration.
         
         Sets up headers, rate limiting, timeouts, caching configuration,
-        and SSL context for secure API communication.
+        and SSL context for secure API communication. The connection pool is
+        created on first use.
+        
+        Args:
+            pool_limit: Maximum number of pooled connections
+            keepalive_timeout: Seconds to keep idle connections open for reuse
+            cache_file: Optional file to load cached channel metadata from and
+                        save it to, so restarts don't re-fetch every channel
         """
         self.headers = {
             "Client-ID": CLIENT_ID,
             "Content-Type": "application/json",
         }
-        # Rate limit to 10 concurrent requests
-        self._rate_limit_semaphore = asyncio.Semaphore(10)
+        # Token bucket shared with every other GQL caller in the process
+        self._rate_limiter = get_rate_limiter("gql")
         # Set 10-second timeout for requests
         self._request_timeout = aiohttp.ClientTimeout(total=10)
-        # Initialize cache storage
-        self._cache = {}
-        # Configure TTL values for different cache types
-        self._cache_ttl = {
-            "channel_info": 86400,  # 24 hours for profile images, offline screens
-            "stream_status": 60     # 1 minute for stream status
-        }
+        # Channel info cache: (fields, TTL, stale-while-revalidate window)
+        self._cache = TTLCache(
+            max_entries=GQL_CACHE_MAX_ENTRIES,
+            groups={
+                "profile": (PROFILE_FIELDS, 86400, 3600),  # 24 hours for profile images, offline screens
+                "stream": (STREAM_FIELDS, 60, 60),         # 1 minute for stream status
+            },
+            negative_ttl=300  # Unknown channels are not looked up again for 5 minutes
+        )
+        self._background_tasks = set()
+        self._cache_file = cache_file
+        self._saved_profile_version = 0  # Profile group version last written to the cache file
+        if cache_file:
+            self.load_cache()
         
         # Create a secure SSL context using certifi's CA bundle
         self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        
+        # Shared connection pool, created lazily inside the event loop
+        self._pool_limit = pool_limit
+        self._keepalive_timeout = keepalive_timeout
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop = None
+        
+        # Single-flight: concurrent lookups for the same key share one request
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self._stats = {"fetches": 0, "coalesced": 0, "revalidations": 0}
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared session, creating it if needed.
+        
+        A new session is created if the previous one was closed or belongs
+        to a different event loop.
+        
+        Returns:
+            aiohttp.ClientSession: Session with a keep-alive connection pool
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
+            connector = aiohttp.TCPConnector(
+                ssl=self._ssl_context,
+                limit=self._pool_limit,
+                limit_per_host=self._pool_limit,
+                keepalive_timeout=self._keepalive_timeout,
+                ttl_dns_cache=300,
+            )
+            self._session = aiohttp.ClientSession(
+                timeout=self._request_timeout,
+                connector=connector,
+            )
+            self._session_loop = loop
+        return self._session
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get channel info cache and request coalescing statistics.
+        
+        Returns:
+            Dict[str, Any]: Cache counters and hit rate (see TTLCache.get_stats),
+            channels fetched, coalesced callers that joined an in-flight
+            request, background revalidations and requests currently in flight
+        """
+        stats = self._cache.get_stats()
+        stats.update(self._stats)
+        stats["inflight"] = len(self._inflight)
+        return stats
+
+    def expire_stream_status(self, channel_id: str) -> None:
+        """
+        Forget the cached stream status of a channel.
+        
+        Called when EventSub reports a stream going live or offline, so the
+        next lookup doesn't serve the status from before the change.
+        
+        Args:
+            channel_id: Twitch channel ID
+        """
+        self._cache.expire(f"channel_info:{channel_id}", "stream")
+
+    def _start_flight(self, key: str) -> asyncio.Future:
+        """
+        Register an in-flight lookup for a key.
+        
+        Args:
+            key: Cache key of the lookup
+            
+        Returns:
+            asyncio.Future: Future to resolve with the lookup result
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        return future
+
+    def _finish_flight(self, key: str, future: asyncio.Future, result: Dict[str, Any]) -> None:
+        """
+        Resolve an in-flight lookup and unregister it.
+        
+        Args:
+            key: Cache key of the lookup
+            future: Future returned by _start_flight()
+            result: Lookup result, an empty dict on failure
+        """
+        if self._inflight.get(key) is future:
+            del self._inflight[key]
+        if not future.done():
+            future.set_result(result)
+
+    def load_cache(self) -> int:
+        """
+        Load persisted channel metadata into the cache.
+        
+        Entries keep their original timestamps, so anything older than its
+        TTL is refreshed as usual.
+        
+        Returns:
+            int: Number of channels loaded
+        """
+        if not self._cache_file or not os.path.exists(self._cache_file):
+            return 0
+            
+        try:
+            with open(self._cache_file, "r") as f:
+                snapshot = json.load(f)
+            loaded = self._cache.load(snapshot.get("channel_info", {}))
+            # What was just read doesn't need writing back
+            self._saved_profile_version = self._cache.version("profile")
+            print(f"[GQL] Loaded cached metadata for {loaded} channels")
+            return loaded
+        except Exception as e:
+            print(f"[GQL] Error loading cache file: {e}")
+            return 0
+
+    def _export_cache(self) -> Optional[Dict[str, Any]]:
+        """
+        Export the profile part of the cache if it changed since the last save.
+        
+        Returns:
+            Optional[Dict[str, Any]]: File contents to write, None if there
+            is nothing to save
+        """
+        if not self._cache_file:
+            return None
+        version = self._cache.version("profile")
+        if version == self._saved_profile_version:
+            return None
+        self._saved_profile_version = version
+        return {"channel_info": self._cache.export(["profile"])}
+
+    def _write_cache_file(self, snapshot: Dict[str, Any]) -> None:
+        """Write an exported cache to the cache file."""
+        try:
+            # Write to a temporary file first, then rename to avoid corruption
+            temp_file = f"{self._cache_file}.tmp"
+            with open(temp_file, "w") as f:
+                json.dump(snapshot, f, separators=(",", ":"))
+            os.replace(temp_file, self._cache_file)
+        except Exception as e:
+            # Try again on the next save
+            self._saved_profile_version = -1
+            print(f"[GQL] Error saving cache file: {e}")
+
+    def save_cache(self) -> None:
+        """
+        Persist the long-lived (profile) part of the channel info cache.
+        
+        Stream status is not saved, it's outdated by the time the app restarts.
+        Nothing is written if the profile data hasn't changed since the last
+        save. Blocking; use save_cache_async() on the event loop.
+        """
+        snapshot = self._export_cache()
+        if snapshot is not None:
+            self._write_cache_file(snapshot)
+
+    async def save_cache_async(self) -> None:
+        """
+        Persist the profile part of the cache like save_cache(), writing the
+        file in an executor so the event loop isn't blocked.
+        """
+        snapshot = self._export_cache()
+        if snapshot is not None:
+            await asyncio.get_running_loop().run_in_executor(None, self._write_cache_file, snapshot)
+
+    async def close(self):
+        """
+        Close the shared session and its pooled connections, and persist the cache.
+        
+        Safe to call more than once; a later request opens a new session.
+        """
+        await self.save_cache_async()
+
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
 
     async def lookup_channel_ids(self, usernames: List[str]) -> Dict[str, str]:
         """
@@ -86,70 +341,17 @@ class GQLClient:
             Only successfully looked up usernames will be included in the result.
             
         Note:
-            This method handles rate limiting automatically and processes
-            usernames sequentially to comply with API restrictions.
+            Usernames are packed into batched users(logins: [...]) queries of up to
+            GQL_BATCH_SIZE logins each, so a large list costs only a few requests.
         """
-        if not usernames:
-            return {}
-
+        users = await self._fetch_users_batched("logins", usernames, "id login")
+        
         username_to_id = {}
-        query = {
-            "operationName": "GetUserID",
-            "variables": {"login": None},
-            "query": """
-                query GetUserID($login: String!) {
-                    user(login: $login) {
-                        id
-                        login
-                        displayName
-                    }
-                }
-            """,
-        }
-
-        for username in usernames:
-            try:
-                if not username or not username.strip():
-                    continue
-                    
-                async with self._rate_limit_semaphore:
-                    query["variables"]["login"] = username
-                    # Use SSL context for secure connection
-                    async with aiohttp.ClientSession(
-                        timeout=self._request_timeout,
-                        connector=aiohttp.TCPConnector(ssl=self._ssl_context)
-                    ) as session:
-                        async with session.post(
-                            TWITCH_GQL_URL,
-                            headers=self.headers,
-                            json=query,
-                        ) as response:
-                            if response.status == 200:
-                                data = await response.json()
-                                if not data or not isinstance(data, dict):
-                                    print(f"[GQL] Invalid response for username {username}")
-                                    continue
-                                    
-                                # Use safe nested gets to avoid KeyError
-                                user_data = data.get("data", {}).get("user", {})
-                                if user_data and user_data.get("id"):
-                                    user_id = user_data.get("id")
-                                    username_to_id[username.lower()] = user_id
-                                    print(
-                                        f"[GQL] Found channel ID for {username}: {user_id}"
-                                    )
-
-                # Add small delay between requests to avoid rate limiting
-                await asyncio.sleep(0.1)
-            except asyncio.TimeoutError:
-                print(f"[GQL] Timeout looking up channel ID for {username}")
-                continue
-            except Exception as e:
-                print(f"[GQL] Error looking up channel ID for {username}: {e}")
-                import traceback
-                traceback.print_exc()
-                continue
-
+        for login, user_data in users.items():
+            if user_data and user_data.get("id"):
+                username_to_id[login] = user_data["id"]
+                print(f"[GQL] Found channel ID for {login}: {user_data['id']}")
+                
         return username_to_id
         
     async def check_streams_status(self, usernames: List[str]) -> Dict[str, Dict[str, Any]]:
@@ -169,34 +371,36 @@ class GQLClient:
             - offlineImageURL (str): User's offline banner image URL
             
         Note:
-            Processes usernames in batches of 5 to avoid rate limiting and 
-            timeout issues. Failed lookups will return default offline status.
+            Usernames are packed into batched users(logins: [...]) queries of up to
+            GQL_BATCH_SIZE logins each. Failed or unknown lookups return the default
+            offline status.
         """
         if not usernames:
             return {}
             
-        results = {}
+        users = await self._fetch_users_batched("logins", usernames, CHANNEL_INFO_FIELDS)
         
-        # Process in smaller batches to avoid rate limits and timeout issues
-        batch_size = 5
-        for i in range(0, len(usernames), batch_size):
-            batch = usernames[i:i+batch_size]
-            batch_results = await asyncio.gather(
-                *[self.check_stream_status(username) for username in batch],
-                return_exceptions=True
-            )
-            
-            for j, username in enumerate(batch):
-                # Skip results that raised exceptions
-                if isinstance(batch_results[j], Exception):
-                    print(f"[GQL] Error checking stream status for {username}: {batch_results[j]}")
-                    results[username.lower()] = {"isLive": False, "title": None, "thumbnail": None}
-                else:
-                    results[username.lower()] = batch_results[j]
-                    
-            # Add a small delay between batches
-            if i + batch_size < len(usernames):
-                await asyncio.sleep(0.5)
+        results = {}
+        for username in usernames:
+            if not username or not username.strip():
+                continue
+                
+            user_data = users.get(username.lower())
+            if not user_data:
+                results[username.lower()] = {"isLive": False, "title": None, "thumbnail": None}
+                continue
+                
+            info = self._build_channel_info(user_data)
+            results[username.lower()] = {
+                "isLive": bool(info["stream"]),
+                "profileImageURL": info["profileImageURL"],
+                "displayName": info["displayName"],
+                "offlineImageURL": info["offlineImageURL"],
+                "title": info["title"],
+                "thumbnail": info["thumbnail"],
+                "viewersCount": info["viewersCount"],
+                "game": info["game"]
+            }
                 
         return results
         
@@ -249,57 +453,55 @@ class GQLClient:
         }
         
         try:
-            async with self._rate_limit_semaphore:
-                # Use SSL context for secure connection
-                async with aiohttp.ClientSession(
-                    timeout=self._request_timeout,
-                    connector=aiohttp.TCPConnector(ssl=self._ssl_context)
-                ) as session:
-                    async with session.post(
-                        TWITCH_GQL_URL,
-                        headers=self.headers,
-                        json=query
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
+            async with self._rate_limiter.limit():
+                # Reuse the pooled session (keep-alive connections)
+                session = self._get_session()
+                async with session.post(
+                    TWITCH_GQL_URL,
+                    headers=self.headers,
+                    json=query
+                ) as response:
+                    self._rate_limiter.observe(response.status, response.headers)
+                    if response.status == 200:
+                        data = await response.json()
                             
-                            # Handle invalid responses
-                            if not data or not isinstance(data, dict):
-                                print(f"[GQL] Invalid response format for {username}")
-                                return {"isLive": False, "title": None, "thumbnail": None}
+                        # Handle invalid responses
+                        if not data or not isinstance(data, dict):
+                            print(f"[GQL] Invalid response format for {username}")
+                            return {"isLive": False, "title": None, "thumbnail": None}
                                 
-                            # Extract user data
-                            user_data = data.get("data", {}).get("user", {})
-                            if not user_data:
-                                print(f"[GQL] No user data for {username}")
-                                return {"isLive": False, "title": None, "thumbnail": None}
+                        # Extract user data
+                        user_data = data.get("data", {}).get("user", {})
+                        if not user_data:
+                            print(f"[GQL] No user data for {username}")
+                            return {"isLive": False, "title": None, "thumbnail": None}
                                 
-                            # Check if stream exists
-                            stream = user_data.get("stream", None)
+                        # Check if stream exists
+                        stream = user_data.get("stream", None)
                             
-                            # Create result with basic user info
-                            result = {
-                                "isLive": bool(stream),
-                                "profileImageURL": user_data.get("profileImageURL"),
-                                "displayName": user_data.get("displayName"),
-                                "offlineImageURL": user_data.get("offlineImageURL"),
-                                "title": None,
-                                "thumbnail": None
-                            }
+                        # Create result with basic user info
+                        result = {
+                            "isLive": bool(stream),
+                            "profileImageURL": user_data.get("profileImageURL"),
+                            "displayName": user_data.get("displayName"),
+                            "offlineImageURL": user_data.get("offlineImageURL"),
+                            "title": None,
+                            "thumbnail": None
+                        }
                             
-                            # Add stream info if live
-                            if stream and isinstance(stream, dict):
-                                result.update({
-                                    "title": stream.get("title"),
-                                    "thumbnail": stream.get("previewImageURL"),
-                                    "viewersCount": stream.get("viewersCount"),
-                                    "game": (stream.get("game") or {}).get("name")
-                                })
+                        # Add stream info if live
+                        if stream and isinstance(stream, dict):
+                            result.update({
+                                "title": stream.get("title"),
+                                "thumbnail": stream.get("previewImageURL"),
+                                "viewersCount": stream.get("viewersCount"),
+                                "game": (stream.get("game") or {}).get("name")
+                            })
                                 
-                            return result
-                        else:
-                            print(f"[GQL] Error response {response.status} for {username}")
-                            return {"isLive": False, "title": None, "thumbnail": None}
+                        return result
+                    else:
+                        print(f"[GQL] Error response {response.status} for {username}")
+                        return {"isLive": False, "title": None, "thumbnail": None}
         except asyncio.TimeoutError:
             print(f"[GQL] Timeout checking stream status for {username}")
             return {"isLive": False, "title": None, "thumbnail": None}
@@ -313,10 +515,14 @@ class GQLClient:
         """
         Get detailed channel information with efficient caching.
         
-        Implements a two-level caching strategy:
+        Uses the channel info cache with per-field TTLs:
         1. Profile images and offline images are cached for 24 hours
         2. Stream status is cached for only 1 minute
         
+        Slightly stale data is served immediately while it's refreshed in the
+        background, unknown channels are cached negatively, and concurrent
+        lookups for the same channel share one request.
+        
         Args:
             channel_id: Twitch channel ID to look up
             
@@ -342,43 +548,339 @@ class GQLClient:
             
         cache_key = f"channel_info:{channel_id}"
         
-        # Check if we have cached data that's still valid
-        if cache_key in self._cache:
-            cached_data = self._cache[cache_key]
-            age = time.time() - cached_data["timestamp"]
+        lookup = self._cache.get(cache_key)
+        if lookup.negative:
+            return {}
+        if lookup.is_fresh:
+            return lookup.value
+        if lookup.is_servable:
+            # Serve stale data now, refresh in the background
+            self._revalidate([channel_id])
+            return lookup.value
+        
+        # Join a lookup for this channel that's already in progress
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            self._stats["coalesced"] += 1
+            result = await asyncio.shield(inflight)
+            return result.copy()
+        
+        self._stats["fetches"] += 1
+        future = self._start_flight(cache_key)
+        result = {}
+        try:
+            result = await self._load_channel_info(channel_id, lookup)
+        finally:
+            self._finish_flight(cache_key, future, result)
+        
+        return result.copy()
+
+    async def _load_channel_info(self, channel_id: str, lookup) -> Dict[str, Any]:
+        """
+        Load channel information that isn't fresh in the cache.
+        
+        If only the stream status needs refreshing, just the stream status is
+        fetched and merged with the cached profile data.
+        
+        Args:
+            channel_id: Twitch channel ID to look up
+            lookup: CacheLookup for the channel
             
-            # Different TTL for different parts of the data
-            if age < self._cache_ttl["channel_info"]:
-                # For profile images and offline images, use cached data
-                result = cached_data["data"].copy()
-                
-                # For stream status, check if we need fresh data
-                if age >= self._cache_ttl["stream_status"]:
-                    # Only fetch stream status (not profile images)
-                    fresh_stream = await self._fetch_stream_status(channel_id)
-                    if fresh_stream:
-                        result.update(fresh_stream)
-                        # Update cache with new stream status
-                        cached_data["data"].update(fresh_stream)
-                        self._cache[cache_key] = {
-                            "data": cached_data["data"],
-                            "timestamp": time.time()
-                        }
-                
-                return result
+        Returns:
+            Dict containing channel information, empty on error
+        """
+        cache_key = f"channel_info:{channel_id}"
+        
+        needs_refresh = lookup.stale | lookup.expired
+        if lookup.value is not None and needs_refresh <= {"stream"}:
+            # For profile images and offline images, use cached data
+            result = lookup.value
+            
+            # Only fetch stream status (not profile images)
+            fresh_stream = await self._fetch_stream_status(channel_id)
+            if fresh_stream:
+                result.update(fresh_stream)
+                self._cache.set(cache_key, fresh_stream)
+            
+            return result
         
         # If not cached or expired, fetch full data
         result = await self._fetch_channel_info(channel_id)
         
         # Cache the result
         if result:
-            self._cache[cache_key] = {
-                "data": result,
-                "timestamp": time.time()
-            }
+            self._cache.set(cache_key, result)
         
         return result
 
+    def _revalidate(self, channel_ids: List[str]) -> None:
+        """
+        Refresh stale channels in the background.
+        
+        Channels that already have a lookup in flight are skipped; the rest
+        are fetched with one batched request.
+        
+        Args:
+            channel_ids: Twitch channel IDs whose cached data is stale
+        """
+        channel_ids = [
+            channel_id for channel_id in channel_ids
+            if f"channel_info:{channel_id}" not in self._inflight
+        ]
+        if not channel_ids:
+            return
+            
+        self._stats["revalidations"] += len(channel_ids)
+        task = asyncio.create_task(self._fetch_channels(channel_ids))
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+
+    async def get_channels_info(self, channel_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get channel information for many channels with batched requests.
+        
+        Channels with fresh cached data are served from the cache, stale ones
+        are served from the cache and refreshed in the background, and all
+        others are fetched with users(ids: [...]) queries of up to
+        GQL_BATCH_SIZE channels each, so a full poll of hundreds of channels
+        takes a handful of round-trips.
+        
+        Args:
+            channel_ids: Twitch channel IDs to look up
+            
+        Returns:
+            Dict mapping channel IDs to the same information returned by
+            get_channel_info(). Unknown channels and channels that couldn't be
+            fetched are omitted.
+        """
+        results = {}
+        to_fetch = []
+        stream_only = {}
+        stale = []
+        waiting = {}
+        
+        for channel_id in dict.fromkeys(channel_ids):
+            if not channel_id:
+                continue
+                
+            cache_key = f"channel_info:{channel_id}"
+            lookup = self._cache.get(cache_key)
+            if lookup.negative:
+                continue
+            if lookup.is_servable:
+                results[channel_id] = lookup.value
+                if not lookup.is_fresh:
+                    stale.append(channel_id)
+            elif cache_key in self._inflight:
+                # Another caller is already fetching this channel
+                self._stats["coalesced"] += 1
+                waiting[channel_id] = self._inflight[cache_key]
+            elif lookup.value is not None and lookup.expired <= {"stream"}:
+                # Profile data is still cached (e.g. loaded from disk)
+                stream_only[channel_id] = lookup.value
+            else:
+                to_fetch.append(channel_id)
+        
+        if stale:
+            self._revalidate(stale)
+        
+        if to_fetch:
+            fetched = await self._fetch_channels(to_fetch)
+            for channel_id, result in fetched.items():
+                results[channel_id] = result.copy()
+                
+        if stream_only:
+            fetched = await self._fetch_channels(list(stream_only), cached=stream_only)
+            for channel_id, result in fetched.items():
+                results[channel_id] = result.copy()
+        
+        for channel_id, future in waiting.items():
+            result = await asyncio.shield(future)
+            if result:
+                results[channel_id] = result.copy()
+                
+        return results
+
+    async def _fetch_channels(self, channel_ids: List[str],
+                              cached: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch channel information for many channels and cache it.
+        
+        The channels are registered as in flight so concurrent single lookups
+        join the batch. Channels Twitch reports as unknown are cached
+        negatively.
+        
+        Args:
+            channel_ids: Twitch channel IDs to fetch
+            cached: Cached channel info by channel ID. If given, only the
+                    stream status is fetched and merged into it
+            
+        Returns:
+            Dict mapping channel IDs to channel information
+        """
+        self._stats["fetches"] += len(channel_ids)
+        futures = {channel_id: self._start_flight(f"channel_info:{channel_id}") for channel_id in channel_ids}
+        fields = STREAM_STATUS_FIELDS if cached is not None else CHANNEL_INFO_FIELDS
+        fetched = {}
+        try:
+            users = await self._fetch_users_batched("ids", channel_ids, fields)
+            
+            for channel_id, user_data in users.items():
+                cache_key = f"channel_info:{channel_id}"
+                if not user_data:
+                    self._cache.set_negative(cache_key)
+                    continue
+                    
+                info = self._build_channel_info(user_data)
+                if cached is not None:
+                    stream_status = {field: info[field] for field in STREAM_FIELDS if field in info}
+                    stream_status["isLive"] = bool(info["stream"])
+                    self._cache.set(cache_key, stream_status)
+                    result = {**cached[channel_id], **stream_status}
+                else:
+                    self._cache.set(cache_key, info)
+                    result = info
+                fetched[channel_id] = result
+        finally:
+            for channel_id, future in futures.items():
+                self._finish_flight(f"channel_info:{channel_id}", future, fetched.get(channel_id, {}))
+                
+        return fetched
+
+    async def _fetch_users_batched(self, key: str, values: List[str], fields: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch many users with batched users(ids/logins) queries.
+        
+        Splits the values into chunks of GQL_BATCH_SIZE, sends the chunks
+        concurrently (bounded by the rate limit semaphore) and maps each
+        returned user back to the value it was requested by.
+        
+        Args:
+            key: "ids" or "logins"
+            values: Channel IDs or usernames to look up
+            fields: GraphQL selection set for each user
+            
+        Returns:
+            Dict mapping each requested ID (or lowercase login) to its raw user
+            data, or None if the user doesn't exist. Values from failed
+            requests are omitted.
+        """
+        if key == "logins":
+            values = [value.strip().lower() for value in values if value and value.strip()]
+        else:
+            values = [value for value in values if value]
+        values = list(dict.fromkeys(values))
+        
+        if not values:
+            return {}
+            
+        chunks = [values[i:i + GQL_BATCH_SIZE] for i in range(0, len(values), GQL_BATCH_SIZE)]
+        chunk_results = await asyncio.gather(
+            *[self._fetch_users_chunk(key, chunk, fields) for chunk in chunks],
+            return_exceptions=True
+        )
+        
+        users = {}
+        for chunk, chunk_result in zip(chunks, chunk_results):
+            if isinstance(chunk_result, Exception):
+                print(f"[GQL] Error in batched {key} lookup for {len(chunk)} channels: {chunk_result}")
+                continue
+            users.update(chunk_result)
+            
+        return users
+
+    async def _fetch_users_chunk(self, key: str, values: List[str], fields: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch a single chunk of users in one GQL request.
+        
+        Args:
+            key: "ids" or "logins"
+            values: Up to GQL_BATCH_SIZE channel IDs or lowercase usernames
+            fields: GraphQL selection set for each user
+            
+        Returns:
+            Dict mapping each requested ID (or login) to its raw user data, or
+            None if the user doesn't exist. Empty if the request failed.
+        """
+        variable_type = "[ID!]" if key == "ids" else "[String!]"
+        query = {
+            "operationName": "GetUsersBatch",
+            "query": f"""
+                query GetUsersBatch($values: {variable_type}) {{
+                    users({key}: $values) {{
+                        {fields}
+                    }}
+                }}
+            """,
+            "variables": {"values": values},
+        }
+        
+        try:
+            async with self._rate_limiter.limit():
+                # Reuse the pooled session (keep-alive connections)
+                session = self._get_session()
+                async with session.post(
+                    TWITCH_GQL_URL,
+                    headers=self.headers,
+                    json=query,
+                ) as response:
+                    self._rate_limiter.observe(response.status, response.headers)
+                    if response.status != 200:
+                        print(f"[GQL] Error response {response.status} for batch of {len(values)} channels")
+                        return {}
+                            
+                    data = await response.json()
+        except asyncio.TimeoutError:
+            print(f"[GQL] Timeout fetching batch of {len(values)} channels")
+            return {}
+            
+        if not data or not isinstance(data, dict):
+            print(f"[GQL] Invalid response format for batch of {len(values)} channels")
+            return {}
+            
+        users = (data.get("data") or {}).get("users") or []
+        
+        # users() returns one entry per requested value, in order, with null
+        # for channels that don't exist
+        return {value: user_data or None for value, user_data in zip(values, users)}
+
+    @staticmethod
+    def _build_channel_info(user_data: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Convert raw GQL user data into the channel info format.
+        
+        Args:
+            user_data: User object from a GQL response
+            
+        Returns:
+            Dict in the format returned by get_channel_info()
+        """
+        stream = user_data.get("stream")
+
+        # Base response
+        result = {
+            "login": user_data.get("login"),
+            "displayName": user_data.get("displayName"),
+            "profileImageURL": user_data.get("profileImageURL"),
+            "offlineImageURL": user_data.get("offlineImageURL"),
+            "title": None,
+            "thumbnail": None,
+            "viewersCount": None,
+            "game": None,
+            "stream": stream,
+        }
+
+        # Add stream data if live
+        if stream and isinstance(stream, dict):
+            result.update({
+                "title": stream.get("title"),
+                "thumbnail": stream.get("previewImageURL"),
+                "viewersCount": stream.get("viewersCount"),
+                "game": (stream.get("game") or {}).get("name"),
+            })
+
+        return result
+
     async def _fetch_channel_info(self, channel_id: str) -> Dict[str, Any]:
         """
         Fetch complete channel information from Twitch GraphQL API.
@@ -423,59 +925,35 @@ class GQLClient:
         }
 
         try:
-            async with self._rate_limit_semaphore:
-                # Use SSL context for secure connection
-                async with aiohttp.ClientSession(
-                    timeout=self._request_timeout,
-                    connector=aiohttp.TCPConnector(ssl=self._ssl_context)
-                ) as session:
-                    async with session.post(
-                        TWITCH_GQL_URL,
-                        headers=self.headers,
-                        json=query,
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
+            async with self._rate_limiter.limit():
+                # Reuse the pooled session (keep-alive connections)
+                session = self._get_session()
+                async with session.post(
+                    TWITCH_GQL_URL,
+                    headers=self.headers,
+                    json=query,
+                ) as response:
+                    self._rate_limiter.observe(response.status, response.headers)
+                    if response.status == 200:
+                        data = await response.json()
                             
-                            # Error handling for missing fields
-                            if not data or not isinstance(data, dict):
-                                print(f"[GQL] Invalid response format for channel ID {channel_id}")
-                                return {}
+                        # Error handling for missing fields
+                        if not data or not isinstance(data, dict):
+                            print(f"[GQL] Invalid response format for channel ID {channel_id}")
+                            return {}
                                 
-                            user_data = data.get("data", {}).get("user")
-                            if not user_data:
-                                print(f"[GQL] No user data for channel ID {channel_id}")
-                                return {}
+                        user_data = data.get("data", {}).get("user")
+                        if not user_data:
+                            print(f"[GQL] No user data for channel ID {channel_id}")
+                            # Don't look this channel up again for a while
+                            self._cache.set_negative(f"channel_info:{channel_id}")
+                            return {}
                                 
-                            stream = user_data.get("stream")
-
-                            # Base response
-                            result = {
-                                "login": user_data.get("login"),
-                                "displayName": user_data.get("displayName"),
-                                "profileImageURL": user_data.get("profileImageURL"),
-                                "offlineImageURL": user_data.get("offlineImageURL"),
-                                "title": None,
-                                "thumbnail": None,
-                                "viewersCount": None,
-                                "game": None,
-                                "stream": stream,
-                            }
-
-                            # Add stream data if live
-                            if stream and isinstance(stream, dict):
-                                result.update({
-                                    "title": stream.get("title"),
-                                    "thumbnail": stream.get("previewImageURL"),
-                                    "viewersCount": stream.get("viewersCount"),
-                                    "game": (stream.get("game") or {}).get("name"),
-                                })
-
-                            return result
-                        print(
-                            f"[GQL] Error response {response.status} for channel ID {channel_id}"
-                        )
-                        return {}
+                        return self._build_channel_info(user_data)
+                    print(
+                        f"[GQL] Error response {response.status} for channel ID {channel_id}"
+                    )
+                    return {}
         except asyncio.TimeoutError:
             print(f"[GQL] Timeout getting channel info for {channel_id}")
             return {}
@@ -523,50 +1001,72 @@ class GQLClient:
         }
 
         try:
-            async with self._rate_limit_semaphore:
-                # Use SSL context for secure connection
-                async with aiohttp.ClientSession(
-                    timeout=self._request_timeout,
-                    connector=aiohttp.TCPConnector(ssl=self._ssl_context)
-                ) as session:
-                    async with session.post(
-                        TWITCH_GQL_URL,
-                        headers=self.headers,
-                        json=query,
-                    ) as response:
-                        if response.status == 200:
-                            data = await response.json()
+            async with self._rate_limiter.limit():
+                # Reuse the pooled session (keep-alive connections)
+                session = self._get_session()
+                async with session.post(
+                    TWITCH_GQL_URL,
+                    headers=self.headers,
+                    json=query,
+                ) as response:
+                    self._rate_limiter.observe(response.status, response.headers)
+                    if response.status == 200:
+                        data = await response.json()
                             
-                            # Handle invalid responses
-                            if not data or not isinstance(data, dict):
-                                return {}
+                        # Handle invalid responses
+                        if not data or not isinstance(data, dict):
+                            return {}
                                 
-                            user_data = data.get("data", {}).get("user", {})
-                            if not user_data:
-                                return {}
+                        user_data = data.get("data", {}).get("user", {})
+                        if not user_data:
+                            return {}
                                 
-                            stream = user_data.get("stream")
+                        stream = user_data.get("stream")
                             
-                            # Create result with just stream status
-                            result = {
-                                "isLive": bool(stream),
-                                "title": None,
-                                "thumbnail": None,
-                                "viewersCount": None,
-                                "game": None,
-                            }
+                        # Create result with just stream status. "stream" is
+                        # included so callers checking it don't see the
+                        # cached status from before the refresh
+                        result = {
+                            "stream": stream,
+                            "isLive": bool(stream),
+                            "title": None,
+                            "thumbnail": None,
+                            "viewersCount": None,
+                            "game": None,
+                        }
                             
-                            # Add stream data if live
-                            if stream and isinstance(stream, dict):
-                                result.update({
-                                    "title": stream.get("title"),
-                                    "thumbnail": stream.get("previewImageURL"),
-                                    "viewersCount": stream.get("viewersCount"),
-                                    "game": (stream.get("game") or {}).get("name"),
-                                })
+                        # Add stream data if live
+                        if stream and isinstance(stream, dict):
+                            result.update({
+                                "title": stream.get("title"),
+                                "thumbnail": stream.get("previewImageURL"),
+                                "viewersCount": stream.get("viewersCount"),
+                                "game": (stream.get("game") or {}).get("name"),
+                            })
                                 
-                            return result
-                        return {}
+                        return result
+                    return {}
         except Exception:
             # Just return empty dict for any error
-            return {}
\ No newline at end of file
+            return {}
+
+
+_gql_client: Optional[GQLClient] = None
+
+
+def get_gql_client() -> GQLClient:
+    """
+    Get the process-wide GQL client.
+    
+    Sharing one client keeps its cache and connection pool alive across
+    the monitor loop, download service and web handlers. The cache is
+    persisted to gql_cache.json in the config directory.
+    
+    Returns:
+        GQLClient: The shared client instance
+    """
+    global _gql_client
+    if _gql_client is None:
+        from backend.src.config.settings import GQL_CACHE_FILE
+        _gql_client = GQLClient(cache_file=GQL_CACHE_FILE)
+    return _gql_client
@@ -0,0 +1,277 @@
+"""
+Paginated listing of Helix EventSub subscriptions.
+
+GET /helix/eventsub/subscriptions returns at most one page per request and
+a pagination cursor for the next one. iter_subscriptions() follows the
+cursor until every page has been read, pacing each request through the
+shared Helix rate limiter.
+
+Twitch accepts only one of the status, type and user_id filters per
+request. The first one given (user_id, then type, then status) is sent to
+Twitch, any others are applied locally.
+
+SubscriptionSnapshot keeps the full list for a few seconds so a burst of
+operations (several removals, connections welcoming at the same time)
+costs one listing instead of one per call. Callers keep it current by
+reporting the subscriptions they create and delete. The listing runs in a
+task shared by every caller waiting for it, so it opens its own HTTP
+session rather than borrowing one from a caller that may leave first.
+
+Usage:
+    async for sub in iter_subscriptions(session, headers, user_id="123"):
+        ...
+
+    snapshot = SubscriptionSnapshot(ttl=5)
+    subs = await snapshot.get(headers, user_id="123")
+    snapshot.discard([sub["id"] for sub in subs])
+"""
+
+import asyncio
+import ssl
+import time
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional
+
+import aiohttp
+import certifi
+
+from backend.src.services.rate_limiter import get_rate_limiter
+
+EVENTSUB_SUBSCRIPTIONS_URL = "https://api.twitch.tv/helix/eventsub/subscriptions"
+
+# Seconds a shared subscription listing is reused
+SUBSCRIPTION_SNAPSHOT_TTL = 5.0
+
+
+def create_helix_session() -> aiohttp.ClientSession:
+    """Open an aiohttp session for Helix requests."""
+    ssl_context = ssl.create_default_context(cafile=certifi.where())
+    return aiohttp.ClientSession(connector=aiohttp.TCPConnector(ssl=ssl_context))
+
+
+def matches_subscription(sub: Dict[str, Any], status: Optional[str] = None,
+                         sub_type: Optional[str] = None,
+                         user_id: Optional[str] = None) -> bool:
+    """
+    Check a subscription against the listing filters.
+
+    Args:
+        sub: Subscription object as returned by Helix
+        status: Required status, e.g. "enabled"
+        sub_type: Required type, e.g. "stream.online"
+        user_id: Required broadcaster_user_id condition
+
+    Returns:
+        bool: True if every given filter matches
+    """
+    if status is not None and sub.get("status") != status:
+        return False
+    if sub_type is not None and sub.get("type") != sub_type:
+        return False
+    if user_id is not None and sub.get("condition", {}).get("broadcaster_user_id") != user_id:
+        return False
+    return True
+
+
+async def iter_subscriptions(session, headers: Dict[str, str],
+                             status: Optional[str] = None,
+                             sub_type: Optional[str] = None,
+                             user_id: Optional[str] = None,
+                             totals: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Yield every EventSub subscription across all pages.
+
+    Pages are fetched lazily, so stopping early saves the remaining
+    requests. Don't delete subscriptions while iterating, that shifts the
+    pages behind the cursor; collect them first.
+
+    Args:
+        session: aiohttp session to send the requests with
+        headers: Request headers with Client-ID and Authorization
+        status: Only yield subscriptions with this status
+        sub_type: Only yield subscriptions of this type
+        user_id: Only yield subscriptions for this broadcaster
+        totals: Filled with the total_cost and max_total_cost Twitch
+            reports for the token, if given
+
+    Yields:
+        Dict[str, Any]: Subscription objects
+
+    Raises:
+        RuntimeError: If Twitch rejects a page request
+    """
+    limiter = get_rate_limiter("helix")
+
+    # Twitch takes a single filter per request, the rest is applied locally
+    params: Dict[str, str] = {}
+    if user_id is not None:
+        params["user_id"] = user_id
+    elif sub_type is not None:
+        params["type"] = sub_type
+    elif status is not None:
+        params["status"] = status
+
+    cursor = None
+    while True:
+        page_params = dict(params)
+        if cursor:
+            page_params["after"] = cursor
+
+        await limiter.acquire()
+        async with session.get(EVENTSUB_SUBSCRIPTIONS_URL, headers=headers,
+                               params=page_params, timeout=30) as response:
+            limiter.observe(response.status, response.headers)
+            if response.status != 200:
+                error_text = await response.text()
+                raise RuntimeError(f"Failed to list subscriptions: {response.status} - {error_text}")
+            data = await response.json()
+
+        if totals is not None:
+            totals["total_cost"] = data.get("total_cost")
+            totals["max_total_cost"] = data.get("max_total_cost")
+
+        for sub in data.get("data") or []:
+            if matches_subscription(sub, status, sub_type, user_id):
+                yield sub
+
+        cursor = (data.get("pagination") or {}).get("cursor")
+        if not cursor:
+            break
+
+
+async def list_subscriptions(session, headers: Dict[str, str], **filters) -> List[Dict[str, Any]]:
+    """
+    Collect all subscriptions matching the filters into a list.
+
+    Args:
+        session: aiohttp session to send the requests with
+        headers: Request headers with Client-ID and Authorization
+        **filters: status, sub_type, user_id and/or totals, see iter_subscriptions()
+
+    Returns:
+        List[Dict[str, Any]]: Subscription objects from every page
+    """
+    return [sub async for sub in iter_subscriptions(session, headers, **filters)]
+
+
+class SubscriptionSnapshot:
+    """
+    Short-lived shared copy of the full subscription list.
+
+    Concurrent callers wait for the same listing instead of each starting
+    their own. Subscriptions created or deleted through the service are
+    applied to the snapshot, so it stays accurate within its lifetime.
+
+    The cost figures are taken from the listing alone and are not updated
+    by add() and discard(), so total_cost and session_costs always describe
+    the same moment.
+
+    Attributes:
+        ttl (float): Seconds a listing is reused
+        total_cost (Optional[int]): Cost of all enabled subscriptions of the
+            token at the last listing
+        max_total_cost (Optional[int]): Cost budget of the token at the last
+            listing
+        session_costs (Dict[str, int]): WebSocket session ID to the cost of
+            its enabled subscriptions at the last listing
+        _session_factory (Callable): Opens the HTTP session of a listing
+        _subscriptions (Dict[str, Dict[str, Any]]): Subscription ID to object
+        _fetched_at (float): Monotonic time of the last listing, 0 if none
+        _refresh (Optional[asyncio.Task]): Listing currently in progress
+        _stats (Dict[str, int]): Listing and reuse counters
+    """
+
+    def __init__(self, ttl: float = SUBSCRIPTION_SNAPSHOT_TTL,
+                 session_factory: Callable[[], aiohttp.ClientSession] = create_helix_session):
+        """
+        Initialize an empty snapshot.
+
+        Args:
+            ttl: Seconds a listing is reused
+            session_factory: Opens the HTTP session a listing is sent with
+        """
+        self.ttl = ttl
+        self._session_factory = session_factory
+        self.total_cost: Optional[int] = None
+        self.max_total_cost: Optional[int] = None
+        self.session_costs: Dict[str, int] = {}
+        self._subscriptions: Dict[str, Dict[str, Any]] = {}
+        self._fetched_at = 0.0
+        self._refresh: Optional[asyncio.Task] = None
+        self._stats = {"listings": 0, "reused": 0}
+
+    @property
+    def listings(self) -> int:
+        """Number of listings done so far."""
+        return self._stats["listings"]
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether the last listing can still be reused."""
+        return self._fetched_at > 0 and time.monotonic() - self._fetched_at < self.ttl
+
+    async def _load(self, headers: Dict[str, str]) -> None:
+        """Replace the snapshot with a complete listing."""
+        totals: Dict[str, Any] = {}
+        async with self._session_factory() as session:
+            subscriptions = await list_subscriptions(session, headers, totals=totals)
+        self._subscriptions = {sub["id"]: sub for sub in subscriptions if sub.get("id")}
+
+        session_costs: Dict[str, int] = {}
+        for sub in subscriptions:
+            session_id = (sub.get("transport") or {}).get("session_id")
+            if session_id and sub.get("status") == "enabled":
+                session_costs[session_id] = session_costs.get(session_id, 0) + (sub.get("cost") or 0)
+        self.total_cost = totals.get("total_cost")
+        self.max_total_cost = totals.get("max_total_cost")
+        self.session_costs = session_costs
+        self._fetched_at = time.monotonic()
+        self._stats["listings"] += 1
+
+    async def get(self, headers: Dict[str, str], refresh: bool = False,
+                  **filters) -> List[Dict[str, Any]]:
+        """
+        Return subscriptions matching the filters, listing them if needed.
+
+        Args:
+            headers: Request headers with Client-ID and Authorization
+            refresh: Ignore a fresh snapshot and list again
+            **filters: status, sub_type and/or user_id
+
+        Returns:
+            List[Dict[str, Any]]: Matching subscription objects
+        """
+        if refresh or not self.is_fresh:
+            if self._refresh is None or self._refresh.done():
+                self._refresh = asyncio.ensure_future(self._load(headers))
+            else:
+                # Join the listing another caller already started
+                self._stats["reused"] += 1
+            # Shield so one cancelled caller doesn't abort the shared listing
+            await asyncio.shield(self._refresh)
+        else:
+            self._stats["reused"] += 1
+
+        return [sub for sub in self._subscriptions.values() if matches_subscription(sub, **filters)]
+
+    def add(self, subscription: Dict[str, Any]) -> None:
+        """Record a subscription that was just created."""
+        if subscription.get("id"):
+            self._subscriptions[subscription["id"]] = subscription
+
+    def discard(self, subscription_ids: Iterable[str]) -> None:
+        """Forget subscriptions that were deleted."""
+        for sub_id in subscription_ids:
+            self._subscriptions.pop(sub_id, None)
+
+    def invalidate(self) -> None:
+        """Force the next get() to list again."""
+        self._fetched_at = 0.0
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return snapshot counters.
+
+        Returns:
+            Dict[str, Any]: Listings, reused listings and snapshot size
+        """
+        return {**self._stats, "size": len(self._subscriptions), "fresh": self.is_fresh}
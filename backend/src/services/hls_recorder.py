@@ -0,0 +1,466 @@
+"""
+Asyncio HLS segment recorder.
+
+The thread and process engines read a recording through Streamlink's
+stream.open(), one blocking thread per recording. This engine takes the
+media playlist URL that Streamlink resolved and downloads the segments with
+aiohttp on the event loop, so any number of recordings share the loop plus
+a small pool of threads for the file writes.
+
+Per recording, one task reloads the playlist every target duration and
+schedules new segments; up to HLS_SEGMENT_PREFETCH of them download in
+parallel. A second task writes the segments to the file in sequence order.
+At most HLS_WRITE_QUEUE_SIZE segments wait for the writer; beyond that the
+playlist task waits too. If writing fails, the downloads are stopped and
+the recording fails right away.
+A failed segment is retried HLS_SEGMENT_RETRIES times while it is still
+listed in the playlist. Segments that dropped out of the playlist before
+they were scheduled (e.g. after a slow reload) are counted as missed.
+
+Twitch ad segments (EXTINF title containing "Amazon") are skipped, like
+Streamlink's Twitch plugin does. Encrypted playlists are not supported.
+
+The cancellation flag is the same threading.Event the thread engine uses;
+it is checked between playlist reloads and while waiting. stop() also sets
+it and cancels the playlist and segment downloads in flight, so a stop
+doesn't wait for a request to time out. Segments already downloaded are
+still written, then the file is fsynced.
+
+Usage:
+    recorder = HLSRecorder()
+    recording = HLSRecording("streamer", filepath, cancellation_flag)
+    return_code = await recorder.record(recording, playlist_url)
+    await recorder.close()
+"""
+
+import asyncio
+import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+from urllib.parse import urljoin
+
+import aiohttp
+import certifi
+
+from backend.src.config.constants import HLS_SEGMENT_PREFETCH, HLS_SEGMENT_RETRIES
+from backend.src.services.recording_handle import finalize_file
+from backend.src.services.recording_latency import get_latency_tracker
+
+# Seconds without a new segment after which the stream is considered over
+HLS_STALL_TIMEOUT = 60
+
+# Threads shared by all recordings for file writes
+HLS_WRITE_THREADS = 2
+
+# Seconds between retries of a failed segment or playlist request
+HLS_RETRY_DELAY = 0.5
+
+# Longest single wait, so cancellation is noticed quickly
+HLS_MAX_WAIT = 0.5
+
+# Segments of one recording scheduled but not yet written, so a slow disk
+# holds up the playlist instead of filling memory
+HLS_WRITE_QUEUE_SIZE = 16
+
+
+class HLSSegment:
+    """
+    One media segment of a playlist.
+
+    Attributes:
+        sequence (int): Media sequence number
+        url (str): Absolute segment URL
+        duration (float): Duration in seconds
+        ad (bool): Whether it's a Twitch ad segment
+    """
+
+    __slots__ = ("sequence", "url", "duration", "ad")
+
+    def __init__(self, sequence: int, url: str, duration: float, ad: bool = False):
+        self.sequence = sequence
+        self.url = url
+        self.duration = duration
+        self.ad = ad
+
+
+def parse_media_playlist(text: str, base_url: str) -> Tuple[float, List[HLSSegment], bool, Optional[str]]:
+    """
+    Parse an HLS playlist.
+
+    Args:
+        text: Playlist content
+        base_url: URL the playlist was loaded from, for relative URIs
+
+    Returns:
+        Tuple[float, List[HLSSegment], bool, Optional[str]]: Target duration,
+        segments, whether the playlist has ended, and the first variant URL
+        if this is a multivariant (master) playlist instead
+    """
+    target_duration = 2.0
+    sequence = 0
+    segments: List[HLSSegment] = []
+    ended = False
+    duration = None
+    ad = False
+    expect_variant = False
+
+    for line in text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if line.startswith("#EXT-X-TARGETDURATION:"):
+            target_duration = float(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-MEDIA-SEQUENCE:"):
+            sequence = int(line.split(":", 1)[1])
+        elif line.startswith("#EXT-X-KEY:") and "METHOD=NONE" not in line:
+            raise ValueError("encrypted HLS playlists are not supported")
+        elif line.startswith("#EXT-X-STREAM-INF"):
+            expect_variant = True
+        elif line.startswith("#EXTINF:"):
+            length, _, title = line[len("#EXTINF:"):].partition(",")
+            duration = float(length)
+            ad = "Amazon" in title
+        elif line.startswith("#EXT-X-ENDLIST"):
+            ended = True
+        elif not line.startswith("#"):
+            if expect_variant:
+                return target_duration, [], False, urljoin(base_url, line)
+            if duration is not None:
+                segments.append(HLSSegment(sequence, urljoin(base_url, line), duration, ad))
+                sequence += 1
+                duration = None
+                ad = False
+
+    return target_duration, segments, ended, None
+
+
+class HLSRecording:
+    """
+    State and counters of one HLS recording.
+
+    Attributes:
+        streamer (str): Twitch username
+        filepath (str): Recording file
+        cancellation_flag: threading.Event set to stop the recording
+        bytes_written (int): Bytes written to the file
+        bytes_lost (int): Bytes downloaded but never written
+        segments_written (int): Segments written
+        segments_retried (int): Segment downloads that needed another attempt
+        segments_failed (int): Segments given up on after all retries
+        segments_missed (int): Segments that left the playlist unscheduled
+        ads_skipped (int): Ad segments not recorded
+        segments_dropped (int): Segment downloads aborted by stop()
+        started_at (float): Epoch time the recording started
+        error (Optional[str]): Why the recording failed, if it did
+        tasks (Set[asyncio.Task]): Playlist and segment downloads in flight
+    """
+
+    def __init__(self, streamer: str, filepath: str, cancellation_flag):
+        """
+        Initialize a recording that hasn't started yet.
+
+        Args:
+            streamer: Twitch username
+            filepath: Recording file
+            cancellation_flag: threading.Event set to stop the recording
+        """
+        self.streamer = streamer
+        self.filepath = filepath
+        self.cancellation_flag = cancellation_flag
+        self.bytes_written = 0
+        self.bytes_lost = 0
+        self.segments_written = 0
+        self.segments_retried = 0
+        self.segments_failed = 0
+        self.segments_missed = 0
+        self.ads_skipped = 0
+        self.segments_dropped = 0
+        self.started_at = time.time()
+        self.error: Optional[str] = None
+        self.tasks: Set[asyncio.Task] = set()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the recording was asked to stop."""
+        return self.cancellation_flag.is_set()
+
+    def track(self, task: asyncio.Task) -> asyncio.Task:
+        """Register a download task so stop() can cancel it."""
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+        return task
+
+    def stop(self) -> None:
+        """Cancel the recording and abort its downloads in flight. Call from the event loop."""
+        self.cancellation_flag.set()
+        for task in list(self.tasks):
+            task.cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the recording's counters.
+
+        Returns:
+            Dict[str, Any]: Bytes and segments written, retried, failed,
+            missed and skipped
+        """
+        return {
+            "streamer": self.streamer,
+            "bytes_written": self.bytes_written,
+            "bytes_lost": self.bytes_lost,
+            "segments_written": self.segments_written,
+            "segments_retried": self.segments_retried,
+            "segments_failed": self.segments_failed,
+            "segments_missed": self.segments_missed,
+            "ads_skipped": self.ads_skipped,
+            "segments_dropped": self.segments_dropped,
+            "started_at": self.started_at,
+        }
+
+
+class HLSRecorder:
+    """
+    Records HLS playlists with a shared aiohttp connection pool.
+
+    Attributes:
+        prefetch (int): Segments of one recording downloaded in parallel
+        retries (int): Extra attempts for a failed segment
+        recordings (Dict[str, HLSRecording]): Running recordings by streamer
+        _session (Optional[aiohttp.ClientSession]): Shared HTTP session
+        _writer (ThreadPoolExecutor): Threads for file writes
+    """
+
+    def __init__(self, prefetch: int = HLS_SEGMENT_PREFETCH, retries: int = HLS_SEGMENT_RETRIES):
+        """
+        Initialize the recorder.
+
+        Args:
+            prefetch: Segments of one recording downloaded in parallel
+            retries: Extra attempts for a failed segment
+        """
+        self.prefetch = max(1, prefetch)
+        self.retries = max(0, retries)
+        self.recordings: Dict[str, HLSRecording] = {}
+        self._ssl_context = ssl.create_default_context(cafile=certifi.where())
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._writer = ThreadPoolExecutor(max_workers=HLS_WRITE_THREADS, thread_name_prefix="hls-writer")
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """Return the shared session, creating it if needed."""
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(ssl=self._ssl_context, limit=0, keepalive_timeout=30),
+                timeout=aiohttp.ClientTimeout(total=20, sock_connect=5),
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """Close the HTTP session and the writer threads."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._writer.shutdown(wait=False)
+
+    async def _wait(self, recording: HLSRecording, seconds: float) -> None:
+        """Sleep, waking up early if the recording is cancelled."""
+        deadline = time.monotonic() + seconds
+        while not recording.cancelled:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            await asyncio.sleep(min(remaining, HLS_MAX_WAIT))
+
+    async def _fetch(self, url: str) -> Tuple[int, bytes]:
+        """GET a URL, returning status and body."""
+        async with self._get_session().get(url) as response:
+            return response.status, await response.read()
+
+    async def _fetch_segment(self, recording: HLSRecording, segment: HLSSegment,
+                             slots: asyncio.Semaphore) -> Optional[bytes]:
+        """Download a segment with retries; None if it couldn't be fetched."""
+        async with slots:
+            for attempt in range(self.retries + 1):
+                if recording.cancelled:
+                    return None
+                if attempt:
+                    recording.segments_retried += 1
+                    await self._wait(recording, HLS_RETRY_DELAY * attempt)
+                try:
+                    status, body = await self._fetch(segment.url)
+                    if status == 200:
+                        return body
+                    error = f"HTTP {status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    error = str(e) or type(e).__name__
+            recording.segments_failed += 1
+            print(f"[DownloadService] Giving up on segment {segment.sequence} of {recording.streamer}: {error}")
+            return None
+
+    async def record(self, recording: HLSRecording, playlist_url: str) -> int:
+        """
+        Record a playlist until it ends, stalls or the recording is cancelled.
+
+        Args:
+            recording: The recording to run
+            playlist_url: Media (or multivariant) playlist URL
+
+        Returns:
+            int: 0 if the stream ended or the recording was cancelled, 1 on error
+        """
+        self.recordings[recording.streamer] = recording
+        queue: asyncio.Queue = asyncio.Queue(maxsize=HLS_WRITE_QUEUE_SIZE)
+        writer = asyncio.create_task(self._write_segments(recording, queue))
+        follower = recording.track(asyncio.create_task(self._follow_playlist(recording, playlist_url, queue)))
+        try:
+            await asyncio.wait({follower, writer}, return_when=asyncio.FIRST_COMPLETED)
+            if follower.done():
+                await follower
+            else:
+                # The writer only stops first if writing failed; stop
+                # downloading segments nobody will write
+                follower.cancel()
+                await asyncio.wait({follower})
+            return_code = 0
+        except asyncio.CancelledError:
+            # Aborted by stop(); anything else cancelling us is passed on
+            if not recording.cancelled:
+                raise
+            return_code = 0
+        except Exception as e:
+            recording.error = str(e) or type(e).__name__
+            print(f"[DownloadService] HLS recording of {recording.streamer} failed: {recording.error}")
+            return_code = 1
+        finally:
+            follower.cancel()
+            if not writer.done():
+                await queue.put(None)
+            try:
+                await writer
+            except Exception as e:
+                recording.error = recording.error or str(e) or type(e).__name__
+                print(f"[DownloadService] Writing HLS recording of {recording.streamer} failed: {e}")
+                return_code = 1
+            # Segments queued after the writer stopped
+            self._drop_queued(recording, queue)
+            self.recordings.pop(recording.streamer, None)
+        return return_code
+
+    @staticmethod
+    def _drop_queued(recording: HLSRecording, queue: asyncio.Queue) -> None:
+        """Cancel the downloads of segments still waiting to be written."""
+        while not queue.empty():
+            item = queue.get_nowait()
+            if item is not None:
+                item[1].cancel()
+                recording.segments_dropped += 1
+
+    async def _follow_playlist(self, recording: HLSRecording, playlist_url: str,
+                               queue: asyncio.Queue) -> None:
+        """Reload the playlist and schedule new segments in order."""
+        latency = get_latency_tracker()
+        slots = asyncio.Semaphore(self.prefetch)
+        next_sequence: Optional[int] = None
+        last_new_segment = time.monotonic()
+        failures = 0
+
+        while not recording.cancelled:
+            try:
+                status, body = await self._fetch(playlist_url)
+                if status != 200:
+                    raise aiohttp.ClientError(f"playlist returned HTTP {status}")
+                target_duration, segments, ended, variant_url = parse_media_playlist(
+                    body.decode("utf-8", "replace"), playlist_url
+                )
+                failures = 0
+            except ValueError:
+                raise
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                failures += 1
+                if time.monotonic() - last_new_segment > HLS_STALL_TIMEOUT:
+                    print(f"[DownloadService] Playlist of {recording.streamer} unavailable, ending recording: {e}")
+                    return
+                await self._wait(recording, HLS_RETRY_DELAY * min(failures, 4))
+                continue
+
+            if variant_url:
+                playlist_url = variant_url
+                continue
+
+            if next_sequence is None:
+                latency.mark(recording.streamer, "stream_opened")
+                # Start with the oldest segment still available
+                next_sequence = segments[0].sequence if segments else 0
+            elif segments and segments[0].sequence > next_sequence:
+                missed = segments[0].sequence - next_sequence
+                recording.segments_missed += missed
+                print(f"[DownloadService] Missed {missed} segments of {recording.streamer}")
+                next_sequence = segments[0].sequence
+
+            for segment in segments:
+                if segment.sequence < next_sequence:
+                    continue
+                next_sequence = segment.sequence + 1
+                last_new_segment = time.monotonic()
+                if segment.ad:
+                    recording.ads_skipped += 1
+                    continue
+                task = recording.track(asyncio.create_task(self._fetch_segment(recording, segment, slots)))
+                await queue.put((segment, task))
+
+            if ended:
+                return
+            if time.monotonic() - last_new_segment > HLS_STALL_TIMEOUT:
+                print(f"[DownloadService] No new segments for {recording.streamer} in {HLS_STALL_TIMEOUT}s, ending recording")
+                return
+
+            # Reload about once per target duration
+            await self._wait(recording, target_duration)
+
+    async def _write_segments(self, recording: HLSRecording, queue: asyncio.Queue) -> None:
+        """Write downloaded segments to the file in sequence order."""
+        loop = asyncio.get_running_loop()
+        f = await loop.run_in_executor(self._writer, open, recording.filepath, "wb")
+        try:
+            while True:
+                item = await queue.get()
+                if item is None:
+                    break
+                segment, task = item
+                # Waiting instead of awaiting keeps a cancelled download from cancelling the writer
+                await asyncio.wait({task})
+                if task.cancelled():
+                    recording.segments_dropped += 1
+                    continue
+                data = task.result()
+                if not data:
+                    continue
+                try:
+                    await loop.run_in_executor(self._writer, f.write, data)
+                except BaseException:
+                    recording.bytes_lost += len(data)
+                    raise
+                if not recording.bytes_written:
+                    get_latency_tracker().finish(recording.streamer, filepath=recording.filepath)
+                recording.bytes_written += len(data)
+                recording.segments_written += 1
+        finally:
+            # Don't leave segment downloads running
+            self._drop_queued(recording, queue)
+            try:
+                await loop.run_in_executor(self._writer, finalize_file, f)
+            finally:
+                await loop.run_in_executor(self._writer, f.close)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return settings and the counters of running recordings.
+
+        Returns:
+            Dict[str, Any]: Prefetch and retry settings plus per-recording
+            counters
+        """
+        return {
+            "prefetch": self.prefetch,
+            "retries": self.retries,
+            "recordings": [recording.get_stats() for recording in self.recordings.values()],
+        }
@@ -0,0 +1,263 @@
+"""
+Adaptive token-bucket rate limiting for Twitch HTTP APIs.
+
+Every module that talks to Twitch shares one limiter per endpoint family
+("gql", "helix"), so the request budget is spent in one place instead of
+being split between independent semaphores and fixed sleeps.
+
+Each limiter is a token bucket that refills continuously and also caps the
+number of concurrent requests. It starts from the values in RATE_LIMITS and
+adapts to what Twitch actually reports:
+
+- Ratelimit-Limit sets the bucket size
+- Ratelimit-Remaining corrects the local token count
+- Ratelimit-Reset (epoch seconds) sets the refill rate, or blocks the family
+  until then once the bucket is empty
+- a 429 blocks the whole family until Retry-After / Ratelimit-Reset, or
+  backs off exponentially if neither header is present
+
+Usage:
+    limiter = get_rate_limiter("helix")
+    async with limiter.limit():
+        async with session.post(url, ...) as response:
+            limiter.observe(response.status, response.headers)
+"""
+
+import asyncio
+import random
+import time
+from contextlib import asynccontextmanager
+from typing import Any, Dict, Mapping, Optional
+
+from backend.src.config.constants import RATE_LIMITS
+
+# Limits for families not listed in RATE_LIMITS
+DEFAULT_RATE_LIMIT = (5.0, 10, 5)
+
+
+class RateLimiter:
+    """
+    Token bucket plus concurrency cap for one endpoint family.
+
+    Tokens are reserved before waiting, so concurrent callers are served in
+    arrival order and never oversubscribe the bucket.
+
+    Attributes:
+        name (str): Endpoint family name, used in log messages
+        rate (float): Tokens added per second
+        capacity (float): Maximum number of tokens (burst size)
+        max_concurrent (int): Maximum number of requests in flight
+        min_rate (float): Lower bound for the adapted refill rate
+        _tokens (float): Current token count, negative while reserved
+        _updated (float): Monotonic time of the last refill
+        _blocked_until (float): Monotonic time until which no request may start
+        _backoff_attempts (int): Consecutive 429s without usable headers
+        _semaphore (Optional[asyncio.Semaphore]): Concurrency cap, bound to
+            the event loop it was created in
+        _stats (Dict[str, float]): Request, wait and 429 counters
+    """
+
+    def __init__(self, name: str, rate: float, burst: int, max_concurrent: int,
+                 min_rate: float = 0.1):
+        """
+        Initialize a full bucket.
+
+        Args:
+            name: Endpoint family name
+            rate: Tokens added per second
+            burst: Maximum number of tokens
+            max_concurrent: Maximum number of requests in flight
+            min_rate: Lower bound for the adapted refill rate
+        """
+        self.name = name
+        self.rate = float(rate)
+        self.capacity = float(burst)
+        self.max_concurrent = max_concurrent
+        self.min_rate = min_rate
+
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._backoff_attempts = 0
+
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._semaphore_loop = None
+
+        self._stats = {
+            "requests": 0,
+            "throttled": 0,
+            "wait_time": 0.0,
+            "rate_limited": 0,
+        }
+
+    def _get_semaphore(self) -> asyncio.Semaphore:
+        """Return the concurrency semaphore, recreating it for a new event loop."""
+        loop = asyncio.get_running_loop()
+        if self._semaphore is None or self._semaphore_loop is not loop:
+            self._semaphore = asyncio.Semaphore(self.max_concurrent)
+            self._semaphore_loop = loop
+        return self._semaphore
+
+    def _refill(self, now: float) -> None:
+        """Add the tokens accrued since the last refill."""
+        elapsed = now - self._updated
+        if elapsed > 0:
+            self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+            self._updated = now
+
+    async def acquire(self) -> float:
+        """
+        Take one token, waiting until it is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        now = time.monotonic()
+        self._refill(now)
+        self._tokens -= 1
+        self._stats["requests"] += 1
+
+        # A negative balance is the caller's place in the queue
+        wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        waited = 0.0
+
+        while True:
+            wait = max(wait, self._blocked_until - time.monotonic())
+            if wait <= 0:
+                break
+            await asyncio.sleep(wait)
+            waited += wait
+            wait = 0.0
+
+        if waited:
+            self._stats["throttled"] += 1
+            self._stats["wait_time"] += waited
+        return waited
+
+    @asynccontextmanager
+    async def limit(self):
+        """
+        Hold a concurrency slot and one token for the duration of a request.
+
+        Usage:
+            async with limiter.limit():
+                ...
+        """
+        async with self._get_semaphore():
+            await self.acquire()
+            yield self
+
+    def observe(self, status: int, headers: Optional[Mapping[str, str]] = None) -> Optional[float]:
+        """
+        Adapt to a response's status and rate limit headers.
+
+        Args:
+            status: HTTP status code
+            headers: Response headers (case-insensitive for aiohttp responses)
+
+        Returns:
+            Optional[float]: Seconds the family is blocked for after a 429,
+            None otherwise
+        """
+        headers = headers or {}
+        now = time.monotonic()
+        self._refill(now)
+
+        limit = _header_number(headers, "Ratelimit-Limit")
+        remaining = _header_number(headers, "Ratelimit-Remaining")
+        reset = _header_number(headers, "Ratelimit-Reset")
+        reset_in = reset - time.time() if reset is not None else None
+
+        if limit and limit > 0:
+            self.capacity = limit
+        if remaining is not None:
+            self._tokens = min(self._tokens, remaining)
+
+        if status == 429:
+            self._stats["rate_limited"] += 1
+            retry_after = _header_number(headers, "Retry-After")
+            if retry_after is not None:
+                wait = retry_after
+            elif reset_in is not None and reset_in > 0:
+                wait = reset_in
+            else:
+                wait = min(5 * (2 ** self._backoff_attempts), 60)
+                self._backoff_attempts += 1
+            # Jitter so waiting callers don't all retry at the same instant
+            wait = max(wait, 0.5) * (1 + 0.1 * random.random())
+            self._tokens = min(self._tokens, 0.0)
+            self._blocked_until = max(self._blocked_until, now + wait)
+            print(f"[RateLimiter] {self.name} rate limited, pausing requests for {wait:.1f} seconds")
+            return wait
+
+        self._backoff_attempts = 0
+
+        if reset_in is not None and reset_in > 0:
+            if remaining is not None and remaining < 1:
+                # Bucket is empty, nothing can succeed before the reset
+                self._blocked_until = max(self._blocked_until, now + reset_in)
+            elif limit and remaining is not None and limit > remaining:
+                # Reset is when the bucket is full again, which gives the
+                # refill rate Twitch is actually applying
+                self.rate = max(self.min_rate, (limit - remaining) / reset_in)
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return limiter state and counters.
+
+        Returns:
+            Dict[str, Any]: Current limits, available tokens and counters
+        """
+        now = time.monotonic()
+        self._refill(now)
+        return {
+            **self._stats,
+            "wait_time": round(self._stats["wait_time"], 3),
+            "rate": round(self.rate, 3),
+            "capacity": self.capacity,
+            "tokens": round(max(self._tokens, 0.0), 1),
+            "blocked_for": round(max(self._blocked_until - now, 0.0), 1),
+        }
+
+
+def _header_number(headers: Mapping[str, str], name: str) -> Optional[float]:
+    """Parse a numeric header, returning None if it's missing or invalid."""
+    value = headers.get(name)
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+_limiters: Dict[str, RateLimiter] = {}
+
+
+def get_rate_limiter(family: str) -> RateLimiter:
+    """
+    Return the process-wide limiter for an endpoint family.
+
+    Args:
+        family: Endpoint family, e.g. "gql" or "helix"
+
+    Returns:
+        RateLimiter: Shared limiter, created on first use
+    """
+    limiter = _limiters.get(family)
+    if limiter is None:
+        rate, burst, max_concurrent = RATE_LIMITS.get(family, DEFAULT_RATE_LIMIT)
+        limiter = RateLimiter(family, rate, burst, max_concurrent)
+        _limiters[family] = limiter
+    return limiter
+
+
+def get_rate_limit_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the state of every limiter created so far.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Family name to limiter stats
+    """
+    return {family: limiter.get_stats() for family, limiter in _limiters.items()}
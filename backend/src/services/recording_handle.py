@@ -0,0 +1,194 @@
+"""
+Per-recording handles with real cancellation.
+
+A recording thread spends nearly all its time blocked in fd.read() on
+Streamlink's ring buffer. Setting a cancellation flag does not wake it; the
+read only returns once data arrives or the stream timeout (60s) passes.
+Closing the Streamlink reader from another thread doesn't help either,
+because close() joins the reader's worker threads with the same timeout.
+
+cancel() closes only the ring buffer. That wakes a blocked read at once,
+and data already in the buffer can still be read, so the recording thread
+drains it to the file, flushes and fsyncs the file, and marks the handle
+finalized. Whatever is still buffered when the drain deadline passes is
+counted as lost. The thread closes the Streamlink reader afterwards.
+
+Each recording has its own handle, so concurrent recordings never share
+stream or file state.
+
+Usage:
+    handle = RecordingHandle("streamer", filepath)
+    # recording thread
+    if handle.attach_stream(fd):
+        ...
+    handle.finalize(f)
+    # stopping side
+    handle.cancel()
+    handle.finalized.wait(timeout)
+"""
+
+import os
+import threading
+import time
+from typing import Any, Dict, Optional
+
+# Seconds a cancelled recording may spend writing out buffered data
+RECORDING_DRAIN_TIMEOUT = 2.0
+
+# Seconds stop_download() waits for a recording to finish its file
+RECORDING_STOP_TIMEOUT = 5.0
+
+
+def buffered_bytes(fd) -> int:
+    """Return the bytes waiting in a Streamlink reader's ring buffer."""
+    buffer = getattr(fd, "buffer", None)
+    return getattr(buffer, "length", 0) if buffer is not None else 0
+
+
+def unblock_stream(fd) -> None:
+    """
+    Wake a thread blocked reading a Streamlink stream.
+
+    Segmented (HLS) readers have their ring buffer closed, which wakes a
+    blocked read without waiting for Streamlink's threads. Other stream
+    types are closed in a helper thread, since close() may block.
+
+    Args:
+        fd: Stream opened with stream.open()
+    """
+    buffer = getattr(fd, "buffer", None)
+    if buffer is not None and hasattr(buffer, "close"):
+        buffer.close()
+        return
+
+    def close_quietly():
+        try:
+            fd.close()
+        except Exception:
+            pass
+
+    threading.Thread(target=close_quietly, name="recording-close", daemon=True).start()
+
+
+def finalize_file(f) -> None:
+    """Flush a recording file to disk."""
+    f.flush()
+    try:
+        os.fsync(f.fileno())
+    except OSError:
+        pass
+
+
+class RecordingHandle:
+    """
+    Stream, counters and lifecycle of one thread-engine recording.
+
+    Attributes:
+        streamer (str): Twitch username
+        filepath (str): Recording file
+        cancellation_flag (threading.Event): Set when the recording should stop
+        finalized (threading.Event): Set once the file is flushed and fsynced
+        thread (Optional[threading.Thread]): Recording thread
+        fd: Streamlink stream being read, None until opened
+        bytes_written (int): Bytes written to the file
+        bytes_lost (int): Bytes read from Twitch but never written
+        cancelled_at (Optional[float]): Monotonic time cancel() was called
+    """
+
+    def __init__(self, streamer: str, filepath: str):
+        """
+        Initialize a handle for a recording that hasn't started yet.
+
+        Args:
+            streamer: Twitch username
+            filepath: Recording file
+        """
+        self.streamer = streamer
+        self.filepath = filepath
+        self.cancellation_flag = threading.Event()
+        self.finalized = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.fd = None
+        self.bytes_written = 0
+        self.bytes_lost = 0
+        self.cancelled_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def cancelled(self) -> bool:
+        """Whether the recording was asked to stop."""
+        return self.cancellation_flag.is_set()
+
+    def attach_stream(self, fd) -> bool:
+        """
+        Register the opened stream so cancel() can unblock reads on it.
+
+        Args:
+            fd: Stream opened with stream.open()
+
+        Returns:
+            bool: False if the recording was cancelled before the stream
+            was opened; the stream has then been unblocked already
+        """
+        with self._lock:
+            self.fd = fd
+            cancelled = self.cancelled
+        if cancelled:
+            unblock_stream(fd)
+        return not cancelled
+
+    def cancel(self) -> None:
+        """Ask the recording to stop and wake its thread if it's blocked reading."""
+        with self._lock:
+            # The flag may have been set directly; the stream still needs unblocking
+            if self.cancelled_at is not None:
+                return
+            self.cancelled_at = time.monotonic()
+            self.cancellation_flag.set()
+            fd = self.fd
+        if fd is not None:
+            unblock_stream(fd)
+
+    def draining_expired(self) -> bool:
+        """Whether a cancelled recording has used up its time to write out buffered data."""
+        return self.cancelled_at is not None and time.monotonic() - self.cancelled_at > RECORDING_DRAIN_TIMEOUT
+
+    def finalize(self, f) -> None:
+        """
+        Flush the file to disk, count undrained data as lost and mark the handle finalized.
+
+        Args:
+            f: Recording file object, still open
+        """
+        try:
+            finalize_file(f)
+        finally:
+            if self.fd is not None:
+                self.bytes_lost += buffered_bytes(self.fd)
+            self.finalized.set()
+
+    def close_stream(self) -> None:
+        """Close the Streamlink stream. Called from the recording thread."""
+        with self._lock:
+            fd, self.fd = self.fd, None
+        if fd is not None:
+            try:
+                fd.close()
+            except Exception:
+                pass
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return the recording's counters.
+
+        Returns:
+            Dict[str, Any]: Bytes written and lost, and whether the recording
+            is cancelled and finalized
+        """
+        return {
+            "streamer": self.streamer,
+            "bytes_written": self.bytes_written,
+            "bytes_lost": self.bytes_lost,
+            "cancelled": self.cancelled,
+            "finalized": self.finalized.is_set(),
+        }
@@ -0,0 +1,287 @@
+"""
+Go-live-to-first-byte latency tracking for recordings.
+
+The time between Twitch announcing a stream and the first byte of the
+recording reaching the disk is spent in several stages: EventSub delivery,
+notification handling, the settings write, the download service noticing
+the change, live status and title lookups, and Streamlink resolving and
+opening the stream. Each stage stamps a timeline for the streamer, so the
+time spent in each one can be read per recording and as percentiles.
+
+A timeline starts when a stream.online notification is handled for a
+streamer with downloads enabled, or when a download starts without one
+(startup reconciliation, polling, manual start). It completes on the first
+byte written. Timelines that never complete are dropped after
+TIMELINE_EXPIRY seconds.
+
+Stages are stamped from the event loop and from download threads, so all
+methods are thread-safe.
+
+Usage:
+    tracker = get_latency_tracker()
+    tracker.begin("streamer", event_time=sent_at)
+    tracker.mark("streamer", "status_saved")
+    ...
+    tracker.finish("streamer", filepath=filepath)
+    tracker.get_summary()
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+# Stages in the order they happen on the go-live path
+STAGES = (
+    "event_sent",          # Twitch sent the stream.online message (message_timestamp)
+    "notification",        # EventSub handler accepted the notification
+    "status_saved",        # isLive written to the streamer store
+    "download_started",    # DownloadService.start_download() entered
+    "live_verified",       # Channel info confirmed the stream is live
+    "title_resolved",      # Recording title known, file name chosen
+    "streams_resolved",    # Streamlink returned the available streams
+    "stream_opened",       # Selected stream opened
+    "first_byte",          # First data written to the recording file
+)
+
+# Completed timelines kept for the API and percentiles
+MAX_COMPLETED_TIMELINES = 200
+
+# Seconds after which an incomplete timeline is discarded
+TIMELINE_EXPIRY = 15 * 60
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    Return the pct-th percentile of values (nearest rank).
+
+    Args:
+        values: Samples
+        pct: Percentile between 0 and 100
+
+    Returns:
+        Optional[float]: The percentile, or None without samples
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+class RecordingLatencyTracker:
+    """
+    Per-streamer go-live timelines and their latency distribution.
+
+    Attributes:
+        max_completed (int): Completed timelines kept
+        expiry (float): Seconds before an incomplete timeline is discarded
+        _open (Dict[str, Dict[str, Any]]): Streamer to its running timeline
+        _completed (deque): Finished timelines, oldest first
+        _stats (Dict[str, int]): Started, completed and expired counters
+        _lock (threading.Lock): Guards all state
+    """
+
+    def __init__(self, max_completed: int = MAX_COMPLETED_TIMELINES,
+                 expiry: float = TIMELINE_EXPIRY):
+        """
+        Initialize an empty tracker.
+
+        Args:
+            max_completed: Completed timelines kept
+            expiry: Seconds before an incomplete timeline is discarded
+        """
+        self.max_completed = max_completed
+        self.expiry = expiry
+        self._open: Dict[str, Dict[str, Any]] = {}
+        self._completed: deque = deque(maxlen=max_completed)
+        self._stats = {"started": 0, "completed": 0, "expired": 0}
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float) -> None:
+        """Drop incomplete timelines older than the expiry."""
+        for streamer, timeline in list(self._open.items()):
+            if now - timeline["started_at"] > self.expiry:
+                del self._open[streamer]
+                self._stats["expired"] += 1
+
+    def _start(self, streamer: str, now: float) -> Dict[str, Any]:
+        """Open a new timeline for a streamer, replacing an unfinished one."""
+        timeline = {"streamer": streamer, "started_at": now, "stages": {}, "details": {}, "filepath": None}
+        self._open[streamer] = timeline
+        self._stats["started"] += 1
+        return timeline
+
+    def begin(self, streamer: str, event_time: Optional[float] = None,
+              at: Optional[float] = None) -> None:
+        """
+        Start a timeline for a go-live notification.
+
+        Args:
+            streamer: Twitch username
+            event_time: Epoch time Twitch sent the notification, if known
+            at: Epoch time the notification was handled, defaults to now
+        """
+        now = time.time() if at is None else at
+        with self._lock:
+            self._expire(now)
+            timeline = self._start(streamer, now)
+            if event_time is not None:
+                timeline["stages"]["event_sent"] = event_time
+            timeline["stages"]["notification"] = now
+
+    def mark(self, streamer: str, stage: str, at: Optional[float] = None,
+             create: bool = False) -> None:
+        """
+        Stamp a stage of a streamer's running timeline.
+
+        Only the first stamp of a stage counts, so retries don't move it.
+
+        Args:
+            streamer: Twitch username
+            stage: One of STAGES
+            at: Epoch time of the stage, defaults to now
+            create: Start a timeline if none is running (for downloads that
+                weren't triggered by a notification)
+        """
+        now = time.time() if at is None else at
+        with self._lock:
+            timeline = self._open.get(streamer)
+            if timeline is None:
+                if not create:
+                    return
+                timeline = self._start(streamer, now)
+            timeline["stages"].setdefault(stage, now)
+
+    def annotate(self, streamer: str, **details: Any) -> None:
+        """
+        Attach details to a streamer's running timeline.
+
+        Args:
+            streamer: Twitch username
+            **details: Values to record, e.g. cold_start=0.4
+        """
+        with self._lock:
+            timeline = self._open.get(streamer)
+            if timeline is not None:
+                timeline["details"].update(details)
+
+    def finish(self, streamer: str, filepath: Optional[str] = None,
+               at: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Stamp the first byte and complete the streamer's timeline.
+
+        Args:
+            streamer: Twitch username
+            filepath: Recording file
+            at: Epoch time the first byte was written, defaults to now
+
+        Returns:
+            Optional[Dict[str, Any]]: The completed timeline, None if no
+            timeline was running
+        """
+        now = time.time() if at is None else at
+        with self._lock:
+            timeline = self._open.pop(streamer, None)
+            if timeline is None:
+                return None
+            timeline["stages"].setdefault("first_byte", now)
+            timeline["filepath"] = filepath
+            result = self._describe(timeline)
+            self._completed.append(result)
+            self._stats["completed"] += 1
+            return result
+
+    def discard(self, streamer: str) -> None:
+        """Drop a streamer's running timeline (e.g. the download was aborted)."""
+        with self._lock:
+            self._open.pop(streamer, None)
+
+    @staticmethod
+    def _describe(timeline: Dict[str, Any]) -> Dict[str, Any]:
+        """Turn stage stamps into per-stage durations."""
+        stamps = timeline["stages"]
+        ordered = [stage for stage in STAGES if stage in stamps]
+
+        spans = {}
+        for previous, stage in zip(ordered, ordered[1:]):
+            spans[stage] = round(stamps[stage] - stamps[previous], 4)
+
+        total = None
+        if ordered and "first_byte" in stamps:
+            total = round(stamps["first_byte"] - stamps[ordered[0]], 4)
+
+        return {
+            "streamer": timeline["streamer"],
+            "filepath": timeline["filepath"],
+            "started_from": ordered[0] if ordered else None,
+            "stages": {stage: stamps[stage] for stage in ordered},
+            "spans": spans,
+            "total": total,
+            "details": dict(timeline["details"]),
+        }
+
+    def get_summary(self, recent: int = 20) -> Dict[str, Any]:
+        """
+        Summarize recent recordings and the latency distribution.
+
+        Args:
+            recent: Number of most recent timelines to include
+
+        Returns:
+            Dict[str, Any]: Counters, p50/p95/p99 of the total, of every
+            stage and of the download thread's cold start, the recent
+            timelines and the ones still running
+        """
+        with self._lock:
+            self._expire(time.time())
+            completed = list(self._completed)
+            running = [
+                {"streamer": t["streamer"], "stages": dict(t["stages"]), "details": dict(t["details"])}
+                for t in self._open.values()
+            ]
+            stats = dict(self._stats)
+
+        def distribution(values: List[float]) -> Dict[str, Any]:
+            return {
+                "count": len(values),
+                "p50": percentile(values, 50),
+                "p95": percentile(values, 95),
+                "p99": percentile(values, 99),
+            }
+
+        # Only timelines that started at the notification measure go-live latency
+        from_notification = [t for t in completed if t["started_from"] in ("event_sent", "notification")]
+        totals = [t["total"] for t in from_notification if t["total"] is not None]
+        stages = {
+            stage: distribution([t["spans"][stage] for t in completed if stage in t["spans"]])
+            for stage in STAGES[1:]
+        }
+
+        cold_starts = [t["details"]["cold_start"] for t in completed if "cold_start" in t["details"]]
+
+        return {
+            **stats,
+            "go_live_to_first_byte": distribution(totals),
+            "stages": stages,
+            "cold_start": distribution(cold_starts),
+            "recent": completed[-recent:] if recent else [],
+            "running": running,
+        }
+
+
+_tracker: Optional[RecordingLatencyTracker] = None
+
+
+def get_latency_tracker() -> RecordingLatencyTracker:
+    """
+    Return the process-wide latency tracker.
+
+    Returns:
+        RecordingLatencyTracker: Shared tracker, created on first use
+    """
+    global _tracker
+    if _tracker is None:
+        _tracker = RecordingLatencyTracker()
+    return _tracker
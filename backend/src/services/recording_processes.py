@@ -0,0 +1,458 @@
+"""
+Worker-process recording engine.
+
+With the thread engine every recording reads and writes its stream in a
+thread of the main process, next to the web server, the EventSub sockets
+and the log interception, and they all compete for the GIL. With many
+channels live at once that delays the event loop. This engine runs each
+recording in its own worker process instead.
+
+Workers are started with the "spawn" method (safe with the threads of the
+main process, and the only method on Windows). Starting a worker and
+loading Streamlink takes seconds, so idle workers are kept ready with
+Streamlink already loaded; a recording takes a spare and a replacement is
+started right away in the background.
+
+A worker handles a single recording and exits. It reports over its pipe:
+
+    ("ready",)                          Streamlink loaded, waiting for a job
+    ("log", message)                    Line to print in the main process
+    ("stage", name, timestamp)          Latency stage reached
+    ("details", {...})                  Stream resolution details of the recording
+    ("first_byte", timestamp)           First data written
+    ("progress", bytes_written)         At most every PROGRESS_INTERVAL seconds
+    ("done", return_code, error)        0 on success, 1 on error
+    ("cancelled", bytes_written, lost)  Stopped through the cancel event
+
+One supervisor thread in the main process waits on the pipes of all running
+workers and hands every message to a callback. A worker that dies without
+reporting "done" is reported as failed.
+
+Cancellation uses a multiprocessing Event per worker, which has the same
+set()/is_set() interface as the threading.Event the thread engine uses. A
+watcher thread in the worker waits on it and unblocks the stream read, the
+same way RecordingHandle.cancel() does for the thread engine; the worker
+then writes out buffered data and fsyncs the file before reporting.
+"""
+
+import multiprocessing
+import threading
+import time
+from multiprocessing import connection
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from backend.src.services.recording_handle import (
+    RECORDING_DRAIN_TIMEOUT, buffered_bytes, finalize_file, unblock_stream
+)
+
+# Bytes read from the stream at a time
+READ_SIZE = 1024 * 1024
+
+# Seconds between progress messages of a worker
+PROGRESS_INTERVAL = 5.0
+
+# Seconds the supervisor waits on the pipes before checking for new workers
+SUPERVISOR_POLL_INTERVAL = 0.5
+
+
+def _worker_main(conn, cancel) -> None:
+    """
+    Entry point of a worker process: load Streamlink, wait for a job, record.
+
+    Args:
+        conn: Worker end of the pipe to the main process
+        cancel: multiprocessing Event set to stop the recording
+    """
+    from backend.src.services.streamlink_pool import StreamlinkSessionPool
+
+    pool = StreamlinkSessionPool(workers=1)
+    pool.warm_up()
+    try:
+        conn.send(("ready",))
+        job = conn.recv()
+    except (EOFError, OSError):
+        return
+    if job is None:
+        return
+
+    try:
+        _record(conn, cancel, pool, job)
+    finally:
+        conn.close()
+
+
+def _record(conn, cancel, pool, job: Dict[str, Any]) -> None:
+    """
+    Record one stream, reporting progress over the pipe.
+
+    Args:
+        conn: Worker end of the pipe to the main process
+        cancel: multiprocessing Event set to stop the recording
+        pool: StreamlinkSessionPool of this worker
+        job: streamer, url, filepath, auth_token and resolution
+    """
+    streamer = job["streamer"]
+    try:
+        # The warmed-up session is anonymous; a job with an auth token gets a new one
+        streams, details = pool.resolve(streamer, job["url"], job["auth_token"])
+
+        if not streams:
+            conn.send(("log", f"[DownloadService] No streams found for {streamer}"))
+            conn.send(("done", 1, "no streams found"))
+            return
+        conn.send(("stage", "streams_resolved", time.time()))
+
+        # Get stream with selected resolution if available, otherwise best quality
+        resolution = job["resolution"]
+        if resolution in streams:
+            stream = streams[resolution]
+        else:
+            stream = streams["best"]
+            conn.send(("log", f"[DownloadService] Selected resolution {resolution} not available, using best"))
+
+        fd = stream.open()
+        conn.send(("stage", "stream_opened", time.time()))
+        conn.send(("details", details))
+
+        # Wake a blocked read as soon as the recording is cancelled
+        finished = threading.Event()
+        cancelled_at = []
+
+        def watch_cancel():
+            while not finished.is_set():
+                if cancel.wait(SUPERVISOR_POLL_INTERVAL):
+                    cancelled_at.append(time.monotonic())
+                    unblock_stream(fd)
+                    return
+
+        threading.Thread(target=watch_cancel, name="recording-cancel", daemon=True).start()
+
+        written = 0
+        lost = 0
+        last_report = time.monotonic()
+        try:
+            with open(job["filepath"], "wb") as f:
+                try:
+                    # After a cancel, reads return what is still buffered
+                    while not (cancelled_at and time.monotonic() - cancelled_at[0] > RECORDING_DRAIN_TIMEOUT):
+                        try:
+                            data = fd.read(READ_SIZE)
+                        except Exception as e:
+                            if not cancel.is_set():
+                                conn.send(("log", f"[DownloadService] Error during stream read: {e}"))
+                            break
+                        if not data:
+                            break
+                        f.write(data)
+                        if not written:
+                            conn.send(("first_byte", time.time()))
+                        written += len(data)
+                        if time.monotonic() - last_report >= PROGRESS_INTERVAL:
+                            last_report = time.monotonic()
+                            conn.send(("progress", written))
+                finally:
+                    finalize_file(f)
+                    lost = buffered_bytes(fd)
+
+            # Report before closing the stream, which waits for Streamlink's threads
+            conn.send(("progress", written))
+            if cancel.is_set():
+                conn.send(("cancelled", written, lost))
+            else:
+                conn.send(("done", 0, None))
+        finally:
+            finished.set()
+            try:
+                fd.close()
+            except Exception:
+                pass
+    except Exception as e:
+        try:
+            conn.send(("done", 1, str(e)))
+        except (EOFError, OSError):
+            pass
+
+
+class RecordingProcess:
+    """
+    Handle of one worker process and the recording it runs.
+
+    Attributes:
+        process (multiprocessing.Process): The worker
+        conn (Connection): Main process end of the pipe
+        cancel (multiprocessing.Event): Set to stop the recording
+        streamer (Optional[str]): Streamer being recorded, None while spare
+        filepath (Optional[str]): Recording file
+        bytes_written (int): Last reported file size
+        bytes_lost (int): Bytes still buffered when a cancelled recording stopped
+        started_at (Optional[float]): Epoch time the job was handed over
+        finished (bool): Whether "done" or "cancelled" was received
+    """
+
+    def __init__(self, process, conn, cancel):
+        """
+        Wrap a started worker process.
+
+        Args:
+            process: The worker
+            conn: Main process end of the pipe
+            cancel: multiprocessing Event shared with the worker
+        """
+        self.process = process
+        self.conn = conn
+        self.cancel = cancel
+        self.streamer: Optional[str] = None
+        self.filepath: Optional[str] = None
+        self.bytes_written = 0
+        self.bytes_lost = 0
+        self.started_at: Optional[float] = None
+        self.finished = False
+
+    @property
+    def pid(self) -> Optional[int]:
+        """Process ID of the worker."""
+        return self.process.pid
+
+    def is_alive(self) -> bool:
+        """Whether the worker process is still running."""
+        return self.process.is_alive()
+
+
+class RecordingProcessPool:
+    """
+    Starts recordings in worker processes and relays their messages.
+
+    Attributes:
+        spares (int): Idle workers kept ready
+        _on_message (Callable): on_message(handle, message), called from the
+            supervisor thread
+        _context: multiprocessing "spawn" context
+        _idle (List[RecordingProcess]): Spare workers
+        _active (List[RecordingProcess]): Workers running a recording
+        _exiting (List[RecordingProcess]): Finished workers not yet reaped
+        _lock (threading.Lock): Guards the worker lists
+        _spawn_lock (threading.Lock): Lets one thread at a time top up the spares
+        _thread (Optional[threading.Thread]): Supervisor thread
+        _running (bool): Whether the supervisor should keep running
+        _stats (Dict[str, int]): Worker and outcome counters
+    """
+
+    def __init__(self, on_message: Callable[[RecordingProcess, Tuple], None],
+                 spares: int = 1):
+        """
+        Initialize the pool without starting any worker.
+
+        Args:
+            on_message: Called with (handle, message) for every worker message
+            spares: Idle workers kept ready
+        """
+        self.spares = max(0, spares)
+        self._on_message = on_message
+        self._context = multiprocessing.get_context("spawn")
+        self._idle: List[RecordingProcess] = []
+        self._active: List[RecordingProcess] = []
+        self._exiting: List[RecordingProcess] = []
+        self._lock = threading.Lock()
+        self._spawn_lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._running = False
+        self._stats = {"spawned": 0, "launched": 0, "completed": 0, "failed": 0, "cancelled": 0, "crashed": 0}
+
+    def start(self) -> None:
+        """Start the supervisor thread, which also starts the spare workers."""
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._supervise, name="recording-supervisor", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop the supervisor and the spare workers. Running recordings are left alone."""
+        self._running = False
+        if self._thread is not None:
+            self._thread.join(timeout=SUPERVISOR_POLL_INTERVAL * 4)
+            self._thread = None
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for handle in idle:
+            try:
+                handle.conn.send(None)
+            except (EOFError, OSError):
+                pass
+            handle.process.join(timeout=1)
+            if handle.is_alive():
+                handle.process.terminate()
+
+    def set_spares(self, spares: int) -> None:
+        """
+        Change the number of idle workers kept ready.
+
+        Missing spares are started by the supervisor; surplus ones are told
+        to exit.
+
+        Args:
+            spares: Idle workers kept ready
+        """
+        with self._lock:
+            self.spares = max(0, spares)
+            surplus = self._idle[self.spares:]
+            del self._idle[self.spares:]
+            self._exiting.extend(surplus)
+        for handle in surplus:
+            try:
+                handle.conn.send(None)
+            except (EOFError, OSError):
+                pass
+            handle.conn.close()
+
+    def _spawn(self) -> RecordingProcess:
+        """Start a new worker process."""
+        parent_conn, child_conn = self._context.Pipe()
+        cancel = self._context.Event()
+        process = self._context.Process(
+            target=_worker_main, args=(child_conn, cancel),
+            name="recording-worker", daemon=True,
+        )
+        process.start()
+        child_conn.close()
+        self._stats["spawned"] += 1
+        return RecordingProcess(process, parent_conn, cancel)
+
+    def launch(self, streamer: str, url: str, filepath: str,
+               auth_token: Optional[str], resolution: str) -> RecordingProcess:
+        """
+        Start a recording in a spare worker, or in a new one if none is ready.
+
+        Args:
+            streamer: Twitch username
+            url: Stream URL handed to Streamlink
+            filepath: Recording file
+            auth_token: Twitch auth-token cookie, None for anonymous access
+            resolution: Preferred quality, "best" if unavailable
+
+        Returns:
+            RecordingProcess: Handle of the worker running the recording
+        """
+        with self._lock:
+            handle = None
+            while self._idle:
+                candidate = self._idle.pop(0)
+                if candidate.is_alive():
+                    handle = candidate
+                    break
+            if handle is None:
+                handle = self._spawn()
+            elif self._running:
+                # Replace the spare now rather than at the supervisor's next poll
+                threading.Thread(target=self._top_up, name="recording-top-up", daemon=True).start()
+
+            handle.streamer = streamer
+            handle.filepath = filepath
+            handle.started_at = time.time()
+            handle.conn.send({
+                "streamer": streamer,
+                "url": url,
+                "filepath": filepath,
+                "auth_token": auth_token,
+                "resolution": resolution,
+            })
+            self._active.append(handle)
+            self._stats["launched"] += 1
+        return handle
+
+    def _supervise(self) -> None:
+        """Relay worker messages and keep spare workers ready."""
+        while self._running:
+            self._top_up()
+            self._reap()
+
+            with self._lock:
+                handles = {handle.conn: handle for handle in self._active}
+            if not handles:
+                time.sleep(SUPERVISOR_POLL_INTERVAL)
+                continue
+
+            for conn in connection.wait(list(handles), timeout=SUPERVISOR_POLL_INTERVAL):
+                handle = handles[conn]
+                try:
+                    message = conn.recv()
+                except (EOFError, OSError):
+                    self._stats["crashed"] += 1
+                    message = ("done", 1, f"worker process exited with code {handle.process.exitcode}")
+                self._dispatch(handle, message)
+
+    def _top_up(self) -> None:
+        """Start spare workers until there are enough."""
+        with self._spawn_lock:
+            while self._running:
+                with self._lock:
+                    self._idle = [handle for handle in self._idle if handle.is_alive()]
+                    if len(self._idle) >= self.spares:
+                        return
+                try:
+                    handle = self._spawn()
+                except Exception as e:
+                    print(f"[DownloadService] Could not start a recording worker: {e}")
+                    return
+                with self._lock:
+                    self._idle.append(handle)
+
+    def _reap(self) -> None:
+        """Join finished workers that have exited, without waiting on the others."""
+        with self._lock:
+            exiting, self._exiting = self._exiting, []
+        for handle in exiting:
+            handle.process.join(timeout=0)
+            if handle.process.exitcode is None:
+                with self._lock:
+                    self._exiting.append(handle)
+
+    def _dispatch(self, handle: RecordingProcess, message: Tuple) -> None:
+        """Update the handle from a message and pass it on."""
+        kind = message[0]
+        if kind == "ready":
+            return
+        if kind == "progress":
+            handle.bytes_written = message[1]
+        elif kind in ("done", "cancelled"):
+            handle.finished = True
+            if kind == "cancelled":
+                handle.bytes_written = message[1]
+                handle.bytes_lost = message[2]
+                self._stats["cancelled"] += 1
+            elif message[1] == 0:
+                self._stats["completed"] += 1
+            else:
+                self._stats["failed"] += 1
+            with self._lock:
+                if handle in self._active:
+                    self._active.remove(handle)
+                # A worker closes its stream before exiting; don't hold up other workers' messages
+                self._exiting.append(handle)
+            handle.conn.close()
+
+        try:
+            self._on_message(handle, message)
+        except Exception as e:
+            print(f"[DownloadService] Error handling recording worker message {kind}: {e}")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return worker counters and the running recordings.
+
+        Returns:
+            Dict[str, Any]: Spare and active worker counts, outcome counters,
+            and per recording its worker PID and bytes written
+        """
+        with self._lock:
+            active = [
+                {
+                    "streamer": handle.streamer,
+                    "pid": handle.pid,
+                    "bytes_written": handle.bytes_written,
+                    "started_at": handle.started_at,
+                }
+                for handle in self._active
+            ]
+            idle = len(self._idle)
+        return {**self._stats, "spares": idle, "active": active}
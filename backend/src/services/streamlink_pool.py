@@ -0,0 +1,265 @@
+"""
+Long-lived Streamlink sessions and pre-resolved stream lists.
+
+Starting a recording used to build a new Streamlink session in the download
+thread: importing streamlink, creating the session (which sets up its HTTP
+session and plugin index), loading the Twitch plugin, then fetching the
+access token and master playlist. All of that sat between the go-live and
+the first byte.
+
+The pool keeps one configured session per auth token for the life of the
+process and warms it up at startup, so the import and plugin load happen
+once. Streamlink creates a new plugin instance per streams() call and the
+session options are not changed after creation, so a session is shared by
+concurrent downloads.
+
+Stream resolution (access token and master playlist) needs the channel to
+be live, so it cannot happen before the go-live. prefetch() starts it in a
+worker thread as soon as a download is about to start. It then runs while
+the download service checks the live status and resolves the title, and
+the download thread picks up the result instead of resolving again. Results
+older than the prefetch TTL are not used.
+
+Usage:
+    pool = get_session_pool()
+    pool.warm_up()
+    pool.prefetch("streamer", url, auth_token)
+    streams, details = pool.resolve("streamer", url, auth_token)
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, Optional, Tuple
+
+from backend.src.config.constants import STREAMLINK_PREFETCH_TTL
+
+# Session options applied to every pooled session
+STREAM_TIMEOUT = 60
+RINGBUFFER_SIZE = 32 * 1024 * 1024  # 32M
+
+# Threads resolving streams ahead of the download thread
+PREFETCH_WORKERS = 4
+
+# URL resolved by warm_up() to load the Twitch plugin
+WARM_UP_URL = "https://twitch.tv/twitch"
+
+
+class StreamlinkSessionPool:
+    """
+    Shared Streamlink sessions per auth token plus speculative stream resolution.
+
+    All methods are thread-safe; they are called from the event loop and
+    from download threads.
+
+    Attributes:
+        prefetch_ttl (float): Seconds a pre-resolved stream list may be used
+        _sessions (Dict[Optional[str], Any]): Auth token (None without one)
+            to its Streamlink session
+        _prefetched (Dict[str, Tuple[float, Future]]): Streamer to (start
+            time, future of the streams() result)
+        _executor (ThreadPoolExecutor): Runs prefetch resolutions
+        _lock (threading.Lock): Guards sessions and prefetches
+        _stats (Dict[str, Any]): Session and prefetch counters
+    """
+
+    def __init__(self, prefetch_ttl: float = STREAMLINK_PREFETCH_TTL,
+                 workers: int = PREFETCH_WORKERS):
+        """
+        Initialize an empty pool.
+
+        Args:
+            prefetch_ttl: Seconds a pre-resolved stream list may be used
+            workers: Threads resolving streams ahead of the download thread
+        """
+        self.prefetch_ttl = prefetch_ttl
+        self._sessions: Dict[Optional[str], Any] = {}
+        self._prefetched: Dict[str, Tuple[float, Future]] = {}
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="streamlink-prefetch")
+        self._lock = threading.Lock()
+        self._stats = {
+            "sessions_created": 0,
+            "session_reuses": 0,
+            "warm_up_time": None,
+            "prefetches": 0,
+            "prefetch_hits": 0,
+            "prefetch_expired": 0,
+            "prefetch_failed": 0,
+            "fresh_resolves": 0,
+        }
+
+    def _create_session(self, auth_token: Optional[str]):
+        """Create and configure a Streamlink session."""
+        from streamlink.session import Streamlink
+
+        session = Streamlink()
+        session.set_option("stream-timeout", STREAM_TIMEOUT)
+        session.set_option("ringbuffer-size", RINGBUFFER_SIZE)
+
+        # Configure auth
+        if auth_token:
+            session.set_option("http-cookies", {"auth-token": auth_token})
+            session.set_option("http-headers", {
+                "Authorization": f"OAuth {auth_token}"
+            })
+        else:
+            session.set_option("twitch-disable-ads", True)
+        return session
+
+    def get_session(self, auth_token: Optional[str] = None) -> Tuple[Any, bool]:
+        """
+        Return the shared session for an auth token, creating it if needed.
+
+        Args:
+            auth_token: Twitch auth-token cookie, None for anonymous access
+
+        Returns:
+            Tuple[Any, bool]: The Streamlink session and whether it already
+            existed
+        """
+        with self._lock:
+            session = self._sessions.get(auth_token)
+            if session is not None:
+                self._stats["session_reuses"] += 1
+                return session, True
+
+            session = self._create_session(auth_token)
+            # A session per token is enough; drop sessions of replaced tokens
+            self._sessions = {
+                token: existing for token, existing in self._sessions.items()
+                if token is None
+            }
+            self._sessions[auth_token] = session
+            self._stats["sessions_created"] += 1
+            return session, False
+
+    def warm_up(self, auth_token: Optional[str] = None) -> float:
+        """
+        Create the session and load the Twitch plugin ahead of the first recording.
+
+        Blocking; run it in an executor from the event loop.
+
+        Args:
+            auth_token: Twitch auth-token cookie, None for anonymous access
+
+        Returns:
+            float: Seconds the warm-up took
+        """
+        started = time.monotonic()
+        session, _ = self.get_session(auth_token)
+        try:
+            # Loads the plugin module without any network request
+            session.resolve_url(WARM_UP_URL)
+        except Exception as e:
+            print(f"[DownloadService] Streamlink warm-up could not load the Twitch plugin: {e}")
+        elapsed = time.monotonic() - started
+        self._stats["warm_up_time"] = round(elapsed, 4)
+        return elapsed
+
+    def prefetch(self, streamer: str, url: str, auth_token: Optional[str] = None) -> None:
+        """
+        Start resolving a channel's streams in the background.
+
+        Args:
+            streamer: Twitch username
+            url: Stream URL handed to Streamlink
+            auth_token: Twitch auth-token cookie, None for anonymous access
+        """
+        with self._lock:
+            entry = self._prefetched.get(streamer)
+            if entry is not None and time.monotonic() - entry[0] < self.prefetch_ttl:
+                return
+            self._stats["prefetches"] += 1
+            future = self._executor.submit(self._resolve, url, auth_token)
+            self._prefetched[streamer] = (time.monotonic(), future)
+
+    def _resolve(self, url: str, auth_token: Optional[str]) -> Dict[str, Any]:
+        """Resolve streams with the shared session."""
+        session, _ = self.get_session(auth_token)
+        return session.streams(url)
+
+    def resolve(self, streamer: str, url: str,
+                auth_token: Optional[str] = None) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """
+        Return a channel's streams, using a prefetched result when available.
+
+        Blocking; called from the download thread.
+
+        Args:
+            streamer: Twitch username
+            url: Stream URL handed to Streamlink
+            auth_token: Twitch auth-token cookie, None for anonymous access
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, Any]]: Streams by quality name,
+            and how they were obtained: "session" ("pooled" or "new"),
+            "streams" ("prefetched" or "resolved") and "resolve_time" (seconds
+            this call waited)
+        """
+        started = time.monotonic()
+        with self._lock:
+            entry = self._prefetched.pop(streamer, None)
+        session, reused = self.get_session(auth_token)
+
+        if entry is not None:
+            prefetched_at, future = entry
+            if time.monotonic() - prefetched_at < self.prefetch_ttl:
+                try:
+                    streams = future.result()
+                    if streams:
+                        self._stats["prefetch_hits"] += 1
+                        return streams, {
+                            "session": "pooled" if reused else "new",
+                            "streams": "prefetched",
+                            "resolve_time": round(time.monotonic() - started, 4),
+                        }
+                except Exception as e:
+                    print(f"[DownloadService] Prefetched stream resolution for {streamer} failed: {e}")
+                self._stats["prefetch_failed"] += 1
+            else:
+                self._stats["prefetch_expired"] += 1
+                future.cancel()
+
+        self._stats["fresh_resolves"] += 1
+        streams = session.streams(url)
+        return streams, {
+            "session": "pooled" if reused else "new",
+            "streams": "resolved",
+            "resolve_time": round(time.monotonic() - started, 4),
+        }
+
+    def discard(self, streamer: str) -> None:
+        """Forget a streamer's prefetched streams (e.g. the download was aborted)."""
+        with self._lock:
+            entry = self._prefetched.pop(streamer, None)
+        if entry is not None:
+            entry[1].cancel()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return session and prefetch counters.
+
+        Returns:
+            Dict[str, Any]: Sessions created and reused, warm-up time,
+            prefetches started, used, expired and failed, resolutions done
+            in the download thread, and prefetches pending
+        """
+        with self._lock:
+            pending = len(self._prefetched)
+        return {**self._stats, "sessions": len(self._sessions), "prefetch_pending": pending}
+
+
+_session_pool: Optional[StreamlinkSessionPool] = None
+
+
+def get_session_pool() -> StreamlinkSessionPool:
+    """
+    Return the process-wide Streamlink session pool.
+
+    Returns:
+        StreamlinkSessionPool: Shared pool, created on first use
+    """
+    global _session_pool
+    if _session_pool is None:
+        _session_pool = StreamlinkSessionPool()
+    return _session_pool
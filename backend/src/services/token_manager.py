@@ -35,6 +35,7 @@ import time
 import asyncio
 import aiohttp
 from typing import Dict, Any, Optional, Tuple, Callable, List, Awaitable
+from backend.src.services.rate_limiter import get_rate_limiter
 
 class TokenManager:
     """
@@ -290,7 +291,10 @@ class TokenManager:
                     "Client-ID": "d88elif9gig3jo3921wrlusmc5rz21",
                     "Authorization": f"Bearer {token}"
                 }
+                limiter = get_rate_limiter("helix")
+                await limiter.acquire()
                 async with session.get(url, headers=headers) as response:
+                    limiter.observe(response.status, response.headers)
                     is_valid = response.status == 200
                     if not is_valid:
                         print(f"[TokenManager] Token validation failed with status: {response.status}")
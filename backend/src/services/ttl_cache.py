@@ -0,0 +1,395 @@
+"""
+Bounded LRU cache with per-field TTLs.
+
+Cached values are dicts whose fields are split into groups, each with its
+own time-to-live. For channel info, profile images can be kept for a day
+while the stream status expires after a minute; refreshing one group never
+touches the timestamps of the others.
+
+Each group of an entry is in one of three states:
+
+- fresh: younger than its TTL, served without a request
+- stale: past its TTL but within its stale window, served while the caller
+  revalidates in the background (stale-while-revalidate)
+- expired: must be fetched before it can be served
+
+Keys can also be cached negatively (e.g. unknown users) for a fixed time so
+repeated lookups don't hit the API. The cache holds at most max_entries
+keys and evicts the least recently used one when full.
+
+Long-lived groups can be exported with their original timestamps and
+loaded again after a restart, so the cache doesn't start cold. Every group
+has a version that changes whenever its data does, so callers can skip
+persisting a group that hasn't changed.
+
+Usage:
+    cache = TTLCache(
+        max_entries=1000,
+        groups={
+            "profile": (["profileImageURL", "offlineImageURL"], 86400, 0),
+            "stream": (["stream", "title"], 60, 60),
+        },
+        negative_ttl=300,
+    )
+    cache.set("channel_info:123", data)
+    lookup = cache.get("channel_info:123")
+    if lookup.is_fresh:
+        return lookup.value
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+
+class CacheLookup:
+    """
+    Result of a cache lookup.
+
+    Attributes:
+        value (Optional[Dict[str, Any]]): Copy of the cached fields, None on a
+            miss or negative hit
+        negative (bool): Whether the key is negatively cached
+        stale (Set[str]): Groups past their TTL but still servable
+        expired (Set[str]): Groups that must be fetched before serving
+    """
+
+    __slots__ = ("value", "negative", "stale", "expired")
+
+    def __init__(self, value: Optional[Dict[str, Any]] = None, negative: bool = False,
+                 stale: Optional[Set[str]] = None, expired: Optional[Set[str]] = None):
+        self.value = value
+        self.negative = negative
+        self.stale = stale or set()
+        self.expired = expired or set()
+
+    @property
+    def is_fresh(self) -> bool:
+        """Whether every group can be served without a request."""
+        return self.value is not None and not self.stale and not self.expired
+
+    @property
+    def is_servable(self) -> bool:
+        """Whether the value can be served now, possibly while revalidating."""
+        return self.value is not None and not self.expired
+
+
+class TTLCache:
+    """
+    LRU cache of dict values with per-group TTLs and negative caching.
+
+    Attributes:
+        max_entries (int): Maximum number of keys kept
+        negative_ttl (float): Seconds a negative entry stays valid
+        _groups (Dict[str, Tuple[Set[str], float, float]]): Group name to
+            (fields, ttl, stale window)
+        _field_group (Dict[str, str]): Field name to group name
+        _entries (OrderedDict): Key to (data, {group: timestamp}), in LRU order
+        _negative (Dict[str, float]): Negatively cached key to timestamp
+        _stats (Dict[str, int]): Hit, stale hit, miss, negative hit and
+            eviction counters
+        _versions (Dict[str, int]): Group name to a counter bumped whenever
+            data of the group is stored, loaded, expired or dropped
+    """
+
+    def __init__(self, max_entries: int = 1000,
+                 groups: Optional[Dict[str, Tuple[Iterable[str], float, float]]] = None,
+                 default_ttl: float = 60, negative_ttl: float = 300):
+        """
+        Initialize an empty cache.
+
+        Args:
+            max_entries: Maximum number of keys kept
+            groups: Group name to (fields, ttl, stale window). Fields not
+                listed in any group belong to the "default" group
+            default_ttl: TTL of the "default" group, with no stale window
+            negative_ttl: Seconds a negative entry stays valid
+        """
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        self._groups: Dict[str, Tuple[Set[str], float, float]] = {"default": (set(), default_ttl, 0)}
+        self._field_group: Dict[str, str] = {}
+
+        for name, (fields, ttl, stale_window) in (groups or {}).items():
+            self._groups[name] = (set(fields), ttl, stale_window)
+            for field in fields:
+                self._field_group[field] = name
+
+        self._entries: "OrderedDict[str, Tuple[Dict[str, Any], Dict[str, float]]]" = OrderedDict()
+        self._negative: Dict[str, float] = {}
+        self._stats = {
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "negative_hits": 0,
+            "evictions": 0,
+        }
+        self._versions: Dict[str, int] = {name: 0 for name in self._groups}
+
+    def version(self, group: str) -> int:
+        """Return a counter that changes whenever the group's data changes."""
+        return self._versions.get(group, 0)
+
+    def _changed(self, groups: Iterable[str]) -> None:
+        """Bump the versions of changed groups."""
+        for group in groups:
+            self._versions[group] = self._versions.get(group, 0) + 1
+
+    def group_of(self, field: str) -> str:
+        """Return the group a field belongs to."""
+        return self._field_group.get(field, "default")
+
+    def get(self, key: str, now: Optional[float] = None) -> CacheLookup:
+        """
+        Look up a key and classify its groups.
+
+        Args:
+            key: Cache key
+            now: Current time, defaults to time.time()
+
+        Returns:
+            CacheLookup: Copy of the value plus stale and expired groups
+        """
+        now = time.time() if now is None else now
+
+        negative_time = self._negative.get(key)
+        if negative_time is not None:
+            if now - negative_time < self.negative_ttl:
+                self._stats["negative_hits"] += 1
+                return CacheLookup(negative=True)
+            del self._negative[key]
+
+        entry = self._entries.get(key)
+        if entry is None:
+            self._stats["misses"] += 1
+            return CacheLookup()
+
+        self._entries.move_to_end(key)
+        data, updated = entry
+
+        # Groups an entry has never been filled for (e.g. after loading a
+        # partial snapshot) count as expired
+        stale = set()
+        expired = {group for group in self._groups if group != "default" and group not in updated}
+        for group, timestamp in updated.items():
+            _, ttl, stale_window = self._groups.get(group, self._groups["default"])
+            age = now - timestamp
+            if age < ttl:
+                continue
+            if age < ttl + stale_window:
+                stale.add(group)
+            else:
+                expired.add(group)
+
+        lookup = CacheLookup(dict(data), stale=stale, expired=expired)
+        if lookup.is_fresh:
+            self._stats["hits"] += 1
+        elif lookup.is_servable:
+            self._stats["stale_hits"] += 1
+        else:
+            self._stats["misses"] += 1
+        return lookup
+
+    def set(self, key: str, value: Dict[str, Any], now: Optional[float] = None) -> None:
+        """
+        Store fields for a key.
+
+        Fields are merged into the existing entry; only the groups of the
+        given fields get a new timestamp. The stored dict is replaced, never
+        mutated, so values handed out earlier stay unchanged.
+
+        Args:
+            key: Cache key
+            value: Fields to store
+            now: Current time, defaults to time.time()
+        """
+        now = time.time() if now is None else now
+        self._negative.pop(key, None)
+
+        entry = self._entries.get(key)
+        if entry is not None:
+            data, updated = entry
+            data = {**data, **value}
+            updated = dict(updated)
+        else:
+            data, updated = dict(value), {}
+
+        groups = {self.group_of(field) for field in value}
+        for group in groups:
+            updated[group] = now
+        self._changed(groups)
+
+        self._entries[key] = (data, updated)
+        self._entries.move_to_end(key)
+        self._evict()
+
+    def set_negative(self, key: str, now: Optional[float] = None) -> None:
+        """
+        Remember that a key has no value (e.g. the user doesn't exist).
+
+        Args:
+            key: Cache key
+            now: Current time, defaults to time.time()
+        """
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._changed(entry[1])
+        # Re-insert so the dict stays ordered by age
+        self._negative.pop(key, None)
+        self._negative[key] = time.time() if now is None else now
+        self._evict()
+
+    def export(self, groups: Iterable[str], now: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Export the fields of the given groups for persistence.
+
+        Only groups that are still fresh or stale are exported; negative
+        entries are not.
+
+        Args:
+            groups: Names of the groups to export
+            now: Current time, defaults to time.time()
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Key to {"t": {group: timestamp},
+            "d": {field: value}}, in LRU order (oldest first)
+        """
+        now = time.time() if now is None else now
+        groups = set(groups)
+        snapshot = {}
+
+        for key, (data, updated) in self._entries.items():
+            timestamps = {}
+            for group, timestamp in updated.items():
+                if group not in groups:
+                    continue
+                _, ttl, stale_window = self._groups.get(group, self._groups["default"])
+                if now - timestamp < ttl + stale_window:
+                    timestamps[group] = timestamp
+            if not timestamps:
+                continue
+
+            fields = {
+                field: value for field, value in data.items()
+                if self.group_of(field) in timestamps
+            }
+            snapshot[key] = {"t": timestamps, "d": fields}
+
+        return snapshot
+
+    def load(self, snapshot: Dict[str, Dict[str, Any]], now: Optional[float] = None) -> int:
+        """
+        Load entries exported by export(), keeping their original timestamps.
+
+        Entries that expired in the meantime and groups this cache doesn't
+        know are skipped. Loaded fields never overwrite newer data already
+        in the cache.
+
+        Args:
+            snapshot: Data returned by export()
+            now: Current time, defaults to time.time()
+
+        Returns:
+            int: Number of entries loaded
+        """
+        now = time.time() if now is None else now
+        loaded = 0
+
+        for key, item in snapshot.items():
+            try:
+                timestamps = item["t"]
+                fields = item["d"]
+            except (KeyError, TypeError):
+                continue
+
+            valid = {}
+            for group, timestamp in timestamps.items():
+                if group not in self._groups:
+                    continue
+                _, ttl, stale_window = self._groups[group]
+                if now - timestamp < ttl + stale_window:
+                    valid[group] = timestamp
+            if not valid:
+                continue
+
+            entry = self._entries.get(key)
+            data, updated = (dict(entry[0]), dict(entry[1])) if entry else ({}, {})
+            for group, timestamp in valid.items():
+                if updated.get(group, 0) >= timestamp:
+                    continue
+                updated[group] = timestamp
+                self._changed((group,))
+                data.update({
+                    field: value for field, value in fields.items()
+                    if self.group_of(field) == group
+                })
+
+            self._entries[key] = (data, updated)
+            loaded += 1
+
+        self._evict()
+        return loaded
+
+    def expire(self, key: str, group: str) -> None:
+        """
+        Mark one group of a key as expired, keeping its other groups.
+
+        The next lookup reports the group as expired, so only its fields are
+        fetched again.
+
+        Args:
+            key: Cache key
+            group: Group to expire
+        """
+        entry = self._entries.get(key)
+        if entry is not None and group in entry[1]:
+            data, updated = entry
+            updated = {name: timestamp for name, timestamp in updated.items() if name != group}
+            self._entries[key] = (data, updated)
+            self._changed((group,))
+
+    def invalidate(self, key: str) -> None:
+        """Remove a key, including any negative entry."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._changed(entry[1])
+        self._negative.pop(key, None)
+
+    def clear(self) -> None:
+        """Remove all entries."""
+        self._entries.clear()
+        self._negative.clear()
+        self._changed(self._groups)
+
+    def _evict(self) -> None:
+        """Drop least recently used entries until within max_entries."""
+        while len(self._entries) + len(self._negative) > self.max_entries:
+            if self._negative:
+                # Negative entries are cheap to recreate, drop the oldest first
+                del self._negative[next(iter(self._negative))]
+            else:
+                _, (_, updated) = self._entries.popitem(last=False)
+                self._changed(updated)
+            self._stats["evictions"] += 1
+
+    def __len__(self) -> int:
+        return len(self._entries) + len(self._negative)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or key in self._negative
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return cache statistics.
+
+        Returns:
+            Dict[str, Any]: Counters, current size and hit rate (fresh, stale
+            and negative hits over all lookups)
+        """
+        stats = dict(self._stats)
+        lookups = stats["hits"] + stats["stale_hits"] + stats["negative_hits"] + stats["misses"]
+        served = stats["hits"] + stats["stale_hits"] + stats["negative_hits"]
+        stats["size"] = len(self)
+        stats["max_entries"] = self.max_entries
+        stats["hit_rate"] = round(served / lookups, 3) if lookups else 0.0
+        return stats
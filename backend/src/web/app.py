@@ -100,6 +100,7 @@ class WebApp:
         self.app.router.add_get("/api/storage", handlers.get_storage_info)
         self.app.router.add_post("/api/storage", handlers.update_storage_path)
         self.app.router.add_post("/api/available-paths", handlers.get_available_paths)
+        self.app.router.add_get("/api/downloads/latency", handlers.get_recording_latency)
         
         # Authentication routes 
         self.app.router.add_route("*", "/api/auth/token", handlers.handle_token)
@@ -38,12 +38,14 @@ from typing import Dict, List, Any, Optional, Set
 from aiohttp import web
 from backend.src.config.settings import (
     get_monitored_streamers,
-    update_monitored_streamers,
     get_storage_path,
     update_storage_path,
     get_streamer_storage_path,
     update_streamer_storage_path,
+    streamer_store,
 )
+from backend.src.services.recording_latency import get_latency_tracker
+from backend.src.services.streamlink_pool import get_session_pool
 
 class WebHandlers:
     """
@@ -98,8 +100,7 @@ class WebHandlers:
             500: If an error occurs while retrieving streamers
         """
         try:
-            streamers = get_monitored_streamers()
-            return web.json_response(list(streamers.keys()))
+            return web.json_response(streamer_store.names())
         except Exception as e:
             print(f"Error getting streamers: {e}")
             return web.json_response({"error": str(e)}, status=500)
@@ -181,16 +182,17 @@ class WebHandlers:
             if new_streamers:
                 try:
                     print(f"[Streamers] Fetching details for {len(new_streamers)} NEW streamers")
-                    from backend.src.services.gql_client import GQLClient
-                    gql_client = GQLClient()
+                    from backend.src.services.gql_client import get_gql_client
+                    gql_client = get_gql_client()
                     
                     # Fetch Twitch IDs
                     twitch_ids = await gql_client.lookup_channel_ids(new_streamers)
                     print(f"[Streamers] Fetched {len(twitch_ids)} Twitch IDs for new streamers")
                     
-                    # Now fetch channel info including profile images for each new streamer
+                    # Now fetch channel info including profile images for all new streamers
+                    channels_info = await gql_client.get_channels_info(list(twitch_ids.values()))
                     for streamer, channel_id in twitch_ids.items():
-                        info = await gql_client.get_channel_info(channel_id)
+                        info = channels_info.get(channel_id)
                         if info:
                             channel_info[streamer] = info
                     
@@ -225,8 +227,12 @@ class WebHandlers:
                     else:
                         print(f"Added new streamer: {streamer} without profile image")
 
-            # Save the updated streamers list
-            update_monitored_streamers(updated_streamers)
+            # Save the updated streamers list - only touch added and removed
+            # entries so concurrent status updates to existing streamers are kept
+            if removed_streamers:
+                streamer_store.remove(removed_streamers)
+            for streamer in new_streamers:
+                streamer_store.upsert(streamer, **updated_streamers[streamer])
             
             # Create EventSub subscriptions for new streamers
             if hasattr(self, 'monitor_service') and self.monitor_service and new_streamers:
@@ -310,12 +316,11 @@ class WebHandlers:
     async def get_streamer_status(self, request: web.Request) -> web.Response:
         try:
             streamer = request.match_info["streamer"].lower()
-            streamers = get_monitored_streamers()
+            settings = streamer_store.get(streamer)
             
-            if streamer not in streamers:
+            if settings is None:
                 return web.json_response({"error": "Streamer not found"}, status=404)
             
-            settings = streamers[streamer]
             is_live = settings.get("isLive", False)
             
             # Create response using cached data - no GQL queries
@@ -374,6 +379,33 @@ class WebHandlers:
             print(f"Error getting EventSub debug info: {e}")
             return web.json_response({"error": str(e)}, status=500)
             
+    async def get_recording_latency(self, request: web.Request) -> web.Response:
+        """
+        Get go-live-to-first-byte latency of recent recordings.
+        
+        Returns per-stage timestamps and durations of recent recordings,
+        recordings still on their way to the first byte, p50/p95/p99
+        of the total and of every stage, and Streamlink session pool
+        counters.
+        
+        Args:
+            request: The HTTP request object, optionally with ?recent=N
+            
+        Returns:
+            JSON response with the latency summary
+            
+        Error Responses:
+            500: If the summary can't be built
+        """
+        try:
+            recent = int(request.query.get("recent", 20))
+            summary = get_latency_tracker().get_summary(recent=recent)
+            summary["streamlink"] = get_session_pool().get_stats()
+            return web.json_response(summary)
+        except Exception as e:
+            print(f"Error getting recording latency: {e}")
+            return web.json_response({"error": str(e)}, status=500)
+            
     async def eventsub_reconnect(self, request: web.Request) -> web.Response:
         """
         Force reconnection of EventSub connections.
@@ -599,18 +631,7 @@ class WebHandlers:
                 return web.json_response({"error": f"Path is not writable: {str(e)}"}, status=400)
             
             # Update in streamers.json with the new field name
-            streamers = get_monitored_streamers()
-            
-            if streamer not in streamers:
-                streamers[streamer] = {
-                    "downloads_enabled": False,
-                    "twitch_id": "",
-                    "save_directory": path
-                }
-            else:
-                streamers[streamer]["save_directory"] = path
-            
-            update_monitored_streamers(streamers)
+            streamer_store.upsert(streamer, save_directory=path)
             
             return web.json_response({"status": "ok", "path": path})
         except Exception as e:
@@ -642,10 +663,9 @@ class WebHandlers:
         """
         try:
             streamer = request.match_info["streamer"].lower()  # Normalize to lowercase
-            streamers = get_monitored_streamers()
             
             # Check if streamer exists
-            if streamer not in streamers:
+            if not streamer_store.contains(streamer):
                 return web.json_response({"error": "Streamer not found"}, status=404)
             
             # Get new settings from request
@@ -673,25 +693,16 @@ class WebHandlers:
                 settings_to_save["stream_resolution"] = new_settings["stream_resolution"]
                 print(f"[Settings] Updating resolution for {streamer} to {new_settings['stream_resolution']}")
             
-            # Update settings
-            streamers[streamer].update(settings_to_save)
-            
-            # Save updated settings
-            update_monitored_streamers(streamers)
+            # Update and save settings
+            streamer_store.patch(streamer, **settings_to_save)
             
             # For the response and notifications, include both persistent and display settings
-            response_settings = streamers[streamer].copy()
+            response_settings = streamer_store.get(streamer) or {}
             
             # Add display fields for frontend
-            response_settings["isLive"] = streamers[streamer].get("isLive", False)  # Use actual value
-            response_settings["title"] = streamers[streamer].get("title", f"{streamer}'s Stream")
-            response_settings["thumbnail"] = streamers[streamer].get("thumbnail", "")
-
-            # Make sure to preserve profile image URLs
-            if "profileImageURL" not in response_settings and "profileImageURL" in streamers[streamer]:
-                response_settings["profileImageURL"] = streamers[streamer]["profileImageURL"]
-            if "offlineImageURL" not in response_settings and "offlineImageURL" in streamers[streamer]:
-                response_settings["offlineImageURL"] = streamers[streamer]["offlineImageURL"]
+            response_settings["isLive"] = response_settings.get("isLive", False)  # Use actual value
+            response_settings["title"] = response_settings.get("title", f"{streamer}'s Stream")
+            response_settings["thumbnail"] = response_settings.get("thumbnail", "")
             
             # Notify clients about the update
             if hasattr(self, 'websocket_manager'):
@@ -890,17 +901,17 @@ class WebHandlers:
         """
         streamer = request.match_info["streamer"].lower()
         try:
-            streamers = get_monitored_streamers()
-            if streamer not in streamers:
+            settings = streamer_store.get(streamer)
+            if settings is None:
                 return web.json_response({"error": "Streamer not found"}, status=404)
                 
             # Check if streamer is live
-            if not streamers[streamer].get("isLive", False):
+            if not settings.get("isLive", False):
                 return web.json_response({"error": "Streamer is not live"}, status=400)
                 
             # Start the download
             await self.monitor_service.download_service.start_download(
-                streamer, streamers[streamer]
+                streamer, settings
             )
             
             return web.json_response({"status": "ok"})
@@ -971,14 +982,9 @@ class WebHandlers:
             if hasattr(self, 'monitor_service') and self.monitor_service:
                 await self.monitor_service.download_service.enable_downloads(streamer, enabled)
             
-            # Then update settings
-            streamers = get_monitored_streamers()
-            if streamer not in streamers:
+            # Then update the setting
+            if not streamer_store.patch(streamer, downloads_enabled=enabled):
                 return web.json_response({"error": "Streamer not found"}, status=404)
-                
-            # Update the setting
-            streamers[streamer]["downloads_enabled"] = enabled
-            update_monitored_streamers(streamers)
             
             return web.json_response({"status": "ok", "enabled": enabled})
         except Exception as e:
@@ -0,0 +1,63 @@
+"""
+Tests for the EventSub notification guard.
+
+Run from the repository root:
+    python -m unittest backend.tests.test_eventsub_dedup
+"""
+
+import unittest
+
+from backend.src.services.eventsub_dedup import NotificationGuard
+
+
+def notification(message_id, event_type, message_timestamp, started_at=None, user_id="1001"):
+    """Build a notification message as received on the WebSocket."""
+    event = {"broadcaster_user_id": user_id}
+    if started_at is not None:
+        event["started_at"] = started_at
+    return {
+        "metadata": {
+            "message_id": message_id,
+            "subscription_type": event_type,
+            "message_timestamp": message_timestamp,
+        },
+        "payload": {"event": event},
+    }
+
+
+class NotificationGuardTest(unittest.TestCase):
+
+    def test_duplicate_message_id(self):
+        guard = NotificationGuard()
+        data = notification("m1", "stream.online", "2026-10-15T12:00:01Z", "2026-10-15T12:00:00Z")
+        self.assertIsNone(guard.check(data))
+        self.assertEqual(guard.check(data), "duplicate")
+
+    def test_late_offline_then_quick_restart(self):
+        # The stream drops at 12:00 and restarts at 12:00:30, but Twitch only
+        # sends the stream.offline at 12:01
+        guard = NotificationGuard()
+        self.assertIsNone(guard.check(notification(
+            "m1", "stream.online", "2026-10-15T11:00:01Z", "2026-10-15T11:00:00Z")))
+        self.assertIsNone(guard.check(notification(
+            "m2", "stream.offline", "2026-10-15T12:01:00Z")))
+        self.assertIsNone(guard.check(notification(
+            "m3", "stream.online", "2026-10-15T12:01:02Z", "2026-10-15T12:00:30Z")))
+
+    def test_stale_online_is_dropped(self):
+        guard = NotificationGuard()
+        self.assertIsNone(guard.check(notification(
+            "m1", "stream.online", "2026-10-15T12:00:01Z", "2026-10-15T12:00:00Z")))
+        self.assertEqual(guard.check(notification(
+            "m2", "stream.online", "2026-10-15T12:05:00Z", "2026-10-15T11:00:00Z")), "out_of_order")
+
+    def test_stale_offline_is_dropped(self):
+        guard = NotificationGuard()
+        self.assertIsNone(guard.check(notification(
+            "m1", "stream.online", "2026-10-15T12:00:01Z", "2026-10-15T12:00:00Z")))
+        self.assertEqual(guard.check(notification(
+            "m2", "stream.offline", "2026-10-15T11:30:00Z")), "out_of_order")
+
+
+if __name__ == "__main__":
+    unittest.main()
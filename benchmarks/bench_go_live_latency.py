@@ -0,0 +1,158 @@
+"""
+Benchmark: go-live-to-first-byte latency of recordings.
+
+Runs EventSubService and DownloadService against the local Twitch mock
+(mock_twitch.py) and lets channels go live one after another. Each go-live
+travels the real path - EventSub notification, settings write, download
+monitor, channel info lookups, Streamlink resolving the mock's HLS
+playlist - and the recording latency tracker stamps every stage. Reports
+p50/p95/p99 of the total and of each stage.
+
+The backend's config directory is redirected to a temporary HOME, so the
+real streamer settings are not touched.
+
+Usage (from the repository root):
+    python benchmarks/bench_go_live_latency.py
+    python benchmarks/bench_go_live_latency.py --channels 40 --spread 30
+    python benchmarks/bench_go_live_latency.py --no-prefetch
+    python benchmarks/bench_go_live_latency.py --engine process
+    python benchmarks/bench_go_live_latency.py --engine hls
+"""
+
+import os
+import sys
+import time
+import shutil
+import asyncio
+import argparse
+import random
+import tempfile
+
+# Keep the backend's config files out of the real config directory. Recording
+# worker processes import this module again and reuse the parent's directory
+TEMP_HOME = os.environ.get("BENCH_GO_LIVE_HOME") or tempfile.mkdtemp(prefix="bench_go_live_")
+os.environ["BENCH_GO_LIVE_HOME"] = TEMP_HOME
+os.environ["HOME"] = TEMP_HOME
+os.environ["APPDATA"] = TEMP_HOME
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from mock_twitch import MockTwitch, make_channels, point_backend_at
+from backend.src.config.settings import streamer_store
+from backend.src.services import download_service as download_module
+from backend.src.services.download_service import DownloadService
+from backend.src.services.eventsub_service import EventSubService
+from backend.src.services.recording_latency import STAGES, get_latency_tracker
+
+
+class SilentWebSocketManager:
+    """Accepts the frontend broadcasts the services send and drops them."""
+
+    def __getattr__(self, name):
+        async def broadcast(*args, **kwargs):
+            return None
+        return broadcast
+
+
+def fmt(value):
+    """Format seconds as milliseconds for the table."""
+    return f"{value * 1000:>10.1f}" if value is not None else f"{'-':>10}"
+
+
+async def run(args):
+    mock = MockTwitch(make_channels(args.channels), max_total_cost=10000, subscription_cost=0)
+    await mock.start()
+    point_backend_at(mock)
+    download_module.TWITCH_STREAM_URL = f"hls://{mock.base_url}/hls/{{streamer}}.m3u8"
+    download_module.STREAMLINK_PREFETCH = not args.no_prefetch
+
+    recordings_dir = os.path.join(TEMP_HOME, "recordings")
+    streamer_store.replace_all({
+        channel["login"]: {
+            "twitch_id": user_id,
+            "downloads_enabled": True,
+            "save_directory": recordings_dir,
+            "isLive": False,
+            "title": "",
+        }
+        for user_id, channel in mock.channels.items()
+    })
+
+    websocket_manager = SilentWebSocketManager()
+    eventsub = EventSubService(websocket_manager)
+    eventsub.token = "mock-token"
+    downloads = DownloadService(websocket_manager)
+    downloads.engine = args.engine
+
+    await eventsub.start()
+    # Twitch reports the token's real cost limits with the first subscription;
+    # apply the mock's up front so every channel is subscribed from the start
+    eventsub.shard_planner.update_limits(max_total_cost=mock.max_total_cost, cost=mock.subscription_cost)
+    await downloads.start()
+
+    # Wait until every channel has its stream.online subscription
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        if len(eventsub.active_subscriptions) >= args.channels:
+            break
+        await asyncio.sleep(0.2)
+    print(f"Subscribed {len(eventsub.active_subscriptions)}/{args.channels} channels, "
+          f"starting {args.channels} go-lives over {args.spread:.0f}s")
+
+    # Go live at random moments so the download monitor's phase varies
+    tracker = get_latency_tracker()
+    for user_id in random.sample(mock.user_ids(), len(mock.user_ids())):
+        await mock.set_live(user_id, True)
+        await asyncio.sleep(random.uniform(0, 2 * args.spread / args.channels))
+
+    deadline = time.monotonic() + args.timeout
+    while time.monotonic() < deadline:
+        if tracker.get_summary(recent=0)["completed"] >= args.channels:
+            break
+        await asyncio.sleep(0.5)
+
+    summary = tracker.get_summary(recent=0)
+
+    # End the recordings before shutting down
+    for user_id in mock.user_ids():
+        mock.channels[user_id]["live"] = False
+    for streamer in list(downloads.active_downloads):
+        await downloads.stop_download(streamer)
+    await downloads.stop()
+    await eventsub.stop()
+    await mock.stop()
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--channels", type=int, default=20, help="channels going live")
+    parser.add_argument("--spread", type=float, default=20.0, help="seconds over which channels go live")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the last first byte")
+    parser.add_argument("--no-prefetch", action="store_true", help="resolve streams in the download thread only")
+    parser.add_argument("--engine", choices=("thread", "process", "hls"), default="thread", help="recording engine")
+    args = parser.parse_args()
+
+    try:
+        summary = asyncio.run(run(args))
+    finally:
+        streamer_store.flush()
+        shutil.rmtree(TEMP_HOME, ignore_errors=True)
+
+    total = summary["go_live_to_first_byte"]
+    print(f"\nRecordings with a first byte: {summary['completed']}/{args.channels}\n")
+    print(f"{'stage':<18} {'count':>6} {'p50 ms':>10} {'p95 ms':>10} {'p99 ms':>10}")
+    for stage in STAGES[1:]:
+        dist = summary["stages"][stage]
+        if dist["count"]:
+            print(f"{stage:<18} {dist['count']:>6} {fmt(dist['p50'])} {fmt(dist['p95'])} {fmt(dist['p99'])}")
+    print(f"{'total':<18} {total['count']:>6} {fmt(total['p50'])} {fmt(total['p95'])} {fmt(total['p99'])}")
+    cold = summary["cold_start"]
+    if cold["count"]:
+        print(f"{'cold start':<18} {cold['count']:>6} {fmt(cold['p50'])} {fmt(cold['p95'])} {fmt(cold['p99'])}")
+
+
+if __name__ == "__main__":
+    main()
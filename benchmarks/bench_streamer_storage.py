@@ -0,0 +1,100 @@
+"""
+Benchmark: per-update persistence cost of the streamer storage backends.
+
+Measures how long a single streamer settings update (stream_resolution)
+takes to reach storage with the JSON and SQLite backends at different
+roster sizes. Live status fields (isLive/title/thumbnail) are kept in
+memory and never reach the backend, so they are not measured. Debouncing
+is disabled so every update is written, which is the worst case the
+debounced writer protects against.
+
+Usage (from the repository root):
+    python benchmarks/bench_streamer_storage.py
+    python benchmarks/bench_streamer_storage.py --sizes 10 1000 --updates 50
+"""
+
+import os
+import sys
+import time
+import shutil
+import argparse
+import tempfile
+import statistics
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from backend.src.config.storage_backends import create_storage_backend
+from backend.src.config.streamer_store import StreamerStore
+
+
+def make_roster(size):
+    """Build a roster of `size` streamers with realistic settings."""
+    return {
+        f"streamer{i}": {
+            "downloads_enabled": i % 3 == 0,
+            "twitch_id": str(100000 + i),
+            "save_directory": f"/mnt/streams/streamer{i}",
+            "stream_resolution": "best",
+            "profileImageURL": f"https://static-cdn.jtvnw.net/jtv_user_pictures/{i}-profile_image-150x150.png",
+            "offlineImageURL": "",
+            "isLive": False,
+            "title": f"streamer{i}'s Stream",
+            "thumbnail": "",
+        }
+        for i in range(size)
+    }
+
+
+def bench_backend(kind, size, updates):
+    """
+    Time `updates` single-streamer updates for one backend and roster size.
+
+    Returns:
+        list: Per-update durations in seconds
+    """
+    config_dir = tempfile.mkdtemp(prefix=f"bench_{kind}_")
+    try:
+        store = StreamerStore(
+            create_storage_backend(kind, config_dir),
+            lambda: config_dir,
+            flush_interval=0,
+        )
+        store.replace_all(make_roster(size))
+
+        durations = []
+        for i in range(updates):
+            name = f"streamer{i % size}"
+            start = time.perf_counter()
+            # Alternate on every visit so each update changes the stored value
+            store.patch(name, stream_resolution="720p60" if (i // size) % 2 == 0 else "best")
+            durations.append(time.perf_counter() - start)
+
+        store.backend.close()
+        return durations
+    finally:
+        shutil.rmtree(config_dir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 1000, 10000])
+    parser.add_argument("--updates", type=int, default=100)
+    parser.add_argument("--backends", nargs="+", default=["json", "sqlite"])
+    args = parser.parse_args()
+
+    print(f"{'backend':<8} {'streamers':>10} {'mean ms':>10} {'p50 ms':>10} {'p95 ms':>10}")
+    for size in args.sizes:
+        for kind in args.backends:
+            durations = sorted(bench_backend(kind, size, args.updates))
+            p95 = durations[min(len(durations) - 1, int(len(durations) * 0.95))]
+            print(
+                f"{kind:<8} {size:>10} "
+                f"{statistics.mean(durations) * 1000:>10.3f} "
+                f"{statistics.median(durations) * 1000:>10.3f} "
+                f"{p95 * 1000:>10.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,722 @@
+"""
+Local stand-in for the Twitch endpoints the backend talks to.
+
+Runs an aiohttp server on localhost that implements enough of Twitch for
+EventSubService, GQLClient and the Helix helpers to run unmodified, so
+throughput and latency can be measured offline and reproducibly:
+
+- EventSub WebSocket (/ws): session_welcome, session_keepalive,
+  notification, session_reconnect (with handoff to a new socket) and
+  revocation messages
+- Helix EventSub subscriptions (/helix/eventsub/subscriptions): create,
+  paginated list with the status/type/user_id filters, and delete, with
+  Twitch's per-session and cost limits and Ratelimit-* headers (429 when
+  the bucket is empty)
+- Helix users (/helix/users), used to validate tokens
+- GQL (/gql): GetStreamStatus, GetChannelInfo, GetStreamStatusOnly and
+  GetUsersBatch as sent by GQLClient
+- a live HLS playlist per live channel (/hls/<login>.m3u8) with generated
+  segments, for download experiments
+
+Scenarios are scripted from Python: set_live() flips a channel and sends
+the matching notifications, flap() keeps N channels going live and offline,
+reconnect() and revoke() exercise the session lifecycle. Every notification
+records its send time, so receivers can measure delivery latency.
+
+Usage (from the repository root):
+    python benchmarks/mock_twitch.py --channels 100
+    python benchmarks/mock_twitch.py --channels 500 --flap 50 --interval 2
+
+As a library:
+    mock = MockTwitch(make_channels(100))
+    await mock.start()
+    point_backend_at(mock)
+    await mock.flap(mock.user_ids()[:10], interval=1, cycles=5)
+    await mock.stop()
+"""
+
+import os
+import sys
+import time
+import uuid
+import asyncio
+import argparse
+import random
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+from aiohttp import web, WSMsgType
+
+# Make the backend package importable when run as a script
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+# Twitch's EventSub WebSocket limits
+MAX_SUBSCRIPTIONS_PER_SESSION = 300
+MAX_TOTAL_COST = 10
+
+# Seconds of generated video per HLS segment, and segments per playlist
+HLS_TARGET_DURATION = 2
+HLS_WINDOW = 6
+TS_PACKET = b"\x47" + b"\xff" * 187
+
+
+def make_channels(count: int, live_ratio: float = 0.0, first_id: int = 100000) -> Dict[str, Dict[str, Any]]:
+    """
+    Build a roster of fake channels.
+
+    Args:
+        count: Number of channels
+        live_ratio: Fraction of channels that start live
+        first_id: User ID of the first channel
+
+    Returns:
+        Dict[str, Dict[str, Any]]: User ID to channel state
+    """
+    now = time.time()
+    channels = {}
+    for i in range(count):
+        user_id = str(first_id + i)
+        live = i < int(count * live_ratio)
+        channels[user_id] = {
+            "login": f"streamer{i}",
+            "display_name": f"Streamer{i}",
+            "live": live,
+            "started_at": now if live else None,
+            "title": f"Streamer{i}'s Stream",
+            "game": "Just Chatting",
+            "viewers": 100 + i,
+        }
+    return channels
+
+
+def rfc3339(timestamp: Optional[float] = None) -> str:
+    """Format an epoch timestamp the way Twitch does."""
+    moment = datetime.fromtimestamp(time.time() if timestamp is None else timestamp, tz=timezone.utc)
+    return moment.strftime("%Y-%m-%dT%H:%M:%S.%fZ")
+
+
+class MockTwitch:
+    """
+    Scriptable fake of Twitch's EventSub, Helix and GQL endpoints.
+
+    Attributes:
+        channels (Dict[str, Dict[str, Any]]): User ID to channel state
+        host (str): Interface to listen on
+        port (int): Port to listen on, 0 picks a free one
+        page_size (int): Subscriptions per Helix list page
+        keepalive (float): Seconds between session_keepalive messages
+        subscription_cost (int): Cost of each subscription
+        max_total_cost (int): Cost budget of the token
+        rate_limit (int): Helix bucket size, refilled over one minute
+        gql_latency (float): Seconds added to every GQL response
+        sessions (Dict[str, web.WebSocketResponse]): Session ID to socket
+        subscriptions (Dict[str, Dict[str, Any]]): Subscription ID to object
+        sent_at (Dict[str, float]): Notification message ID to monotonic
+            send time
+        stats (Dict[str, int]): Request and message counters
+    """
+
+    def __init__(self, channels: Optional[Dict[str, Dict[str, Any]]] = None,
+                 host: str = "127.0.0.1", port: int = 0, page_size: int = 100,
+                 keepalive: float = 10, subscription_cost: int = 0,
+                 max_total_cost: int = MAX_TOTAL_COST, rate_limit: int = 800,
+                 gql_latency: float = 0.0):
+        self.channels = channels if channels is not None else make_channels(10)
+        self.host = host
+        self.port = port
+        self.page_size = page_size
+        self.keepalive = keepalive
+        self.subscription_cost = subscription_cost
+        self.max_total_cost = max_total_cost
+        self.rate_limit = rate_limit
+        self.gql_latency = gql_latency
+
+        self.sessions: Dict[str, web.WebSocketResponse] = {}
+        self.subscriptions: Dict[str, Dict[str, Any]] = {}
+        self.sent_at: Dict[str, float] = {}
+        self.stats = {
+            "gql_requests": 0,
+            "helix_requests": 0,
+            "rate_limited": 0,
+            "notifications": 0,
+            "sessions_opened": 0,
+            "hls_requests": 0,
+        }
+
+        self._tokens = float(rate_limit)
+        self._refilled = time.monotonic()
+        self._runner: Optional[web.AppRunner] = None
+
+    # ------------------------------------------------------------------
+    # Server lifecycle
+    # ------------------------------------------------------------------
+
+    @property
+    def base_url(self) -> str:
+        """HTTP base URL of the running server."""
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        """EventSub WebSocket URL of the running server."""
+        return f"ws://{self.host}:{self.port}/ws"
+
+    def user_ids(self) -> List[str]:
+        """Return the user IDs of all channels."""
+        return list(self.channels)
+
+    async def start(self) -> str:
+        """
+        Start serving.
+
+        Returns:
+            str: Base URL of the server
+        """
+        app = web.Application()
+        app.router.add_get("/ws", self._handle_websocket)
+        app.router.add_post("/gql", self._handle_gql)
+        app.router.add_get("/helix/eventsub/subscriptions", self._list_subscriptions)
+        app.router.add_post("/helix/eventsub/subscriptions", self._create_subscription)
+        app.router.add_delete("/helix/eventsub/subscriptions", self._delete_subscription)
+        app.router.add_get("/helix/users", self._get_users)
+        app.router.add_get("/helix", self._helix_root)
+        app.router.add_get("/hls/{login}.m3u8", self._hls_playlist)
+        app.router.add_get("/hls/{login}/{sequence}.ts", self._hls_segment)
+
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self.base_url
+
+    async def stop(self) -> None:
+        """Close all sessions and stop serving."""
+        for ws in list(self.sessions.values()):
+            await ws.close()
+        self.sessions.clear()
+        if self._runner is not None:
+            await self._runner.cleanup()
+            self._runner = None
+
+    # ------------------------------------------------------------------
+    # EventSub WebSocket
+    # ------------------------------------------------------------------
+
+    async def _send(self, ws: web.WebSocketResponse, message_type: str,
+                    payload: Dict[str, Any], metadata: Optional[Dict[str, Any]] = None) -> str:
+        """Send an EventSub message and return its message ID."""
+        message_id = str(uuid.uuid4())
+        message = {
+            "metadata": {
+                "message_id": message_id,
+                "message_type": message_type,
+                "message_timestamp": rfc3339(),
+                **(metadata or {}),
+            },
+            "payload": payload,
+        }
+        await ws.send_json(message)
+        return message_id
+
+    def _session_payload(self, session_id: str, status: str = "connected",
+                         reconnect_url: Optional[str] = None) -> Dict[str, Any]:
+        """Build the session object of welcome and reconnect messages."""
+        return {
+            "session": {
+                "id": session_id,
+                "status": status,
+                "connected_at": rfc3339(),
+                "keepalive_timeout_seconds": int(self.keepalive),
+                "reconnect_url": reconnect_url,
+            }
+        }
+
+    async def _handle_websocket(self, request: web.Request) -> web.WebSocketResponse:
+        """Serve one EventSub WebSocket connection."""
+        ws = web.WebSocketResponse()
+        await ws.prepare(request)
+
+        # A session_reconnect URL carries the session over to this socket
+        session_id = request.query.get("reconnect")
+        old_ws = self.sessions.get(session_id) if session_id else None
+        if not session_id:
+            session_id = uuid.uuid4().hex
+        self.sessions[session_id] = ws
+        self.stats["sessions_opened"] += 1
+
+        await self._send(ws, "session_welcome", self._session_payload(session_id))
+        if old_ws is not None and not old_ws.closed:
+            await old_ws.close(code=4004)
+
+        keepalive_task = asyncio.create_task(self._keepalive(ws))
+        try:
+            async for msg in ws:
+                if msg.type in (WSMsgType.ERROR, WSMsgType.CLOSE):
+                    break
+        finally:
+            keepalive_task.cancel()
+            if self.sessions.get(session_id) is ws:
+                # Twitch keeps the subscriptions but disables them
+                del self.sessions[session_id]
+                for sub in self.subscriptions.values():
+                    if sub["transport"].get("session_id") == session_id and sub["status"] == "enabled":
+                        sub["status"] = "websocket_disconnected"
+        return ws
+
+    async def _keepalive(self, ws: web.WebSocketResponse) -> None:
+        """Send session_keepalive messages while the socket is open."""
+        try:
+            while not ws.closed:
+                await asyncio.sleep(self.keepalive)
+                if not ws.closed:
+                    await self._send(ws, "session_keepalive", {})
+        except (ConnectionError, RuntimeError):
+            pass
+
+    # ------------------------------------------------------------------
+    # Scenarios
+    # ------------------------------------------------------------------
+
+    def _event(self, user_id: str, live: bool) -> Dict[str, Any]:
+        """Build the event object of a stream.online/stream.offline notification."""
+        channel = self.channels[user_id]
+        event = {
+            "broadcaster_user_id": user_id,
+            "broadcaster_user_login": channel["login"],
+            "broadcaster_user_name": channel["display_name"],
+        }
+        if live:
+            event.update({
+                "id": uuid.uuid4().hex[:10],
+                "type": "live",
+                "started_at": rfc3339(channel["started_at"]),
+            })
+        return event
+
+    async def notify(self, sub_type: str, user_id: str, event: Dict[str, Any],
+                     duplicates: int = 0) -> List[str]:
+        """
+        Send a notification to every enabled subscription that matches.
+
+        Args:
+            sub_type: Subscription type, e.g. "stream.online"
+            user_id: Broadcaster user ID
+            event: Event object
+            duplicates: Extra redeliveries of each message (same message ID)
+
+        Returns:
+            List[str]: Message IDs sent
+        """
+        message_ids = []
+        for sub in list(self.subscriptions.values()):
+            if (sub["type"] != sub_type or sub["status"] != "enabled"
+                    or sub["condition"].get("broadcaster_user_id") != user_id):
+                continue
+            ws = self.sessions.get(sub["transport"].get("session_id"))
+            if ws is None or ws.closed:
+                continue
+
+            message_id = str(uuid.uuid4())
+            message = {
+                "metadata": {
+                    "message_id": message_id,
+                    "message_type": "notification",
+                    "message_timestamp": rfc3339(),
+                    "subscription_type": sub_type,
+                    "subscription_version": sub["version"],
+                },
+                "payload": {"subscription": sub, "event": event},
+            }
+            self.sent_at[message_id] = time.monotonic()
+            for _ in range(1 + duplicates):
+                await ws.send_json(message)
+                self.stats["notifications"] += 1
+            message_ids.append(message_id)
+        return message_ids
+
+    async def set_live(self, user_id: str, live: bool, duplicates: int = 0) -> List[str]:
+        """
+        Change a channel's live status and notify its subscribers.
+
+        Args:
+            user_id: Broadcaster user ID
+            live: New live status
+            duplicates: Extra redeliveries of each notification
+
+        Returns:
+            List[str]: Message IDs sent
+        """
+        channel = self.channels[user_id]
+        channel["live"] = live
+        channel["started_at"] = time.time() if live else None
+        sub_type = "stream.online" if live else "stream.offline"
+        return await self.notify(sub_type, user_id, self._event(user_id, live), duplicates=duplicates)
+
+    async def flap(self, user_ids: List[str], interval: float = 1.0, cycles: int = 1,
+                   jitter: float = 0.0, duplicates: int = 0) -> int:
+        """
+        Toggle channels between live and offline.
+
+        Each cycle flips every channel once, spread evenly over the interval
+        (plus up to `jitter` seconds of random delay per channel).
+
+        Args:
+            user_ids: Channels to flip
+            interval: Seconds per cycle
+            cycles: Number of cycles
+            jitter: Maximum random extra delay per flip
+            duplicates: Extra redeliveries of each notification
+
+        Returns:
+            int: Number of notifications sent
+        """
+        sent = 0
+        spacing = interval / max(len(user_ids), 1)
+        for _ in range(cycles):
+            for user_id in user_ids:
+                if jitter:
+                    await asyncio.sleep(random.uniform(0, jitter))
+                sent += len(await self.set_live(user_id, not self.channels[user_id]["live"], duplicates))
+                await asyncio.sleep(spacing)
+        return sent
+
+    async def reconnect(self, session_id: str) -> bool:
+        """
+        Ask a session to move to a new socket with session_reconnect.
+
+        Args:
+            session_id: Session to move
+
+        Returns:
+            bool: True if the message was sent
+        """
+        ws = self.sessions.get(session_id)
+        if ws is None or ws.closed:
+            return False
+        url = f"{self.ws_url}?reconnect={session_id}"
+        await self._send(ws, "session_reconnect", self._session_payload(session_id, "reconnecting", url))
+        return True
+
+    async def revoke(self, sub_id: str, reason: str = "authorization_revoked") -> bool:
+        """
+        Revoke a subscription and send the revocation message.
+
+        Args:
+            sub_id: Subscription ID
+            reason: New subscription status
+
+        Returns:
+            bool: True if the subscription existed
+        """
+        sub = self.subscriptions.get(sub_id)
+        if sub is None:
+            return False
+        sub["status"] = reason
+        ws = self.sessions.get(sub["transport"].get("session_id"))
+        if ws is not None and not ws.closed:
+            await self._send(ws, "revocation", {"subscription": sub}, {
+                "subscription_type": sub["type"],
+                "subscription_version": sub["version"],
+            })
+        return True
+
+    # ------------------------------------------------------------------
+    # Helix
+    # ------------------------------------------------------------------
+
+    def _rate_limit_headers(self) -> Dict[str, str]:
+        """Take one point from the Helix bucket and describe its state."""
+        now = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled) * self.rate_limit / 60)
+        self._refilled = now
+        self._tokens -= 1
+        remaining = max(int(self._tokens), 0)
+        reset_in = (self.rate_limit - self._tokens) * 60 / self.rate_limit
+        return {
+            "Ratelimit-Limit": str(self.rate_limit),
+            "Ratelimit-Remaining": str(remaining),
+            "Ratelimit-Reset": str(int(time.time() + reset_in) + 1),
+        }
+
+    def _helix_response(self, status: int, data: Any = None) -> web.Response:
+        """Count a Helix request and answer it, or 429 if the bucket is empty."""
+        self.stats["helix_requests"] += 1
+        headers = self._rate_limit_headers()
+        if self._tokens < 0:
+            self._tokens = 0
+            self.stats["rate_limited"] += 1
+            return web.json_response({"error": "Too Many Requests", "status": 429}, status=429, headers=headers)
+        if data is None:
+            return web.Response(status=status, headers=headers)
+        return web.json_response(data, status=status, headers=headers)
+
+    def _total_cost(self) -> int:
+        """Cost of all enabled subscriptions."""
+        return sum(sub["cost"] for sub in self.subscriptions.values() if sub["status"] == "enabled")
+
+    async def _create_subscription(self, request: web.Request) -> web.Response:
+        """POST /helix/eventsub/subscriptions"""
+        body = await request.json()
+        session_id = (body.get("transport") or {}).get("session_id")
+        if session_id not in self.sessions:
+            return self._helix_response(400, {
+                "error": "Bad Request", "status": 400,
+                "message": "websocket transport session does not exist or has already disconnected",
+            })
+
+        enabled_on_session = 0
+        for sub in self.subscriptions.values():
+            if sub["status"] != "enabled" or sub["transport"].get("session_id") != session_id:
+                continue
+            enabled_on_session += 1
+            if sub["type"] == body.get("type") and sub["condition"] == body.get("condition"):
+                return self._helix_response(409, {"error": "Conflict", "status": 409,
+                                                  "message": "subscription already exists"})
+
+        if (enabled_on_session >= MAX_SUBSCRIPTIONS_PER_SESSION
+                or self._total_cost() + self.subscription_cost > self.max_total_cost):
+            return self._helix_response(429, {"error": "Too Many Requests", "status": 429,
+                                              "message": "number of websocket transports limit exceeded"})
+
+        sub = {
+            "id": str(uuid.uuid4()),
+            "status": "enabled",
+            "type": body.get("type"),
+            "version": body.get("version", "1"),
+            "condition": body.get("condition") or {},
+            "created_at": rfc3339(),
+            "transport": {"method": "websocket", "session_id": session_id, "connected_at": rfc3339()},
+            "cost": self.subscription_cost,
+        }
+        self.subscriptions[sub["id"]] = sub
+        return self._helix_response(202, {
+            "data": [sub],
+            "total": len(self.subscriptions),
+            "total_cost": self._total_cost(),
+            "max_total_cost": self.max_total_cost,
+        })
+
+    async def _list_subscriptions(self, request: web.Request) -> web.Response:
+        """GET /helix/eventsub/subscriptions with filters and pagination"""
+        query = request.query
+        filters = [name for name in ("status", "type", "user_id") if name in query]
+        if len(filters) > 1:
+            return self._helix_response(400, {"error": "Bad Request", "status": 400,
+                                              "message": "only one filter may be specified"})
+
+        subs = list(self.subscriptions.values())
+        if "status" in query:
+            subs = [sub for sub in subs if sub["status"] == query["status"]]
+        elif "type" in query:
+            subs = [sub for sub in subs if sub["type"] == query["type"]]
+        elif "user_id" in query:
+            subs = [sub for sub in subs if sub["condition"].get("broadcaster_user_id") == query["user_id"]]
+
+        first = min(int(query.get("first", self.page_size)), self.page_size)
+        offset = int(query.get("after", 0) or 0)
+        page = subs[offset:offset + first]
+        pagination = {"cursor": str(offset + first)} if offset + first < len(subs) else {}
+
+        return self._helix_response(200, {
+            "data": page,
+            "total": len(self.subscriptions),
+            "total_cost": self._total_cost(),
+            "max_total_cost": self.max_total_cost,
+            "pagination": pagination,
+        })
+
+    async def _delete_subscription(self, request: web.Request) -> web.Response:
+        """DELETE /helix/eventsub/subscriptions?id=..."""
+        if self.subscriptions.pop(request.query.get("id", ""), None) is None:
+            return self._helix_response(404, {"error": "Not Found", "status": 404,
+                                              "message": "subscription not found"})
+        return self._helix_response(204)
+
+    async def _get_users(self, request: web.Request) -> web.Response:
+        """GET /helix/users, answers for the token's own user"""
+        return self._helix_response(200, {"data": [{"id": "1", "login": "mockuser", "display_name": "MockUser"}]})
+
+    async def _helix_root(self, request: web.Request) -> web.Response:
+        """GET /helix, used as a network check"""
+        return self._helix_response(404, {"error": "Not Found", "status": 404})
+
+    # ------------------------------------------------------------------
+    # GQL
+    # ------------------------------------------------------------------
+
+    def _gql_user(self, user_id: Optional[str]) -> Optional[Dict[str, Any]]:
+        """Build a GQL user object for a channel."""
+        channel = self.channels.get(user_id) if user_id else None
+        if channel is None:
+            return None
+        stream = None
+        if channel["live"]:
+            stream = {
+                "id": f"s{user_id}",
+                "title": channel["title"],
+                "viewersCount": channel["viewers"],
+                "previewImageURL": f"{self.base_url}/previews/{channel['login']}-440x248.jpg",
+                "game": {"name": channel["game"]},
+            }
+        return {
+            "id": user_id,
+            "login": channel["login"],
+            "displayName": channel["display_name"],
+            "profileImageURL": f"{self.base_url}/profiles/{channel['login']}-150x150.png",
+            "offlineImageURL": "",
+            "stream": stream,
+        }
+
+    def _user_id_by_login(self, login: str) -> Optional[str]:
+        """Find a channel's user ID by login."""
+        login = (login or "").lower()
+        for user_id, channel in self.channels.items():
+            if channel["login"] == login:
+                return user_id
+        return None
+
+    async def _handle_gql(self, request: web.Request) -> web.Response:
+        """POST /gql, answering the operations GQLClient sends"""
+        self.stats["gql_requests"] += 1
+        if self.gql_latency:
+            await asyncio.sleep(self.gql_latency)
+
+        body = await request.json()
+        operation = body.get("operationName")
+        variables = body.get("variables") or {}
+
+        if operation == "GetStreamStatus":
+            data = {"user": self._gql_user(self._user_id_by_login(variables.get("login")))}
+        elif operation in ("GetChannelInfo", "GetStreamStatusOnly"):
+            data = {"user": self._gql_user(variables.get("id"))}
+        elif operation == "GetUsersBatch":
+            by_login = "users(logins:" in body.get("query", "").replace(" ", "")
+            data = {"users": [
+                self._gql_user(self._user_id_by_login(value) if by_login else value)
+                for value in variables.get("values") or []
+            ]}
+        else:
+            return web.json_response({"errors": [{"message": f"unknown operation {operation}"}]})
+
+        return web.json_response({"data": data})
+
+    # ------------------------------------------------------------------
+    # HLS
+    # ------------------------------------------------------------------
+
+    async def _hls_playlist(self, request: web.Request) -> web.Response:
+        """GET /hls/<login>.m3u8, a sliding live playlist while the channel is live"""
+        self.stats["hls_requests"] += 1
+        user_id = self._user_id_by_login(request.match_info["login"])
+        channel = self.channels.get(user_id) if user_id else None
+        if channel is None or not channel["live"]:
+            return web.Response(status=404)
+
+        newest = int((time.time() - channel["started_at"]) // HLS_TARGET_DURATION)
+        first = max(0, newest - HLS_WINDOW + 1)
+        lines = [
+            "#EXTM3U",
+            "#EXT-X-VERSION:3",
+            f"#EXT-X-TARGETDURATION:{HLS_TARGET_DURATION}",
+            f"#EXT-X-MEDIA-SEQUENCE:{first}",
+        ]
+        for sequence in range(first, newest + 1):
+            lines.append(f"#EXTINF:{HLS_TARGET_DURATION:.3f},live")
+            lines.append(f"{channel['login']}/{sequence}.ts")
+        return web.Response(text="\n".join(lines) + "\n", content_type="application/vnd.apple.mpegurl")
+
+    async def _hls_segment(self, request: web.Request) -> web.Response:
+        """GET /hls/<login>/<sequence>.ts, filler MPEG-TS packets"""
+        self.stats["hls_requests"] += 1
+        return web.Response(body=TS_PACKET * 1000, content_type="video/mp2t")
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Return request and message counters.
+
+        Returns:
+            Dict[str, Any]: Counters plus open sessions and subscriptions
+        """
+        return {
+            **self.stats,
+            "sessions": len(self.sessions),
+            "subscriptions": len(self.subscriptions),
+            "enabled_subscriptions": sum(1 for sub in self.subscriptions.values() if sub["status"] == "enabled"),
+            "live_channels": sum(1 for channel in self.channels.values() if channel["live"]),
+        }
+
+
+def point_backend_at(mock: MockTwitch) -> None:
+    """
+    Redirect the backend's Twitch URLs to a running mock.
+
+    Only the module-level URLs are changed, so call this before the
+    services make their first request.
+
+    Args:
+        mock: Started MockTwitch instance
+    """
+    from backend.src.services import eventsub_service, gql_client, helix_subscriptions
+
+    subscriptions_url = f"{mock.base_url}/helix/eventsub/subscriptions"
+    helix_subscriptions.EVENTSUB_SUBSCRIPTIONS_URL = subscriptions_url
+    eventsub_service.EVENTSUB_SUBSCRIPTIONS_URL = subscriptions_url
+    eventsub_service.EVENTSUB_WEBSOCKET_URL = mock.ws_url
+    gql_client.TWITCH_GQL_URL = f"{mock.base_url}/gql"
+
+
+async def serve(args) -> None:
+    """Run the mock until interrupted, optionally flapping channels."""
+    mock = MockTwitch(
+        make_channels(args.channels, live_ratio=args.live_ratio),
+        host=args.host,
+        port=args.port,
+        keepalive=args.keepalive,
+        subscription_cost=args.cost,
+        max_total_cost=args.max_total_cost,
+    )
+    await mock.start()
+    print(f"Mock Twitch listening on {mock.base_url}")
+    print(f"  EventSub WebSocket: {mock.ws_url}")
+    print(f"  Helix:              {mock.base_url}/helix/eventsub/subscriptions")
+    print(f"  GQL:                {mock.base_url}/gql")
+    print(f"  HLS:                {mock.base_url}/hls/<login>.m3u8")
+
+    try:
+        if args.flap:
+            flapping = mock.user_ids()[:args.flap]
+            while True:
+                started = time.monotonic()
+                sent = await mock.flap(flapping, interval=args.interval)
+                elapsed = time.monotonic() - started
+                print(f"Flipped {len(flapping)} channels, {sent} notifications in {elapsed:.2f}s "
+                      f"| {mock.get_stats()}")
+        else:
+            while True:
+                await asyncio.sleep(3600)
+    finally:
+        await mock.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--channels", type=int, default=100, help="number of fake channels")
+    parser.add_argument("--live-ratio", type=float, default=0.0, help="fraction of channels live at start")
+    parser.add_argument("--flap", type=int, default=0, help="number of channels to keep flipping live/offline")
+    parser.add_argument("--interval", type=float, default=5.0, help="seconds per flap cycle")
+    parser.add_argument("--keepalive", type=float, default=10.0, help="seconds between keepalive messages")
+    parser.add_argument("--cost", type=int, default=0, help="cost of each subscription")
+    parser.add_argument("--max-total-cost", type=int, default=MAX_TOTAL_COST)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
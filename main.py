@@ -3,6 +3,7 @@ import os
 import sys
 import asyncio
 import platform
+import multiprocessing
 
 # Add backend directory to Python path to enable imports
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "backend")))
@@ -57,6 +58,8 @@ async def main():
         await asyncio.sleep(1)
 
 if __name__ == "__main__":
+    # Needed by recording worker processes in packaged builds
+    multiprocessing.freeze_support()
     try:
         asyncio.run(main())
     except KeyboardInterrupt: